@@ -0,0 +1,189 @@
+#------------------------------------------------------------
+# Bitmap index for faceted student counts.
+#
+# Every student gets a bit position. For each low-cardinality
+# facet value (college, year, race, origin, housingStatus, income
+# bracket) the index holds a Python int whose set bits are the
+# students with that value, so
+#
+#   college in (A, B) AND year = 3 AND origin = Out-of-State
+#
+# is (A | B) & y3 & oos, and its size is int.bit_count(). A
+# million students is ~125 KB per bitmap and a few MB in all.
+#
+# Patches and reloads follow StudentView (backend/analytics/feed.py):
+# a PATCH or DELETE moves or clears that student's bits in a new
+# frame; a deleted student's position is simply left empty.
+#------------------------------------------------------------
+import numpy as np
+
+from backend.analytics.feed import StudentView
+from backend.analytics.snapshot import INCOME_EDGES, INCOME_LABELS, fold
+from backend.db_connection import db
+from backend.metrics.queries import INCOME_BRACKET
+
+# facet -> position in feed.COLUMNS rows
+FACETS = {'college': 7, 'year': 2, 'race': 4, 'origin': 6, 'housingStatus': 3, 'incomeBracket': 5}
+
+
+def income_bracket(income):
+    for edge, label in zip(INCOME_EDGES, INCOME_LABELS):
+        if income < edge:
+            return label
+    return INCOME_LABELS[-1]
+
+
+def _value(row, facet):
+    value = row[FACETS[facet]]
+    return income_bracket(value) if facet == 'incomeBracket' else value
+
+
+def _sort_key(value):
+    return (value is None, value)
+
+
+def _to_bitmap(positions, size):
+    bits = np.zeros(size, dtype=bool)
+    bits[np.asarray(positions, dtype=np.int64)] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+class FacetFrame(object):
+    """One immutable version of the index."""
+
+    def __init__(self, version, ids, extra, size, alive, bitmaps):
+        self.version = version
+        self.ids = ids            # int32 userIds of the loaded rows, sorted; position = index
+        self.extra = extra        # userId -> position for students added since the load
+        self.size = size          # bit positions handed out
+        self.alive = alive        # bitmap of positions holding a student
+        self.bitmaps = bitmaps    # facet -> {value: bitmap}
+
+    def __len__(self):
+        return self.alive.bit_count()
+
+    @classmethod
+    def build(cls, version, rows):
+        ids = []
+        positions = dict((facet, {}) for facet in FACETS)
+        for pos, row in enumerate(rows):
+            ids.append(row[0])
+            for facet in FACETS:
+                positions[facet].setdefault(_value(row, facet), []).append(pos)
+        size = len(ids)
+        bitmaps = dict((facet, dict((value, _to_bitmap(p, size)) for value, p in values.items()))
+                       for facet, values in positions.items())
+        return cls(version, np.array(ids, dtype=np.int32), {}, size, (1 << size) - 1, bitmaps)
+
+    def position(self, user_id):
+        at = int(np.searchsorted(self.ids, user_id))
+        if at < len(self.ids) and self.ids[at] == user_id:
+            return at
+        return self.extra.get(user_id)
+
+    def patch(self, version, rows, deleted_ids):
+        """A new frame with `rows` upserted and `deleted_ids` removed."""
+        bitmaps = dict((facet, dict(values)) for facet, values in self.bitmaps.items())
+        extra, size, alive = dict(self.extra), self.size, self.alive
+        for user_id in list(deleted_ids) + [r[0] for r in rows]:
+            pos = self.position(user_id)
+            if pos is None or not alive >> pos & 1:
+                continue
+            bit = 1 << pos
+            for values in bitmaps.values():
+                for value, bitmap in values.items():
+                    if bitmap & bit:
+                        values[value] = bitmap & ~bit
+                        break
+            alive &= ~bit
+        for row in rows:
+            pos = self.position(row[0])
+            if pos is None:
+                pos = extra[row[0]] = size
+                size += 1
+            bit = 1 << pos
+            for facet, values in bitmaps.items():
+                value = _value(row, facet)
+                values[value] = values.get(value, 0) | bit
+            alive |= bit
+        return FacetFrame(version, self.ids, extra, size, alive, bitmaps)
+
+    # ------------------------------------------------------------
+    # queries
+    def select(self, filters):
+        """Bitmap of students matching every facet of `filters`
+        ({facet: [values]}, any one of the values per facet)."""
+        selected = self.alive
+        for facet, wanted in filters.items():
+            # compared under fold(), like MySQL's case-insensitive collation
+            wanted = set(fold(value) for value in wanted)
+            either = 0
+            for value, bitmap in self.bitmaps[facet].items():
+                if fold(value) in wanted:
+                    either |= bitmap
+            selected &= either
+        return selected
+
+    def counts(self, filters, by=()):
+        """(total, groups): the number of matching students, and for each
+        combination of the `by` facets (one or two) its count."""
+        selected = self.select(filters)
+        total = selected.bit_count()
+        if not by:
+            return total, []
+        groups = []
+        first = self.bitmaps[by[0]]
+        for a in sorted(first, key=_sort_key):
+            part = selected & first[a]
+            if not part:
+                continue
+            if len(by) == 1:
+                groups.append({by[0]: a, 'count': part.bit_count()})
+                continue
+            second = self.bitmaps[by[1]]
+            for b in sorted(second, key=_sort_key):
+                n = (part & second[b]).bit_count()
+                if n:
+                    groups.append({by[0]: a, by[1]: b, 'count': n})
+        return total, groups
+
+
+def sql_counts(filters, by=()):
+    """FacetFrame.counts() answered by MySQL, while the index is (re)loading."""
+    conditions, params = [], []
+    for facet, wanted in filters.items():
+        conditions.append("%s IN (%s)" % (facet, ', '.join(['%s'] * len(wanted))))
+        params.extend(wanted)
+    query = '''
+        SELECT {columns}COUNT(*) AS count
+        FROM (SELECT college, year, race, origin, housingStatus,{bracket} AS incomeBracket
+              FROM students) s
+        {where}
+        {group}
+    '''.format(columns=''.join(f + ', ' for f in by), bracket=INCOME_BRACKET,
+               where=('WHERE ' + ' AND '.join(conditions)) if conditions else '',
+               group=('GROUP BY ' + ', '.join(by)) if by else '')
+    cur = db.cached_cursor()
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    if not by:
+        return rows[0]['count'] if rows else 0, []
+    rows.sort(key=lambda r: tuple(_sort_key(r[f]) for f in by))
+    return sum(r['count'] for r in rows), rows
+
+
+class FacetIndex(StudentView):
+    name = 'students facet index'
+
+    def build(self, version, rows):
+        return FacetFrame.build(version, rows)
+
+    def counts(self, filters, by=()):
+        """(total, groups, source) from the index, or from SQL while it loads."""
+        frame = self.current()
+        if frame is None:
+            return sql_counts(filters, by) + ('sql',)
+        return frame.counts(filters, by) + ('index',)
+
+
+facet_index = FacetIndex()
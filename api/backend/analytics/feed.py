@@ -0,0 +1,184 @@
+#------------------------------------------------------------
+# Change feed for in-memory views of `students`.
+#
+# Write endpoints call student_feed.changed([userId, ...]) right
+# after they commit. The feed re-reads those rows by primary key
+# once and hands them to every subscriber together with the
+# `students` table version the commit produced. A subscriber
+# holding version v may apply the change only when that version
+# is v + 1; anything else means another request or worker wrote
+# in between, and the subscriber reloads instead.
+#
+# StudentView is the shared base of those subscribers: it keeps
+# one immutable frame, answers current() only while the frame
+# matches the shared version, and otherwise reloads in the
+# background while callers fall back to SQL.
+#------------------------------------------------------------
+import abc
+import threading
+import time
+
+from flask import current_app
+from pymysql import cursors
+
+from backend.db_connection import db
+from backend.db_connection.versions import table_versions
+
+# column order shared by every loader and patch
+COLUMNS = ('userId', 'gpa', 'year', 'housingStatus', 'race', 'income', 'origin', 'college')
+
+SELECT_ALL = "SELECT %s FROM students ORDER BY userId" % ', '.join(COLUMNS)
+_SELECT_IDS = "SELECT %s FROM students WHERE userId IN (%%s)" % ', '.join(COLUMNS)
+_FETCH = 10000
+
+
+class StudentFeed(object):
+    def __init__(self, versions=table_versions):
+        self.versions = versions
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, view):
+        """Have view.apply(version, rows, deleted_ids) called after each reported write."""
+        with self._lock:
+            self._subscribers.append(view)
+
+    def changed(self, user_ids):
+        """Report that `user_ids` were inserted, updated or deleted by the
+        transaction just committed on this request's connection."""
+        with self._lock:
+            # views that have not loaded yet have nothing to patch
+            subscribers = [v for v in self._subscribers if v.frame is not None]
+        ids = sorted(set(int(i) for i in user_ids))
+        if not ids or not subscribers:
+            return
+        # the write is already committed: a failure here must not fail the
+        # request; views left behind see a newer version and reload
+        version = self.versions.get('students')
+        try:
+            cursor = db.get_db().cursor(cursors.Cursor)
+            try:
+                cursor.execute(_SELECT_IDS % ', '.join(['%s'] * len(ids)), ids)
+                rows = list(cursor.fetchall())
+            finally:
+                cursor.close()
+        except Exception:
+            current_app.logger.exception("student feed: re-reading %d row(s) failed", len(ids))
+            return
+        present = set(r[0] for r in rows)
+        deleted = [i for i in ids if i not in present]
+        for view in subscribers:
+            try:
+                view.apply(version, rows, deleted)
+            except Exception:
+                current_app.logger.exception("%s: patch failed, it reloads on next use", view.name)
+
+
+student_feed = StudentFeed()
+
+
+class StudentView(abc.ABC):
+    """Per-worker in-memory view of `students`. Subclasses provide build()."""
+
+    name = 'students view'
+
+    def __init__(self, versions=table_versions, feed=student_feed):
+        self.versions = versions
+        self.feed = feed
+        self.enabled = False
+        self.app = None
+        self.frame = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._counters = dict(hits=0, fallbacks=0, loads=0, load_errors=0, patches=0, patch_misses=0)
+        self._load_seconds = 0.0
+
+    def init_app(self, app, enabled=True):
+        self.app = app
+        self.enabled = bool(enabled)
+        if self.enabled:
+            self.feed.subscribe(self)
+
+    @abc.abstractmethod
+    def build(self, version, rows):
+        """A frame of `rows` (tuples in COLUMNS order) at `students` version
+        `version`. A frame has a `version`, a length, and
+        patch(version, rows, deleted_ids) returning a new frame with those
+        rows upserted and those ids removed; frames are never modified."""
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def current(self):
+        """The frame if it reflects the latest `students` version, else None
+        (the caller uses SQL) after starting a background reload."""
+        if not self.enabled:
+            return None
+        frame = self.frame
+        if frame is not None and frame.version == self.versions.get('students'):
+            self._count('hits')
+            return frame
+        self._count('fallbacks')
+        self.reload_async()
+        return None
+
+    def reload_async(self):
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=self._reload, name=self.name, daemon=True).start()
+
+    def _reload(self):
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                self.frame = self.load(db.get_db())
+            with self._lock:
+                self._counters['loads'] += 1
+                self._load_seconds = time.perf_counter() - started
+        except Exception:
+            self._count('load_errors')
+            self.app.logger.exception("%s: reload failed", self.name)
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def load(self, conn):
+        """Build a frame from a full scan of `students` on `conn`."""
+        # the version is read first: a write that lands during the scan
+        # leaves the frame one version behind, and it is reloaded again
+        version = self.versions.get('students')
+        cursor = conn.cursor(cursors.SSCursor)
+        try:
+            cursor.execute(SELECT_ALL)
+            return self.build(version, _stream(cursor))
+        finally:
+            cursor.close()
+
+    def apply(self, version, rows, deleted_ids):
+        with self._lock:
+            frame = self.frame
+            if frame is None or version != frame.version + 1:
+                self._counters['patch_misses'] += 1
+                return
+            self.frame = frame.patch(version, rows, deleted_ids)
+            self._counters['patches'] += 1
+
+    def stats(self):
+        frame = self.frame
+        with self._lock:
+            return dict(self._counters, enabled=self.enabled, loading=self._loading,
+                        rows=len(frame) if frame is not None else 0,
+                        version=frame.version if frame is not None else None,
+                        load_seconds=round(self._load_seconds, 3))
+
+
+def _stream(cursor):
+    while True:
+        chunk = cursor.fetchmany(_FETCH)
+        if not chunk:
+            return
+        for row in chunk:
+            yield row
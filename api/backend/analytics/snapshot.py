@@ -0,0 +1,203 @@
+#------------------------------------------------------------
+# Columnar in-memory snapshot of `students` (optional).
+#
+# With ANALYTICS_SNAPSHOT enabled each worker keeps the students
+# table as NumPy columns and answers the student aggregates (GPA
+# averages, enrollment trends, the demographics cube, GPA
+# histograms) with vectorised code instead of a MySQL round trip:
+#
+#   userId            int32, sorted ascending
+#   gpa               int16, hundredths of a point; -1 for NULL
+#   year, income      int16 / int32
+#   college, race,    int16 codes into a per-column dictionary
+#   origin, housingStatus
+#
+# About 20 bytes per student, so 1M students is ~20 MB per worker.
+#
+# Freshness, patching and reloads are handled by StudentView
+# (backend/analytics/feed.py). Frames are never modified once
+# published: a patch builds a new frame and swaps it in, so
+# readers need no lock.
+#------------------------------------------------------------
+import unicodedata
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+from backend.analytics.feed import StudentView
+
+STRING_COLUMNS = ('housingStatus', 'race', 'origin', 'college')
+
+# matches the CASE in backend/metrics/queries.py (INCOME_BRACKET)
+INCOME_EDGES = (25000, 50000, 75000)
+INCOME_LABELS = ('<$25k', '$25k–$50k', '$50k–$75k', '$75k+')
+
+_CENT = Decimal('0.01')
+
+
+def fold(value):
+    """Comparison key for a filter value: strings ignore case and accents,
+    as MySQL's default (_ai_ci) collation does, so in-memory lookups
+    match what the SQL fallback would."""
+    if not isinstance(value, str):
+        return value
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class Dictionary(object):
+    """Value <-> small int code for one string column. Codes are only
+    ever appended, so a code stays valid in every later frame."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = dict((v, i) for i, v in enumerate(self.values))
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def matching(self, value):
+        """Codes of every value equal to `value` under fold()."""
+        key = fold(value)
+        return [code for code, v in enumerate(self.values) if fold(v) == key]
+
+    def copy(self):
+        return Dictionary(self.values)
+
+
+class Frame(object):
+    """One immutable version of the snapshot."""
+
+    def __init__(self, version, columns, dictionaries):
+        self.version = version
+        self.columns = columns            # name -> ndarray, all the same length
+        self.dictionaries = dictionaries  # name -> Dictionary (string columns)
+
+    def __len__(self):
+        return len(self.columns['userId'])
+
+    @classmethod
+    def build(cls, version, rows):
+        """Frame from an iterable of (userId, gpa, year, housingStatus, race,
+        income, origin, college) tuples sorted by userId."""
+        dictionaries = dict((name, Dictionary()) for name in STRING_COLUMNS)
+        ids, gpa, year, income = [], [], [], []
+        codes = dict((name, []) for name in STRING_COLUMNS)
+        for user_id, g, y, housing, race, inc, origin, college in rows:
+            ids.append(user_id)
+            gpa.append(-1 if g is None else int(round(g * 100)))
+            year.append(y)
+            income.append(inc)
+            for name, value in (('housingStatus', housing), ('race', race), ('origin', origin), ('college', college)):
+                codes[name].append(dictionaries[name].encode(value))
+        columns = dict(userId=np.array(ids, dtype=np.int32), gpa=np.array(gpa, dtype=np.int16),
+                       year=np.array(year, dtype=np.int16), income=np.array(income, dtype=np.int32))
+        for name in STRING_COLUMNS:
+            columns[name] = np.array(codes[name], dtype=np.int16)
+        return cls(version, columns, dictionaries)
+
+    def patch(self, version, rows, deleted_ids):
+        """A new frame with `rows` upserted and `deleted_ids` removed."""
+        dictionaries = dict((name, d.copy()) for name, d in self.dictionaries.items())
+        columns = dict(self.columns)
+        doomed = set(deleted_ids) | set(r[0] for r in rows)
+        if doomed and len(columns['userId']):
+            ids = columns['userId']
+            wanted = np.array(sorted(doomed), dtype=np.int32)
+            at = np.searchsorted(ids, wanted)
+            at = at[(at < len(ids)) & (ids[np.minimum(at, len(ids) - 1)] == wanted)]
+            if len(at):
+                columns = dict((name, np.delete(col, at)) for name, col in columns.items())
+        if rows:
+            added = Frame.build(version, sorted(rows, key=lambda r: r[0]))
+            for name in STRING_COLUMNS:
+                # re-encode the new rows' codes against our dictionary
+                remap = np.array([dictionaries[name].encode(v) for v in added.dictionaries[name].values],
+                                 dtype=np.int16)
+                added.columns[name] = remap[added.columns[name]]
+            at = np.searchsorted(columns['userId'], added.columns['userId'])
+            columns = dict((name, np.insert(col, at, added.columns[name])) for name, col in columns.items())
+        return Frame(version, columns, dictionaries)
+
+    # ------------------------------------------------------------
+    # aggregates
+    def _mask(self, college=None):
+        if college is None:
+            return None
+        codes = self.dictionaries['college'].matching(college)
+        if not codes:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.columns['college'], codes)
+
+    def avg_gpa_by_college(self):
+        """[{college, average_gpa}] like GET /colleges/averages/gpa."""
+        college, gpa = self.columns['college'], self.columns['gpa']
+        n = len(self.dictionaries['college'].values)
+        rated = gpa >= 0
+        present = np.bincount(college, minlength=n)
+        counts = np.bincount(college[rated], minlength=n)
+        sums = np.bincount(college[rated], weights=gpa[rated], minlength=n)
+        rows = []
+        for code, name in enumerate(self.dictionaries['college'].values):
+            if not present[code]:
+                continue
+            avg = None
+            if counts[code]:
+                avg = (Decimal(int(sums[code])) / (100 * int(counts[code]))).quantize(_CENT, ROUND_HALF_UP)
+            rows.append({'college': name, 'average_gpa': avg})
+        rows.sort(key=lambda r: (r['average_gpa'] is None, -(r['average_gpa'] or 0)))
+        return rows
+
+    def enrollment_trend(self, college):
+        """[{period, enrollment}] per year like GET /colleges/<name>/enrollment-trend."""
+        years = self.columns['year'][self._mask(college)]
+        values, counts = np.unique(years, return_counts=True)
+        return [{'period': int(y), 'enrollment': int(c)} for y, c in zip(values, counts)]
+
+    def demographics_cube(self):
+        """Cells like backend.metrics.demographics.cube()."""
+        dims = [('college', self.columns['college'], self.dictionaries['college'].values),
+                ('origin', self.columns['origin'], self.dictionaries['origin'].values),
+                ('housingStatus', self.columns['housingStatus'], self.dictionaries['housingStatus'].values),
+                ('race', self.columns['race'], self.dictionaries['race'].values),
+                ('incomeBracket', np.digitize(self.columns['income'], INCOME_EDGES), INCOME_LABELS)]
+        key = np.zeros(len(self), dtype=np.int64)
+        for _, codes, values in dims:
+            key = key * len(values) + codes
+        cells, counts = np.unique(key, return_counts=True)
+        rows = [{'num_students': int(c)} for c in counts]
+        for name, _, values in reversed(dims):
+            cells, codes = np.divmod(cells, len(values))
+            for row, code in zip(rows, codes):
+                row[name] = values[code]
+        return rows
+
+    def gpa_counts(self, college=None, max_cents=999):
+        """{college: students per GPA in hundredths} (arrays of max_cents + 1)."""
+        gpa, codes = self.columns['gpa'], self.columns['college']
+        mask = gpa >= 0
+        if college is not None:
+            mask &= self._mask(college)
+        names = self.dictionaries['college'].values
+        width = max_cents + 1
+        table = np.bincount(codes[mask].astype(np.int64) * width + gpa[mask],
+                            minlength=len(names) * width).reshape(len(names), width)
+        return dict((name, table[code]) for code, name in enumerate(names) if table[code].any())
+
+
+class StudentSnapshot(StudentView):
+    name = 'students snapshot'
+
+    def init_app(self, app):
+        app.config.setdefault('ANALYTICS_SNAPSHOT', False)
+        super(StudentSnapshot, self).init_app(app, enabled=app.config['ANALYTICS_SNAPSHOT'])
+
+    def build(self, version, rows):
+        return Frame.build(version, rows)
+
+
+student_snapshot = StudentSnapshot()
@@ -4,6 +4,7 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 #------------------------------------------------------------
 # Create a new Blueprint object, which is a collection of 
@@ -11,7 +12,7 @@ from backend.db_connection import db
 classrooms_api = Blueprint('classrooms_api', __name__)
 
 #------------------------------------------------------------
-# GET /api/classrooms
+# GET /api/classrooms[?limit=&after=]
 # Purpose: List all classrooms that were not maintained in the last 2 months
 @classrooms_api.route('/classrooms', methods=['GET'])
 def list_classrooms():  # Fixed function name
@@ -19,8 +20,20 @@ def list_classrooms():  # Fixed function name
         SELECT lastMaintained, roomNumber
         FROM classrooms
         WHERE lastMaintained < DATE_SUB(NOW(), INTERVAL 2 MONTH)
-        ORDER BY lastMaintained;     
     '''
+    page = page_request(width=2)
+    if page:
+        # roomNumber breaks ties between rooms serviced on the same day
+        keys = ["lastMaintained", "roomNumber"]
+        params = []
+        if page.after:
+            clause, params = keyset_predicate(keys, page.after)
+            query += " AND " + clause
+        query += order_by(keys) + " LIMIT %s"
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params) + (page.limit + 1,))
+        return page_response(cursor.fetchall(), page, keys)
+    query += order_by(["lastMaintained"])
     current_app.logger.info(f'GET /classrooms query={query}')
     cursor = db.get_db().cursor()
     cursor.execute(query)
@@ -1,16 +1,29 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.conditional import conditional
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for clubs listing
 clubs_api = Blueprint('clubs_api', __name__)
 
 # ------------------------------------------------------------
-# GET /api/clubs
+# GET /api/clubs[?limit=&after=]
 # Purpose: List all clubs
 @clubs_api.route('/clubs', methods=['GET'])
+@conditional('clubs')
 def list_clubs():
     query = "SELECT * FROM clubs"
     current_app.logger.info("GET /clubs : listing clubs")
+    page = page_request()
+    if page:
+        params = []
+        if page.after:
+            clause, params = keyset_predicate(["name"], page.after)
+            query += " WHERE " + clause
+        query += order_by(["name"]) + " LIMIT %s"
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params) + (page.limit + 1,))
+        return page_response(cursor.fetchall(), page, ["name"])
     cursor = db.get_db().cursor()
     cursor.execute(query)
     theData = cursor.fetchall()
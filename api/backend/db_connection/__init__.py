@@ -1,10 +1,488 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
+import os
+import random
+import threading
+import time
+
+import pymysql
+from flask import current_app, g, has_app_context, has_request_context, jsonify, make_response, request
 from pymysql import cursors
 
+from backend.db_connection.cache import QueryCache, cache_key
+from backend.db_connection.catalog import NamedQuery, catalog
+from backend.db_connection.nplusone import QueryBudget, QueryBudgetExceeded, fingerprint
+from backend.db_connection.pool import ConnectionPool, PoolTimeout
+from backend.db_connection.versions import read_tables, table_versions, written_table
+
+
+# unbuffered cursors report ~0 as their row count until fully read
+_UNKNOWN_ROWCOUNT = 2 ** 63
+
+
+class QueryStats(object):
+    """What the current request has asked MySQL so far. `fingerprints`
+    counts statements by shape, and is only kept while a query budget is on."""
+    __slots__ = ('queries', 'rows', 'seconds', 'fingerprints')
+
+    def __init__(self, fingerprints=False):
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.fingerprints = {} if fingerprints else None
+
+    def observe(self, seconds, rows, query=None):
+        self.queries += 1
+        self.rows += rows
+        self.seconds += seconds
+        if self.fingerprints is not None:
+            fp = fingerprint(query)
+            self.fingerprints[fp] = self.fingerprints.get(fp, 0) + 1
+            return fp
+
+    def merge(self, other):
+        """Add the queries another context ran on the request's behalf (e.g. a worker thread)."""
+        self.queries += other.queries
+        self.rows += other.rows
+        self.seconds += other.seconds
+        if self.fingerprints is not None and other.fingerprints:
+            for fp, count in other.fingerprints.items():
+                self.fingerprints[fp] = self.fingerprints.get(fp, 0) + count
+
+
+def request_query_stats():
+    """QueryStats for the active app context, or None outside of one."""
+    if not has_app_context():
+        return None
+    stats = g.get('query_stats')
+    if stats is None:
+        stats = g.query_stats = QueryStats(fingerprints=db.budget.enabled)
+    return stats
+
+
+class TrackedCursor(object):
+    """Thin wrapper around a PyMySQL cursor so the pool can tell
+    whether a request forgot to close it."""
+
+    def __init__(self, owner, cursor):
+        self._owner = owner
+        self._cursor = cursor
+        self.last_query = None
+
+    def execute(self, query, args=None):
+        named = None
+        if isinstance(query, NamedQuery):
+            named, (query, args) = query, query.bind(args)
+        self.last_query = query
+        self._owner._note_write(query, named)
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(query, args)
+        except Exception:
+            # still counted, but a budget violation must not mask the real error
+            self._observe(query, time.perf_counter() - started, named, check=False)
+            raise
+        self._observe(query, time.perf_counter() - started, named)
+        return result
+
+    def executemany(self, query, args):
+        named = None
+        if isinstance(query, NamedQuery):
+            named, query = query, query.bind()[0]
+        self.last_query = query
+        self._owner._note_write(query, named)
+        started = time.perf_counter()
+        try:
+            result = self._cursor.executemany(query, args)
+        except Exception:
+            # still counted, but a budget violation must not mask the real error
+            self._observe(query, time.perf_counter() - started, named, check=False)
+            raise
+        self._observe(query, time.perf_counter() - started, named)
+        return result
+
+    def _observe(self, query, seconds, named=None, check=True):
+        rows = 0
+        if self._cursor.description is not None and 0 <= self._cursor.rowcount < _UNKNOWN_ROWCOUNT:
+            rows = self._cursor.rowcount
+        if named is not None:
+            named.observe(seconds, rows)
+        stats = request_query_stats()
+        if stats is None:
+            return
+        fp = stats.observe(seconds, rows, query)
+        if check and fp is not None and db.budget.mode == 'raise':
+            db.budget.check(stats, fp)
+
+    def close(self):
+        self._cursor.close()
+        self._owner._forget_cursor(self)
+
+    @property
+    def closed(self):
+        return self._cursor.connection is None
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CachedCursor(object):
+    """Cursor-like reader for `db.cached_cursor()`. SELECTs are answered
+    from the query cache when possible; a connection is only checked
+    out on a miss. Rows handed out are copies, so callers may edit them.
+    A NamedQuery is tagged with its declared tables instead of parsed ones."""
+
+    def __init__(self, mysql, ttl=None, tables=None):
+        self._mysql = mysql
+        self._ttl = ttl
+        self._tables = tuple(tables) if tables else None
+        self._rows = []
+        self.rowcount = -1
+        self.last_query = None
+
+    def execute(self, query, args=None):
+        named = query if isinstance(query, NamedQuery) else None
+        sql, params = named.bind(args) if named is not None else (query, args)
+        self.last_query = sql
+        cache = self._mysql.cache
+        if named is not None:
+            tables, writes = self._tables or named.reads, named.writes
+        else:
+            tables, writes = self._tables or read_tables(sql), written_table(sql)
+        pending = g.mysql_db._written if 'mysql_db' in g else ()
+        if not cache.enabled or writes or pending and set(tables) & pending:
+            # writes, and reads of tables this request already wrote, go to MySQL
+            rows = self._fetch(query, args)
+        else:
+            key = cache_key(sql, params)
+            rows = cache.get(key)
+            if rows is None:
+                stamp = cache.stamp(tables)
+                rows = self._fetch(query, args)
+                cache.put(key, rows, tables, stamp, self._ttl)
+            elif named is not None:
+                named.observe(0.0, 0, hit=True)
+        self._rows = [dict(r) for r in rows]
+        self.rowcount = len(self._rows)
+        return self.rowcount
+
+    def _fetch(self, query, args):
+        with self._mysql.get_db().cursor() as cursor:
+            cursor.execute(query, args)
+            return cursor.fetchall()
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        self._rows = []
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PooledConnection(object):
+    """What `db.get_db()` hands to the blueprints. It behaves like a
+    PyMySQL connection but goes back to the pool at the end of the
+    request instead of being closed."""
+
+    def __init__(self, pool, raw, cache=None):
+        self._pool = pool
+        self._raw = raw
+        self._cache = cache
+        self._cursors = []
+        self._discard = False
+        self._written = set()  # tables with uncommitted writes
+
+    def cursor(self, cursor=None):
+        tracked = TrackedCursor(self, self._raw.cursor(cursor))
+        self._cursors.append(tracked)
+        return tracked
+
+    def _forget_cursor(self, tracked):
+        try:
+            self._cursors.remove(tracked)
+        except ValueError:
+            pass
+
+    def _note_write(self, query, named=None):
+        if named is not None:
+            self._written.update(named.writes)
+            return
+        table = written_table(query)
+        if table:
+            self._written.add(table)
+
+    def commit(self):
+        """Commit, then bump the version of every table this transaction wrote."""
+        self._raw.commit()
+        if self._written:
+            written, self._written = self._written, set()
+            table_versions.bump(written)
+            if self._cache is not None:
+                self._cache.invalidate(written)
+
+    def rollback(self):
+        self._written = set()
+        self._raw.rollback()
+
+    def invalidate(self):
+        """Close this connection at release instead of returning it to the pool."""
+        self._discard = True
+
+    def release(self):
+        """Return the connection to the pool and report the cursors that were never closed."""
+        raw, self._raw = self._raw, None
+        self._written = set()
+        if raw is None:
+            return []
+        if self._discard:
+            self._cursors = []
+            self._pool.release(raw, discard=True)
+            return []
+        leaked = [c for c in self._cursors if not c.closed]
+        self._cursors = []
+        if leaked:
+            self._pool.record_cursor_leak(len(leaked))
+        discard = False
+        try:
+            for c in leaked:
+                c._cursor.close()
+            # never hand a half-finished transaction to the next request
+            raw.rollback()
+        except Exception:
+            discard = True
+        self._pool.release(raw, discard=discard)
+        return leaked
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("connection already returned to the pool")
+        return getattr(self._raw, name)
+
+
+class PooledMySQL(object):
+    """Drop-in replacement for flaskext.mysql.MySQL backed by a ConnectionPool.
+
+    Reads the same MYSQL_DATABASE_* settings, plus:
+        MYSQL_POOL_MIN_SIZE, MYSQL_POOL_MAX_SIZE,
+        MYSQL_POOL_IDLE_TIMEOUT, MYSQL_POOL_CHECKOUT_TIMEOUT,
+        MYSQL_POOL_PING_AFTER,
+        MYSQL_QUERY_CACHE_SIZE (entries, 0 disables), MYSQL_QUERY_CACHE_MAX_ROWS,
+        MYSQL_QUERY_CACHE_TTL,
+        MYSQL_QUERY_BUDGET_MODE (off|warn|raise), MYSQL_QUERY_BUDGET,
+        MYSQL_QUERY_REPEAT_LIMIT
+    """
+
+    def __init__(self, app=None, **connect_args):
+        self.connect_args = connect_args
+        self.app = None
+        self.pool = None
+        self._leaks_reported = set()
+        self._warmup_pid = None
+        self._warmup_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self.retry_after = 1.0
+        self.versions = table_versions
+        self.cache = QueryCache(table_versions, max_entries=0)
+        self.budget = QueryBudget('off')
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MYSQL_DATABASE_HOST', 'localhost')
+        app.config.setdefault('MYSQL_DATABASE_PORT', 3306)
+        app.config.setdefault('MYSQL_DATABASE_USER', None)
+        app.config.setdefault('MYSQL_DATABASE_PASSWORD', None)
+        app.config.setdefault('MYSQL_DATABASE_DB', None)
+        app.config.setdefault('MYSQL_DATABASE_CHARSET', 'utf8')
+        app.config.setdefault('MYSQL_POOL_MIN_SIZE', 2)
+        app.config.setdefault('MYSQL_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_IDLE_TIMEOUT', 300.0)
+        app.config.setdefault('MYSQL_POOL_CHECKOUT_TIMEOUT', 10.0)
+        app.config.setdefault('MYSQL_POOL_PING_AFTER', 0.0)
+        app.config.setdefault('MYSQL_CONNECT_BACKOFF_INITIAL', 0.5)
+        app.config.setdefault('MYSQL_CONNECT_BACKOFF_MAX', 10.0)
+        app.config.setdefault('MYSQL_QUERY_CACHE_SIZE', 512)
+        app.config.setdefault('MYSQL_QUERY_CACHE_MAX_ROWS', 100000)
+        app.config.setdefault('MYSQL_QUERY_CACHE_TTL', 300.0)
+        app.config.setdefault('MYSQL_QUERY_BUDGET_MODE', 'off')
+        app.config.setdefault('MYSQL_QUERY_BUDGET', 50)
+        app.config.setdefault('MYSQL_QUERY_REPEAT_LIMIT', 5)
+
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=int(app.config['MYSQL_POOL_MIN_SIZE']),
+            max_size=int(app.config['MYSQL_POOL_MAX_SIZE']),
+            idle_timeout=float(app.config['MYSQL_POOL_IDLE_TIMEOUT']),
+            checkout_timeout=float(app.config['MYSQL_POOL_CHECKOUT_TIMEOUT']),
+            ping_after=float(app.config['MYSQL_POOL_PING_AFTER']),
+            logger=app.logger,
+        )
+        self.cache = QueryCache(
+            self.versions,
+            max_entries=int(app.config['MYSQL_QUERY_CACHE_SIZE']),
+            max_rows=int(app.config['MYSQL_QUERY_CACHE_MAX_ROWS']),
+            ttl=float(app.config['MYSQL_QUERY_CACHE_TTL']),
+        )
+        self.budget = QueryBudget(
+            app.config['MYSQL_QUERY_BUDGET_MODE'],
+            max_queries=int(app.config['MYSQL_QUERY_BUDGET']),
+            max_repeats=int(app.config['MYSQL_QUERY_REPEAT_LIMIT']),
+            logger=app.logger,
+        )
+        app.extensions['pooled_mysql'] = self
+        # request teardown knows the endpoint; the app-context hook covers
+        # connections taken outside a request (CLI, background threads)
+        app.teardown_request(self.teardown)
+        app.teardown_appcontext(self.teardown)
+        app.register_error_handler(PoolTimeout, self._pool_timeout)
+
+    def connect(self):
+        config = self.app.config
+        args = dict(self.connect_args)
+        args.update(
+            host=config['MYSQL_DATABASE_HOST'],
+            port=int(config['MYSQL_DATABASE_PORT']),
+            user=config['MYSQL_DATABASE_USER'],
+            password=config['MYSQL_DATABASE_PASSWORD'] or '',
+            database=config['MYSQL_DATABASE_DB'],
+            charset=config['MYSQL_DATABASE_CHARSET'],
+        )
+        return pymysql.connect(**args)
+
+    def get_db(self):
+        if 'mysql_db' not in g:
+            g.mysql_db = PooledConnection(self.pool, self.pool.acquire(), self.cache)
+        return g.mysql_db
+
+    def release_db(self):
+        """Give the request's connection back to the pool early, e.g. before
+        waiting on the pool for other connections (which could otherwise
+        deadlock with every request holding one and waiting for another)."""
+        conn = g.pop('mysql_db', None)
+        if conn is not None:
+            conn.release()
+
+    def cached_cursor(self, ttl=None, tables=None):
+        """Opt-in cursor whose SELECT results are served from the query cache.
+        `tables` overrides the tags parsed from the SQL; `ttl` the default TTL."""
+        return CachedCursor(self, ttl=ttl, tables=tables)
+
+    def teardown(self, exception):
+        endpoint = request.endpoint if has_request_context() else None
+        stats = g.pop('query_stats', None)
+        if stats is not None and self.budget.mode == 'warn':
+            self.budget.report(stats, endpoint)
+        conn = g.pop('mysql_db', None)
+        if conn is None:
+            return
+        leaked = conn.release()
+        if leaked and endpoint not in self._leaks_reported:
+            # every leak is counted in stats(); only the first one per endpoint is logged
+            self._leaks_reported.add(endpoint)
+            current_app.logger.warning(
+                "db pool: %s left %d cursor(s) open (last query: %s)", endpoint, len(leaked),
+                ' '.join((leaked[-1].last_query or '').split())[:120])
+
+    def stats(self):
+        return self.pool.stats() if self.pool else {}
+
+    # ------------------------------------------------------------
+    # non-blocking startup
+    @property
+    def ready(self):
+        """True once this process has reached the database (or never tried to)."""
+        if self._warmup_pid is None:
+            return True
+        if self._warmup_pid != os.getpid():
+            # forked after warm-up started without a post-fork hook calling
+            # start_warmup() (e.g. gunicorn --preload): the parent's thread
+            # did not survive the fork, so warm this process's pool now
+            self.app.logger.info("db: process %d forked from %d; starting its DB warm-up",
+                                 os.getpid(), self._warmup_pid)
+            self.start_warmup()
+        return self._ready.is_set()
+
+    def start_warmup(self):
+        """Connect and warm the pool in a background thread, retrying with
+        exponential backoff. Safe to call again after a fork."""
+        with self._warmup_lock:
+            if self._warmup_pid == os.getpid():
+                return
+            self._warmup_pid = os.getpid()
+            self._ready = threading.Event()
+            self._stop = threading.Event()
+            threading.Thread(target=self._warm_in_background, name='db-warmup', daemon=True).start()
+
+    def stop_warmup(self):
+        """Stop retrying and close idle connections (e.g. before forking workers)."""
+        self._stop.set()
+        self._warmup_pid = None
+        if self.pool:
+            self.pool.close_all()
+
+    def _after_fork(self):
+        # a thread of the parent may have held the lock when it forked
+        self._warmup_lock = threading.Lock()
+
+    def _warm_in_background(self):
+        config = self.app.config
+        delay = float(config['MYSQL_CONNECT_BACKOFF_INITIAL'])
+        ceiling = float(config['MYSQL_CONNECT_BACKOFF_MAX'])
+        ready, stop = self._ready, self._stop
+        attempt = 0
+        while not stop.is_set():
+            attempt += 1
+            try:
+                self.pool.warm(max(1, self.pool.min_size))
+            except Exception as e:
+                self.retry_after = delay
+                self.app.logger.info("DB not ready (attempt %d, retrying in %.1fs): %s", attempt, delay, e)
+                stop.wait(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, ceiling)
+                continue
+            self.app.logger.info("Connected to MySQL at %s:%s after %d attempt(s)",
+                                 config['MYSQL_DATABASE_HOST'], config['MYSQL_DATABASE_PORT'], attempt)
+            ready.set()
+            return
+
+    def _pool_timeout(self, error):
+        current_app.logger.warning("db pool: %s", error)
+        response = make_response(jsonify({'error': 'database busy, retry shortly'}))
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# the parameter instructs the connection to return data
+# as a dictionary object.
+db = PooledMySQL(cursorclass=cursors.DictCursor)
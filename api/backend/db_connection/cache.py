@@ -0,0 +1,120 @@
+#------------------------------------------------------------
+# Read-through cache for query results, one per worker process.
+#
+# Entries are keyed by SQL text + parameters and tagged with the
+# tables the query reads. Each entry remembers the change versions
+# of its tables (db_connection/versions.py) from just before the
+# query ran; a lookup whose tables have moved on since is a miss.
+# Because the versions are shared between workers, a commit in
+# one worker invalidates the cached results in all of them. The
+# committing worker also drops its own tagged entries right away.
+#
+# Memory is bounded by an entry count and a total row count, with
+# least-recently-used entries evicted first; every entry also
+# expires after its TTL.
+#------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Entry(object):
+    __slots__ = ('rows', 'tables', 'stamp', 'expires')
+
+    def __init__(self, rows, tables, stamp, expires):
+        self.rows = rows
+        self.tables = tables
+        self.stamp = stamp
+        self.expires = expires
+
+
+def cache_key(query, params):
+    if isinstance(params, dict):
+        params = tuple(sorted(params.items()))
+    elif isinstance(params, list):
+        params = tuple(params)
+    elif params is not None and not isinstance(params, tuple):
+        params = (params,)
+    return query, params
+
+
+class QueryCache(object):
+    def __init__(self, versions, max_entries=512, max_rows=100000, ttl=300.0):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._counters = dict(hits=0, misses=0, stale=0, expired=0, evicted=0, invalidated=0, uncacheable=0)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def stamp(self, tables):
+        """Versions to store with a result; read them before running the query."""
+        return tuple(self.versions.get(t) for t in tables)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if entry.expires < time.monotonic():
+                self._drop(key, 'expired')
+                self._counters['misses'] += 1
+                return None
+            if entry.stamp != self.stamp(entry.tables):
+                self._drop(key, 'stale')
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry.rows
+
+    def put(self, key, rows, tables, stamp, ttl=None):
+        rows = tuple(rows)
+        if len(rows) > self.max_rows:
+            with self._lock:
+                self._counters['uncacheable'] += 1
+            return
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(rows, tables, stamp, time.monotonic() + ttl)
+            self._rows += len(rows)
+            while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                self._drop(next(iter(self._entries)), 'evicted')
+
+    def invalidate(self, tables):
+        tables = set(tables)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if tables.intersection(e.tables)]:
+                self._drop(key, 'invalidated')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def _drop(self, key, reason=None):
+        entry = self._entries.pop(key)
+        self._rows -= len(entry.rows)
+        if reason:
+            self._counters[reason] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                rows=self._rows,
+                max_entries=self.max_entries,
+                max_rows=self.max_rows,
+                hit_ratio=round(self._counters['hits'] / lookups, 3) if lookups else 0.0,
+            )
@@ -0,0 +1,134 @@
+#------------------------------------------------------------
+# Named queries.
+#
+# A NamedQuery is a statement defined once, at import time, with
+# the tables it reads and writes, an optional per-query timeout
+# and optional filters:
+#
+#   COURSE_BUDGETS = catalog.define(
+#       'courses.budgets',
+#       "SELECT id, name FROM courses {where} ORDER BY name",
+#       reads=('courses',),
+#       filters={'college': "college = %(college)s"})
+#
+#   cur = db.cached_cursor()
+#   cur.execute(COURSE_BUDGETS, {'college': college})
+#
+# Parameters are named (%(name)s) and passed as a dict, so a literal
+# % is always written %%. A filter is applied when its parameter is
+# given and not None; the applied filters, plus any fixed `where`
+# conditions, replace {where} as one WHERE clause, so the filtered
+# and unfiltered forms of a query are the same entry.
+#
+# Both cursors accept a NamedQuery wherever they take SQL. They use
+# the declared tables as query-cache tags and for table-version
+# bumps instead of parsing the SQL, add the timeout as a
+# MAX_EXECUTION_TIME hint, and count calls, cache hits, MySQL time
+# and rows per query (see /api/_stats and /api/_metrics). The
+# EXPLAIN check (benchmarks/explain_plans.py) snapshots the plans of
+# every entry.
+#------------------------------------------------------------
+import re
+import sys
+import threading
+
+from backend.db_connection.versions import read_tables, written_table
+
+_PARAM = re.compile(r'%\((\w+)\)s')
+_SELECT = re.compile(r'^(\s*SELECT)\b', re.IGNORECASE)
+
+
+class NamedQuery(object):
+    def __init__(self, name, sql, reads=None, writes=None, timeout_ms=None, filters=None, where=(),
+                 path=None, line=None):
+        self.name = name
+        self.sql = sql
+        written = written_table(sql)
+        self.reads = tuple(reads) if reads is not None else read_tables(sql)
+        self.writes = tuple(writes) if writes is not None else ((written,) if written else ())
+        self.timeout_ms = timeout_ms
+        self.filters = dict(filters or {})
+        self.where = tuple(where)
+        self.path = path
+        self.line = line
+        self._lock = threading.Lock()
+        self._stats = dict(calls=0, hits=0, seconds=0.0, rows=0, slowest=0.0)
+
+    @property
+    def params(self):
+        """Every parameter name the statement can take, filters included."""
+        names = _PARAM.findall(self.sql)
+        for condition in self.filters.values():
+            names.extend(_PARAM.findall(condition))
+        return tuple(sorted(set(names)))
+
+    def bind(self, params=None):
+        """(sql, params) with the filters that `params` sets applied."""
+        params = dict(params or {})
+        conditions = list(self.where)
+        conditions += [c for name, c in self.filters.items() if params.get(name) is not None]
+        sql = self.sql.replace('{where}', 'WHERE ' + ' AND '.join(conditions) if conditions else '')
+        if self.timeout_ms:
+            sql = _SELECT.sub(r'\1 /*+ MAX_EXECUTION_TIME(%d) */' % self.timeout_ms, sql, count=1)
+        return sql, params
+
+    def observe(self, seconds, rows, hit=False):
+        with self._lock:
+            stats = self._stats
+            stats['calls'] += 1
+            if hit:
+                stats['hits'] += 1
+                return
+            stats['seconds'] += seconds
+            stats['rows'] += rows
+            stats['slowest'] = max(stats['slowest'], seconds)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['seconds'] = round(stats['seconds'], 6)
+        stats['slowest'] = round(stats['slowest'], 6)
+        return stats
+
+    def __repr__(self):
+        return '<NamedQuery %s>' % self.name
+
+
+class QueryCatalog(object):
+    def __init__(self):
+        self._queries = {}
+
+    def define(self, name, sql, **options):
+        """Register and return a NamedQuery; names must be unique."""
+        if name in self._queries:
+            raise ValueError("query %r is already defined" % name)
+        caller = sys._getframe(1)
+        query = NamedQuery(name, sql, path=caller.f_code.co_filename, line=caller.f_lineno, **options)
+        self._queries[name] = query
+        return query
+
+    def get(self, name):
+        return self._queries[name]
+
+    def __iter__(self):
+        return iter(list(self._queries.values()))
+
+    def __len__(self):
+        return len(self._queries)
+
+    def stats(self):
+        """{name: {calls, hits, seconds, rows, slowest}} for the queries that have run."""
+        return dict((q.name, s) for q, s in ((q, q.stats()) for q in self) if s['calls'])
+
+
+def tables_of(items):
+    """Table names from a mix of names and NamedQuery objects (their reads)."""
+    tables = []
+    for item in items:
+        for table in (item.reads if isinstance(item, NamedQuery) else (item,)):
+            if table not in tables:
+                tables.append(table)
+    return tuple(tables)
+
+
+catalog = QueryCatalog()
@@ -0,0 +1,100 @@
+#------------------------------------------------------------
+# Per-request query budget, for catching N+1 query patterns.
+#
+# With MYSQL_QUERY_BUDGET_MODE set to "warn" or "raise", every
+# statement a request executes is fingerprinted: literals and
+# parameters are replaced with "?", so the same query issued
+# once per row of a loop collapses to one fingerprint. A request
+# is flagged when it issues more than MYSQL_QUERY_BUDGET queries,
+# or repeats one fingerprint more than MYSQL_QUERY_REPEAT_LIMIT
+# times.
+#
+#   warn  - log the offending endpoint and statement once per process
+#   raise - raise QueryBudgetExceeded at the offending query (for tests)
+#------------------------------------------------------------
+import re
+import threading
+
+MODES = ('off', 'warn', 'raise')
+
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in "raise" mode when a request goes over its query budget."""
+
+
+def fingerprint(query):
+    """The statement with every literal and parameter replaced by '?'."""
+    text = _STRINGS.sub('?', query or '')
+    text = _PLACEHOLDERS.sub('?', text)
+    text = _NUMBERS.sub('?', text)
+    text = _IN_LISTS.sub('(?)', text)
+    return _SPACES.sub(' ', text).strip().lower()
+
+
+class QueryBudget(object):
+    def __init__(self, mode='off', max_queries=50, max_repeats=5, logger=None):
+        if mode not in MODES:
+            raise ValueError("query budget mode must be one of %s" % (MODES,))
+        self.mode = mode
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._reported = set()
+        self._counters = dict(over_budget=0, repeated=0)
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _violations(self, stats):
+        found = []
+        if self.max_queries and stats.queries > self.max_queries:
+            found.append(('over_budget', None))
+        if self.max_repeats:
+            for fp, count in stats.fingerprints.items():
+                if count > self.max_repeats:
+                    found.append(('repeated', fp))
+        return found
+
+    def check(self, stats, fp):
+        """Called after each query in "raise" mode."""
+        if self.max_queries and stats.queries > self.max_queries:
+            self._count('over_budget')
+            raise QueryBudgetExceeded(
+                "request issued %d queries (budget %d); last: %s" % (stats.queries, self.max_queries, fp[:200]))
+        if self.max_repeats and stats.fingerprints[fp] > self.max_repeats:
+            self._count('repeated')
+            raise QueryBudgetExceeded(
+                "request repeated a statement %d times (limit %d), likely N+1: %s"
+                % (stats.fingerprints[fp], self.max_repeats, fp[:200]))
+
+    def report(self, stats, endpoint):
+        """Called once at the end of each request in "warn" mode."""
+        for kind, fp in self._violations(stats):
+            with self._lock:
+                self._counters[kind] += 1
+                first = (endpoint, kind, fp) not in self._reported
+                self._reported.add((endpoint, kind, fp))
+            if not first or self.logger is None:
+                continue
+            if kind == 'over_budget':
+                self.logger.warning("query budget: %s issued %d queries (budget %d)",
+                                    endpoint, stats.queries, self.max_queries)
+            else:
+                self.logger.warning("query budget: %s ran the same statement %d times (limit %d), "
+                                    "likely N+1: %s", endpoint, stats.fingerprints[fp], self.max_repeats, fp[:200])
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, mode=self.mode, max_queries=self.max_queries, max_repeats=self.max_repeats)
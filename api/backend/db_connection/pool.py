@@ -0,0 +1,220 @@
+#------------------------------------------------------------
+# Bounded, thread-safe pool of PyMySQL connections.
+#
+# The pool keeps between `min_size` and `max_size` open
+# connections per process. Idle connections are handed out
+# LIFO so the hot ones stay warm and the cold ones age out
+# after `idle_timeout` seconds. Every checkout validates the
+# connection with a ping first, and callers that cannot get a
+# connection within `checkout_timeout` seconds get a
+# PoolTimeout instead of hanging the worker.
+#------------------------------------------------------------
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+class ConnectionPool(object):
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300.0,
+                 checkout_timeout=10.0, ping_after=0.0, logger=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        # connections idle for less than this many seconds skip the ping
+        self.ping_after = ping_after
+        self.logger = logger
+        self._init_state()
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()   # (connection, last_used) pairs, newest on the right
+        self._size = 0         # idle + checked out
+        self._in_use = 0
+        self._counters = dict(
+            checkouts=0, waits=0, timeouts=0, created=0, closed=0,
+            evicted=0, failed_pings=0, cursor_leaks=0,
+        )
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _check_fork(self):
+        # Connections inherited from a parent process share its sockets;
+        # drop them (without a COM_QUIT) and start over in the child.
+        if self._pid != os.getpid():
+            self._init_state()
+
+    # ------------------------------------------------------------
+    # checkout / return
+    def acquire(self, timeout=None, blocking=True):
+        """A connection, waiting up to `timeout` for one. With blocking=False,
+        None instead of waiting when every connection is in use."""
+        self._check_fork()
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        while True:
+            conn, last_used = None, None
+            with self._cond:
+                while True:
+                    self._evict_idle_locked()
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    if not blocking:
+                        return None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            "no database connection available after %.1fs "
+                            "(pool max_size=%d)" % (timeout, self.max_size))
+                    waited = True
+                    self._cond.wait(remaining)
+                self._in_use += 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._forget(in_use=True)
+                    raise
+                with self._cond:
+                    self._counters['created'] += 1
+            elif not self._validate(conn, last_used):
+                continue
+
+            wait = time.monotonic() - started
+            with self._cond:
+                self._counters['checkouts'] += 1
+                if waited:
+                    self._counters['waits'] += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            return conn
+
+    def release(self, conn, discard=False):
+        if self._pid != os.getpid():
+            return
+        if discard or not getattr(conn, 'open', False):
+            self._close(conn)
+            self._forget(in_use=True)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _validate(self, conn, last_used):
+        if time.monotonic() - last_used < self.ping_after:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.info("db pool: dropping dead connection (%s)", e)
+            self._close(conn)
+            self._forget(in_use=True)
+            with self._cond:
+                self._counters['failed_pings'] += 1
+            return False
+
+    def _forget(self, in_use=False):
+        with self._cond:
+            self._size -= 1
+            if in_use:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._counters['closed'] += 1
+
+    def _evict_idle_locked(self):
+        # oldest idle connections sit on the left of the deque
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._counters['evicted'] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------
+    # sizing helpers
+    def warm(self, count=None):
+        """Open connections until `count` (default min_size) sit idle."""
+        self._check_fork()
+        target = self.min_size if count is None else min(count, self.max_size)
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= target:
+                        break
+                    self._size += 1
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._forget()
+                    raise
+                opened.append(conn)
+                with self._cond:
+                    self._counters['created'] += 1
+        finally:
+            with self._cond:
+                now = time.monotonic()
+                for conn in opened:
+                    self._idle.append((conn, now))
+                self._cond.notify_all()
+        return len(opened)
+
+    def close_all(self):
+        """Close every idle connection; checked-out ones close on return."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def record_cursor_leak(self, count=1):
+        with self._cond:
+            self._counters['cursor_leaks'] += count
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._counters['checkouts']
+            return dict(
+                self._counters,
+                pid=self._pid,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                size=self._size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                wait_time_total_ms=round(self._wait_total * 1000, 3),
+                wait_time_avg_ms=round(self._wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                wait_time_max_ms=round(self._wait_max * 1000, 3),
+            )
@@ -0,0 +1,90 @@
+#------------------------------------------------------------
+# Per-table change counters shared by every worker process.
+#
+# Each committed INSERT/UPDATE/DELETE bumps the counter of the
+# table it wrote (plus the tables its ON DELETE CASCADE foreign
+# keys reach). Readers turn the counters of the tables a route
+# reads into an ETag, so an unchanged resource can be answered
+# with 304 Not Modified without asking MySQL anything.
+#
+# The counters live in an anonymous shared mmap created at import
+# time; gunicorn preloads the app, so all forked workers see the
+# same page. Table names hash into a fixed number of slots, and a
+# collision only means an unrelated write also invalidates an ETag.
+#
+# Writes made outside the API (mysql shell, init scripts) are not
+# seen; the epoch changes on every restart, so restarting the API
+# always invalidates what clients hold.
+#------------------------------------------------------------
+import mmap
+import multiprocessing
+import re
+import struct
+import time
+import zlib
+
+SLOTS = 256
+_SLOT = struct.Struct('=Q')
+
+# Writes the database makes on its own: ON DELETE CASCADE edges from
+# database-files/000_BachEndDatabase.sql and trigger-maintained tables.
+# A write to the key is also a write to these tables.
+CASCADES = {
+    'students': ('club_members', 'rentals', 'reserves'),
+    'clubs': ('club_members',),
+    'classrooms': ('reserves',),
+    # database-files/051_finance_ledger.sql, 052_spending_rollups.sql
+    'course_donations': ('course_finance_ledger', 'college_finance_ledger'),
+    'course_expenses': ('course_finance_ledger', 'college_finance_ledger',
+                        'spending_daily', 'spending_monthly'),
+    'course_finance_ledger': ('college_finance_ledger',),
+    'courses': ('college_finance_ledger', 'spending_daily', 'spending_monthly'),
+}
+
+_WRITE = re.compile(
+    r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM)\s+`?(\w+)`?",
+    re.IGNORECASE)
+
+_READ = re.compile(r"\b(?:FROM|JOIN)\s+`?([A-Za-z_]\w*)`?", re.IGNORECASE)
+
+
+def written_table(query):
+    """Name of the table a write statement targets, or None for reads."""
+    match = _WRITE.match(query or '')
+    return match.group(1).lower() if match else None
+
+
+def read_tables(query):
+    """Tables named after FROM/JOIN in `query` (a superset is harmless)."""
+    return tuple(sorted(set(t.lower() for t in _READ.findall(query or ''))))
+
+
+class TableVersions(object):
+    def __init__(self):
+        self._map = mmap.mmap(-1, SLOTS * _SLOT.size)
+        self._lock = multiprocessing.Lock()
+        self.epoch = '%x' % int(time.time() * 1000)
+
+    @staticmethod
+    def _offset(table):
+        return (zlib.crc32(table.lower().encode('utf-8')) % SLOTS) * _SLOT.size
+
+    def get(self, table):
+        return _SLOT.unpack_from(self._map, self._offset(table))[0]
+
+    def bump(self, tables):
+        expanded = set()
+        for table in tables:
+            expanded.add(table.lower())
+            expanded.update(CASCADES.get(table.lower(), ()))
+        offsets = sorted(set(self._offset(t) for t in expanded))
+        with self._lock:
+            for offset in offsets:
+                _SLOT.pack_into(self._map, offset, _SLOT.unpack_from(self._map, offset)[0] + 1)
+
+    def etag(self, tables):
+        """Opaque tag that changes whenever any of `tables` is written."""
+        return '%s-%s' % (self.epoch, '.'.join(str(self.get(t)) for t in tables))
+
+
+table_versions = TableVersions()
@@ -0,0 +1,110 @@
+###
+# Per-course finance ledger: rebuild and verify.
+#
+# course_finance_ledger holds running donation / expense totals per
+# course and is kept current by triggers on course_donations and
+# course_expenses (database-files/051_finance_ledger.sql); the
+# college_finance_ledger view rolls it up per college. The budget
+# endpoints read only those, one ledger row per course.
+#
+# This module recomputes the totals from the raw tables, either to
+# report drift or to overwrite the ledger with them:
+#
+#   cd api && python -m backend.finance.ledger verify    # exit 1 on drift
+#   cd api && python -m backend.finance.ledger rebuild
+###
+import argparse
+import sys
+
+# raw per-course totals, one row per course
+_ACTUAL = """
+    SELECT c.id AS courseId,
+           COALESCE(d.total, 0) AS donations, COALESCE(d.n, 0) AS donationCount,
+           COALESCE(x.total, 0) AS expenses,  COALESCE(x.n, 0) AS expenseCount
+    FROM courses c
+    LEFT JOIN (SELECT courseId, SUM(amount) AS total, COUNT(*) AS n
+               FROM course_donations GROUP BY courseId) d ON d.courseId = c.id
+    LEFT JOIN (SELECT courseId, SUM(amount) AS total, COUNT(*) AS n
+               FROM course_expenses GROUP BY courseId) x ON x.courseId = c.id
+"""
+
+_REBUILD = """
+    INSERT INTO course_finance_ledger (courseId, donations, donationCount, expenses, expenseCount)
+    SELECT a.courseId, a.donations, a.donationCount, a.expenses, a.expenseCount
+    FROM ({actual}) a
+    ON DUPLICATE KEY UPDATE donations = VALUES(donations), donationCount = VALUES(donationCount),
+                            expenses = VALUES(expenses), expenseCount = VALUES(expenseCount)
+""".format(actual=_ACTUAL)
+
+_DRIFT = """
+    SELECT a.courseId,
+           COALESCE(l.donations, 0) AS ledgerDonations, a.donations AS actualDonations,
+           COALESCE(l.donationCount, 0) AS ledgerDonationCount, a.donationCount AS actualDonationCount,
+           COALESCE(l.expenses, 0) AS ledgerExpenses, a.expenses AS actualExpenses,
+           COALESCE(l.expenseCount, 0) AS ledgerExpenseCount, a.expenseCount AS actualExpenseCount
+    FROM ({actual}) a
+    LEFT JOIN course_finance_ledger l ON l.courseId = a.courseId
+    WHERE COALESCE(l.donations, 0) <> a.donations
+       OR COALESCE(l.donationCount, 0) <> a.donationCount
+       OR COALESCE(l.expenses, 0) <> a.expenses
+       OR COALESCE(l.expenseCount, 0) <> a.expenseCount
+    ORDER BY a.courseId
+""".format(actual=_ACTUAL)
+
+
+def verify(conn):
+    """Courses whose ledger row disagrees with the raw tables (empty when in sync)."""
+    cur = conn.cursor()
+    try:
+        cur.execute(_DRIFT)
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def rebuild(conn):
+    """Overwrite every course's ledger row with totals recomputed from the raw tables.
+
+    Runs as one transaction: INSERT ... SELECT share-locks the rows it
+    reads, so a donation inserted meanwhile waits and then goes through
+    the triggers on top of the rebuilt totals."""
+    cur = conn.cursor()
+    try:
+        drift = len(verify(conn))
+        cur.execute(_REBUILD)
+        conn.commit()
+        return drift
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('verify', 'rebuild'))
+    args = parser.parse_args(argv)
+
+    from backend.db_connection import db
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        conn = db.get_db()
+        if args.command == 'rebuild':
+            drift = rebuild(conn)
+            print("ledger rebuilt (%d course(s) had drifted)" % drift)
+            return 0
+        rows = verify(conn)
+        for row in rows:
+            print("course %(courseId)s: donations %(ledgerDonations)s/%(actualDonations)s "
+                  "(%(ledgerDonationCount)s/%(actualDonationCount)s rows), "
+                  "expenses %(ledgerExpenses)s/%(actualExpenses)s "
+                  "(%(ledgerExpenseCount)s/%(actualExpenseCount)s rows)  [ledger/actual]" % row)
+        print("ledger %s: %d course(s) out of sync" % ('OK' if not rows else 'DRIFT', len(rows)))
+        return 1 if rows else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
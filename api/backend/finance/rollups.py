@@ -0,0 +1,147 @@
+###
+# Daily / monthly spending rollups: backfill and verify.
+#
+# spending_daily and spending_monthly hold course_expenses summed per
+# (college, bucket, course). Triggers keep them current on every
+# insert, update and delete (database-files/052_spending_rollups.sql);
+# the spending-trend endpoints read only these tables.
+#
+# Backfill recomputes a date range from course_expenses, whole months
+# at a time so both tables stay consistent; verify reports buckets
+# that disagree with the raw rows:
+#
+#   cd api && python -m backend.finance.rollups verify  [--from 2024-01-01] [--to 2024-12-31]
+#   cd api && python -m backend.finance.rollups backfill [--from ...] [--to ...]
+###
+import argparse
+import sys
+from datetime import date, timedelta
+
+GRAINS = {
+    # table, bucket column, bucket expression over course_expenses e
+    'day': ('spending_daily', 'day', 'e.spentAt'),
+    'month': ('spending_monthly', 'month', "DATE_FORMAT(e.spentAt, '%%Y-%%m-01')"),
+}
+
+
+def month_range(start=None, end=None):
+    """Widen [start, end] to whole months; None stays open-ended."""
+    if start is not None:
+        start = start.replace(day=1)
+    if end is not None:
+        end = (end.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def _range(column, start, end):
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("%s >= %%s" % column)
+        params.append(start)
+    if end is not None:
+        conditions.append("%s <= %%s" % column)
+        params.append(end)
+    return conditions, params
+
+
+def _actual(cur, grain, start, end):
+    table, column, bucket = GRAINS[grain]
+    conditions, params = _range('e.spentAt', start, end)
+    cur.execute("""
+        SELECT c.college, {bucket} AS bucket, e.courseId, SUM(e.amount) AS amount, COUNT(*) AS expenseCount
+        FROM course_expenses e
+        JOIN courses c ON c.id = e.courseId
+        {where}
+        GROUP BY c.college, {bucket}, e.courseId
+    """.format(bucket=bucket, where=('WHERE ' + ' AND '.join(conditions)) if conditions else ''), params)
+    return dict(((r['college'], str(r['bucket']), r['courseId']), (r['amount'], r['expenseCount']))
+                for r in cur.fetchall())
+
+
+def _stored(cur, grain, start, end):
+    table, column, bucket = GRAINS[grain]
+    conditions, params = _range(column, start, end)
+    cur.execute("SELECT college, {column} AS bucket, courseId, amount, expenseCount FROM {table} "
+                "WHERE expenseCount <> 0{extra}".format(
+                    column=column, table=table,
+                    extra=''.join(' AND ' + c for c in conditions)), params)
+    return dict(((r['college'], str(r['bucket']), r['courseId']), (r['amount'], r['expenseCount']))
+                for r in cur.fetchall())
+
+
+def verify(conn, start=None, end=None):
+    """[(grain, (college, bucket, courseId), stored, actual)] for every bucket that is off."""
+    start, end = month_range(start, end)
+    cur = conn.cursor()
+    try:
+        drift = []
+        for grain in ('day', 'month'):
+            actual, stored = _actual(cur, grain, start, end), _stored(cur, grain, start, end)
+            for key in sorted(set(actual) | set(stored), key=str):
+                if actual.get(key) != stored.get(key):
+                    drift.append((grain, key, stored.get(key), actual.get(key)))
+        return drift
+    finally:
+        cur.close()
+
+
+def backfill(conn, start=None, end=None):
+    """Replace the buckets of [start, end] (widened to whole months) with
+    totals recomputed from course_expenses, in one transaction.
+    Returns the number of rows written per table."""
+    start, end = month_range(start, end)
+    cur = conn.cursor()
+    written = {}
+    try:
+        for grain in ('day', 'month'):
+            table, column, bucket = GRAINS[grain]
+            conditions, params = _range(column, start, end)
+            cur.execute("DELETE FROM {table}{where}".format(
+                table=table, where=(' WHERE ' + ' AND '.join(conditions)) if conditions else ''), params)
+            conditions, params = _range('e.spentAt', start, end)
+            cur.execute("""
+                INSERT INTO {table} (college, {column}, courseId, amount, expenseCount)
+                SELECT c.college, {bucket}, e.courseId, SUM(e.amount), COUNT(*)
+                FROM course_expenses e
+                JOIN courses c ON c.id = e.courseId
+                {where}
+                GROUP BY c.college, {bucket}, e.courseId
+            """.format(table=table, column=column, bucket=bucket,
+                       where=('WHERE ' + ' AND '.join(conditions)) if conditions else ''), params)
+            written[table] = cur.rowcount
+        conn.commit()
+        return written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('verify', 'backfill'))
+    parser.add_argument('--from', dest='start', type=date.fromisoformat, default=None)
+    parser.add_argument('--to', dest='end', type=date.fromisoformat, default=None)
+    args = parser.parse_args(argv)
+
+    from backend.db_connection import db
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        conn = db.get_db()
+        if args.command == 'backfill':
+            for table, rows in sorted(backfill(conn, args.start, args.end).items()):
+                print("%s: %d bucket(s) written" % (table, rows))
+            return 0
+        drift = verify(conn, args.start, args.end)
+        for grain, (college, bucket, course_id), stored, actual in drift:
+            print("%-5s %s %s course %s: stored %s, actual %s  [(amount, expenses)]"
+                  % (grain, college, bucket, course_id, stored, actual))
+        print("rollups %s: %d bucket(s) out of sync" % ('OK' if not drift else 'DRIFT', len(drift)))
+        return 1 if drift else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,36 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for instruments inventory
 instruments_api = Blueprint('instruments_api', __name__)
 
 # ------------------------------------------------------------
-# GET /api/instruments[?available=true|false]
+# GET /api/instruments[?available=true|false][&limit=&after=]
 # Purpose: List instruments, optionally filtering by availability
 @instruments_api.route('/instruments', methods=['GET'])
 def list_instruments():
     available = request.args.get('available')
     params = []
+    conditions = []
     query = "SELECT instrumentId, name, type, isAvailable FROM instruments"
     if available is not None:
-        query += " WHERE isAvailable = %s"
+        conditions.append("isAvailable = %s")
         params.append(available.lower() in ('1', 'true', 't', 'yes'))
+    page = page_request()
+    if page and page.after:
+        clause, after_params = keyset_predicate(["instrumentId"], page.after)
+        conditions.append(clause)
+        params.extend(after_params)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
     current_app.logger.info("GET /instruments : available=%s", available)
+    if page:
+        query += order_by(["instrumentId"]) + " LIMIT %s"
+        params.append(page.limit + 1)
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params))
+        return page_response(cursor.fetchall(), page, ["instrumentId"])
     cursor = db.get_db().cursor()
     cursor.execute(query, tuple(params))
     theData = cursor.fetchall()
@@ -1,11 +1,27 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for maintenance requests, staff hours, and tools linkage
 maintenance_api = Blueprint('maintenance_api', __name__)
 
+# newest first; orderId breaks ties between requests submitted in the same second
+_REQUEST_KEYS = ["mr.submitted", "mr.orderId"]
+
+
+def _requests_page(query, userId, page):
+    # the keyset filter goes before GROUP BY so MySQL can seek on it
+    after, params = "", []
+    if page.after:
+        clause, params = keyset_predicate(_REQUEST_KEYS, page.after, descending=True)
+        after = "AND " + clause
+    query = query.format(after=after, order=order_by(_REQUEST_KEYS, descending=True).strip() + " LIMIT %s")
+    cursor = db.get_db().cursor()
+    cursor.execute(query, (userId,) + tuple(params) + (page.limit + 1,))
+    return page_response(cursor.fetchall(), page, ["submitted", "orderId"])
+
 # ------------------------------------------------------------
-# GET /api/maintenance-requests/staff/<int:userId>
+# GET /api/maintenance-requests/staff/<int:userId>[?limit=&after=]
 # Purpose: List maintenance requests of a staff
 @maintenance_api.route('/maintenance-requests/staff/<int:userId>', methods=['GET'])
 def list_staff_requests(userId):
@@ -20,13 +36,17 @@ def list_staff_requests(userId):
         LEFT JOIN maintenance_staffs AS ms ON msmr.staffId = ms.staffId
         LEFT JOIN users AS u ON mr.studentId = u.userId
         LEFT JOIN maintenance_request_tools AS mrt ON mr.orderId = mrt.orderId
-        WHERE ms.staffId = %s
+        WHERE ms.staffId = %s {after}
         GROUP BY mr.orderId, mr.address, mr.problemType, mr.state, mr.submitted, 
                  mr.description, ms.staffId, u.firstName, u.lastName
-        ORDER BY mr.submitted DESC
+        {order}
     '''
     
     current_app.logger.info("GET /maintenance-requests/%s", userId)
+    page = page_request(width=2)
+    if page:
+        return _requests_page(query, userId, page)
+    query = query.format(after="", order="ORDER BY mr.submitted DESC")
     cursor = db.get_db().cursor()
     cursor.execute(query, (userId,))
     theData = cursor.fetchall()
@@ -36,7 +56,7 @@ def list_staff_requests(userId):
     return response
 
 # ------------------------------------------------------------
-# GET /api/maintenance-requests/student/<int:userId>
+# GET /api/maintenance-requests/student/<int:userId>[?limit=&after=]
 # Purpose: List maintenance requests submitted by a student
 @maintenance_api.route('/maintenance-requests/student/<int:userId>', methods=['GET'])
 def list_student_requests(userId):
@@ -51,13 +71,17 @@ def list_student_requests(userId):
         LEFT JOIN maintenance_staffs AS ms ON msmr.staffId = ms.staffId
         LEFT JOIN users AS u ON ms.staffId = u.userId
         LEFT JOIN maintenance_request_tools AS mrt ON mr.orderId = mrt.orderId
-        WHERE mr.studentId = %s
+        WHERE mr.studentId = %s {after}
         GROUP BY mr.orderId, mr.address, mr.problemType, mr.state, mr.submitted, 
                  mr.description, ms.staffId, u.firstName, u.lastName
-        ORDER BY mr.submitted DESC
+        {order}
     '''
     
     current_app.logger.info("GET /maintenance-requests/%s", userId)
+    page = page_request(width=2)
+    if page:
+        return _requests_page(query, userId, page)
+    query = query.format(after="", order="ORDER BY mr.submitted DESC")
     cursor = db.get_db().cursor()
     cursor.execute(query, (userId,))
     theData = cursor.fetchall()
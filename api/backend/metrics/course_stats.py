@@ -0,0 +1,42 @@
+#------------------------------------------------------------
+# Per-course statistics in one round trip.
+#
+# Each measure is aggregated per course in its own derived table
+# and then LEFT JOINed onto courses, so a course with 40 students
+# and 3 donations never turns into 120 joined rows. A filter
+# (college, dean or explicit ids) is applied to courses and
+# pushed into every derived table, so a dean's page only
+# aggregates that college's rows. The SQL is in metrics/queries.py
+# (COURSE_STATS and COURSE_STATS_SCOPED).
+#
+# One row per course:
+#   course_id, course_name, college, time, professorId, budget,
+#   enrollment  - courses.enrollment as stored (may be NULL)
+#   enrolled    - rows in students_courses
+#   instructors - rows in professors_courses
+#   average_gpa - mean GPA of enrolled students (NULL if none)
+#   is_vacant   - 1 when no professor is assigned to the course
+#   donations, expenses - running totals from course_finance_ledger
+#------------------------------------------------------------
+from backend.db_connection import db
+from backend.metrics import queries
+
+
+def course_stats_query(college=None, dean_id=None, course_ids=None):
+    """(query, params) behind course_stats(), for callers with their own cursor."""
+    scope = {'college': college, 'dean_id': dean_id}
+    if course_ids is not None:
+        # `IN ()` is not valid SQL; IN (NULL) matches no course
+        scope['course_ids'] = tuple(course_ids) or (None,)
+    params = dict((name, value) for name, value in scope.items() if value is not None)
+    if not params:
+        return queries.COURSE_STATS, {}
+    return queries.COURSE_STATS_SCOPED, params
+
+
+def course_stats(college=None, dean_id=None, course_ids=None):
+    """Statistics for all courses, or those of one college / dean / id list."""
+    query, params = course_stats_query(college, dean_id, course_ids)
+    cur = db.cached_cursor()
+    cur.execute(query, params)
+    return cur.fetchall()
@@ -0,0 +1,152 @@
+#------------------------------------------------------------
+# Dean dashboard in one request.
+#
+# The dean home page used to resolve the dean's college and then
+# call a chain of endpoints (enrollment total, courses, one trend
+# per course, placement, budget), each resolving the college again.
+# evaluate() takes the college once and computes the requested
+# panels concurrently, spread over a few pooled connections.
+#
+# Every connection reads inside
+#   START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY
+# MySQL cannot hand one snapshot to several connections, so the
+# snapshots are opened back-to-back before any panel runs. If the
+# version of one of the panels' tables moves in that window, they
+# are dropped and every panel runs on a single snapshot instead.
+#
+# This is best-effort, not a guarantee that all panels see the same
+# data: versions are bumped after the MySQL commit returns, so a
+# commit can land between two snapshots and bump only later, and
+# writes made outside the app (bulk loaders, migrations, ledger
+# rebuilds) never bump them. Each panel is always consistent with
+# itself.
+#------------------------------------------------------------
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+
+from flask import current_app, g
+
+from backend.db_connection import PooledConnection, QueryStats, db, request_query_stats
+from backend.metrics import queries
+from backend.metrics.course_stats import course_stats_query
+
+_SNAPSHOT = "START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY"
+
+
+def enrollment_total(cur, college):
+    cur.execute(queries.ENROLLMENT_TOTAL, {"college": college})
+    return {"totalEnrollment": int((cur.fetchone() or {}).get("totalEnrollment") or 0)}
+
+
+def courses(cur, college):
+    # enrollment, GPA, instructors, budget and vacancy of each course
+    cur.execute(*course_stats_query(college=college))
+    return cur.fetchall()
+
+
+def enrollment_trends(cur, college):
+    cur.execute(queries.ENROLLMENT_TRENDS, {"college": college})
+    return cur.fetchall()
+
+
+def alumni_placement(cur, college):
+    cur.execute(queries.PLACEMENT_SUMMARY, {"college": college})
+    return cur.fetchone() or {"totalAlumni": 0, "placed": 0, "placementRate": 0.0}
+
+
+def budget(cur, college):
+    cur.execute(queries.COLLEGE_LEDGER, {"college": college})
+    return cur.fetchone() or {}
+
+
+# panel -> (function, tables it reads)
+PANELS = {
+    "enrollmentTotal": (enrollment_total, queries.ENROLLMENT_TOTAL.reads),
+    "courses": (courses, queries.COURSE_STATS_SCOPED.reads),
+    "enrollmentTrends": (enrollment_trends, queries.ENROLLMENT_TRENDS.reads),
+    "alumniPlacement": (alumni_placement, queries.PLACEMENT_SUMMARY.reads),
+    "budget": (budget, queries.COLLEGE_LEDGER.reads),
+}
+
+TABLES = tuple(sorted(set(t for _, tables in PANELS.values() for t in tables)))
+
+
+def _versions(tables):
+    return [db.versions.get(t) for t in tables]
+
+
+def _release(conns):
+    for conn in conns:
+        conn.release()
+
+
+def _open_snapshots(count):
+    """Up to `count` pooled connections, each inside a read-only snapshot.
+    Only the first waits for the pool; the rest are taken if idle."""
+    conns = [PooledConnection(db.pool, db.pool.acquire())]
+    try:
+        while len(conns) < count:
+            raw = db.pool.acquire(blocking=False)
+            if raw is None:
+                break
+            conns.append(PooledConnection(db.pool, raw))
+        for conn in conns:
+            with conn.cursor() as cur:
+                cur.execute(_SNAPSHOT)
+    except Exception:
+        _release(conns)
+        raise
+    return conns
+
+
+def _run(app, conn, pending, college, results, errors):
+    """Run panels off `pending` until it is empty; returns the QueryStats of the SQL it ran."""
+    with app.app_context():
+        stats = g.query_stats = QueryStats(fingerprints=db.budget.enabled)
+        try:
+            while True:
+                try:
+                    name = pending.get_nowait()
+                except Empty:
+                    return stats
+                try:
+                    with conn.cursor() as cur:
+                        results[name] = PANELS[name][0](cur, college)
+                except Exception as e:
+                    app.logger.exception("dean dashboard: panel %s failed", name)
+                    errors[name] = str(e)
+        finally:
+            # merged into the request's stats by evaluate(), not reported per thread
+            g.pop('query_stats', None)
+
+
+def evaluate(college, names):
+    """({panel: data}, {panel: error}) for `names`, each panel read inside a snapshot."""
+    tables = sorted(set(t for name in names for t in PANELS[name][1]))
+    wanted = max(1, min(len(names), int(current_app.config['DEAN_DASHBOARD_CONNECTIONS'])))
+    # don't hold the request's connection (the college lookup may have
+    # taken it) while waiting on the pool for the snapshot connections
+    db.release_db()
+    before = _versions(tables)
+    conns = _open_snapshots(wanted)
+    if len(conns) > 1 and _versions(tables) != before:
+        # something was committed while the snapshots were being opened
+        _release(conns)
+        conns = _open_snapshots(1)
+
+    pending = SimpleQueue()
+    for name in names:
+        pending.put(name)
+    results, errors = {}, {}
+    app = current_app._get_current_object()
+    try:
+        with ThreadPoolExecutor(max_workers=len(conns), thread_name_prefix='dean-dashboard') as pool:
+            futures = [pool.submit(_run, app, conn, pending, college, results, errors) for conn in conns]
+    finally:
+        _release(conns)
+    # count the panels' SQL against this request (api_db_* metrics, query budget)
+    stats = request_query_stats()
+    for future in futures:
+        if stats is not None:
+            stats.merge(future.result())
+    return results, errors
@@ -0,0 +1,77 @@
+#------------------------------------------------------------
+# Student demographics cube.
+#
+# One scan of `students` counts every (college, origin,
+# housingStatus, race, income bracket) combination. Every
+# demographics endpoint is a slice of that result summed in
+# Python, so the overall, per-college and all-colleges views
+# share a single query, and through db.cached_cursor() a single
+# cached copy until `students` is written. With the students
+# snapshot enabled the cube comes from memory instead.
+#
+# A slice is a list of rows, one per (type, category):
+#   type         - origin | housingStatus | race | incomeBracket
+#   category     - value of that column (the bracket label for income)
+#   num_students - students in the category
+#   percentage   - share of the slice's students, 2 decimals
+#------------------------------------------------------------
+from decimal import Decimal, ROUND_HALF_UP
+
+from backend.analytics.snapshot import fold, student_snapshot
+from backend.db_connection import db
+from backend.metrics import queries
+
+DIMENSIONS = ('origin', 'housingStatus', 'race', 'incomeBracket')
+
+_CENT = Decimal('0.01')
+
+
+def cube():
+    """The raw cube: one row per populated combination, with its count."""
+    frame = student_snapshot.current()
+    if frame is not None:
+        return frame.demographics_cube()
+    cur = db.cached_cursor()
+    cur.execute(queries.DEMOGRAPHICS_CUBE)
+    return cur.fetchall()
+
+
+def _slice(cells):
+    counts = dict((d, {}) for d in DIMENSIONS)
+    total = 0
+    for cell in cells:
+        n = cell['num_students']
+        total += n
+        for d in DIMENSIONS:
+            counts[d][cell[d]] = counts[d].get(cell[d], 0) + n
+    rows = []
+    for d in DIMENSIONS:
+        for category, n in sorted(counts[d].items(), key=lambda kv: (kv[0] is None, kv[0] or '')):
+            rows.append({'type': d, 'category': category, 'num_students': n,
+                         'percentage': (Decimal(100 * n) / total).quantize(_CENT, ROUND_HALF_UP)})
+    return rows
+
+
+def overall():
+    """Demographics of the whole student body."""
+    return _slice(cube())
+
+
+def for_college(college):
+    """Demographics within one college (empty if it has no students).
+    The name matches under fold(), as `WHERE college = %s` would."""
+    key = fold(college)
+    return _slice([c for c in cube() if fold(c['college']) == key])
+
+
+def by_college():
+    """Every college's slice in one list, each row tagged with `college`."""
+    cells = {}
+    for cell in cube():
+        cells.setdefault(cell['college'], []).append(cell)
+    rows = []
+    for college in sorted(cells, key=lambda c: (c is None, c or '')):
+        for row in _slice(cells[college]):
+            row['college'] = college
+            rows.append(row)
+    return rows
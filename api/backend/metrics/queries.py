@@ -0,0 +1,409 @@
+#------------------------------------------------------------
+# Named queries behind the metrics and dean dashboard routes,
+# and the GPA distribution summaries of the students blueprint.
+#
+# See db_connection/catalog.py. Routes run these through
+# db.cached_cursor() (or a snapshot cursor on the dashboard), so
+# each statement's cache tags, timeout and per-query counters are
+# declared here once. Timeouts: lookups by key get LOOKUP_MS,
+# aggregates over a whole college or the whole school REPORT_MS.
+#------------------------------------------------------------
+from backend.db_connection.catalog import catalog
+
+LOOKUP_MS = 2000
+REPORT_MS = 10000
+
+_COLLEGE = {'college': "college = %(college)s"}
+
+# ---------------- colleges ----------------
+
+COLLEGES_AVG_GPA = catalog.define('metrics.colleges_avg_gpa', '''
+    SELECT college, ROUND(AVG(gpa), 2) AS average_gpa
+    FROM students
+    GROUP BY college
+    ORDER BY average_gpa DESC
+''', reads=('students',), timeout_ms=REPORT_MS)
+
+# students and professors are counted separately and joined per college,
+# instead of counting DISTINCT over a students x courses x professors join
+STUDENT_TEACHER_RATIO = catalog.define('metrics.student_teacher_ratio', '''
+    SELECT s.college,
+           s.num_students,
+           COALESCE(p.num_professors, 0) AS num_professors,
+           ROUND(s.num_students * 1.0 / NULLIF(p.num_professors, 0), 2) AS student_teacher_ratio
+    FROM (SELECT college, COUNT(*) AS num_students
+          FROM students
+          GROUP BY college) s
+    LEFT JOIN (SELECT cc.college, COUNT(DISTINCT pc.professorId) AS num_professors
+               FROM (SELECT DISTINCT st.college, sc.courseId
+                     FROM students st
+                     JOIN students_courses sc ON sc.studentId = st.userId) cc
+               JOIN professors_courses pc ON pc.courseId = cc.courseId
+               GROUP BY cc.college) p ON p.college = s.college
+    ORDER BY student_teacher_ratio DESC
+''', reads=('students', 'students_courses', 'professors_courses'), timeout_ms=REPORT_MS)
+
+RANKINGS = catalog.define('metrics.rankings', '''
+    SELECT *
+    FROM school_rankings sr
+    ORDER BY sr.ranking ASC
+''', reads=('school_rankings',), timeout_ms=LOOKUP_MS)
+
+COLLEGE_ENROLLMENT_TREND = catalog.define('metrics.college_enrollment_trend', '''
+    SELECT s.year AS period, COUNT(*) AS enrollment
+    FROM students s
+    WHERE s.college = %(college)s
+    GROUP BY s.year
+    ORDER BY s.year
+''', reads=('students',), timeout_ms=REPORT_MS)
+
+COLLEGE_ENROLLMENT = catalog.define('metrics.college_enrollment', '''
+    SELECT COUNT(*) AS total_enrollment
+    FROM students
+    WHERE college = %(college)s
+''', reads=('students',), timeout_ms=LOOKUP_MS)
+
+COLLEGE_COURSE_ENROLLMENTS = catalog.define('metrics.college_course_enrollments', '''
+    SELECT c.name AS course_name,
+           c.id   AS course_id,
+           COUNT(sc.studentId) AS enrolled_students
+    FROM courses c
+    LEFT JOIN students_courses sc ON sc.courseId = c.id
+    WHERE c.college = %(college)s
+    GROUP BY c.id, c.name
+    ORDER BY enrolled_students DESC
+''', reads=('courses', 'students_courses'), timeout_ms=REPORT_MS)
+
+COLLEGE_BUDGET = catalog.define('metrics.college_budget', '''
+    SELECT collegeName, budget, status, dean
+    FROM colleges
+    WHERE collegeName = %(college)s
+''', reads=('colleges',), timeout_ms=LOOKUP_MS)
+
+COLLEGE_GPA = catalog.define('metrics.college_gpa', '''
+    SELECT ROUND(AVG(gpa), 2) AS avg_gpa FROM students WHERE college = %(college)s
+''', reads=('students',), timeout_ms=REPORT_MS)
+
+COLLEGE_GPA_BY_COURSE = catalog.define('metrics.college_gpa_by_course', '''
+    SELECT c.id AS course_id,
+           c.name AS course_name,
+           ROUND(AVG(s.gpa), 2) AS avg_student_gpa
+    FROM courses c
+    LEFT JOIN students_courses sc ON sc.courseId = c.id
+    LEFT JOIN students s ON sc.studentId = s.userId
+    WHERE c.college = %(college)s
+    GROUP BY c.id, c.name
+    ORDER BY avg_student_gpa DESC
+''', reads=('courses', 'students_courses', 'students'), timeout_ms=REPORT_MS)
+
+COLLEGE_GPA_BY_PROFESSOR = catalog.define('metrics.college_gpa_by_professor', '''
+    SELECT p.userId AS professor,
+           u.firstName,
+           u.lastName,
+           ROUND(AVG(s.gpa), 2) AS avg_student_gpa
+    FROM professors p
+    JOIN professors_courses pc ON pc.professorId = p.userId
+    JOIN courses c ON c.id = pc.courseId
+    JOIN students_courses sc ON sc.courseId = c.id
+    JOIN students s ON sc.studentId = s.userId
+    JOIN users u ON p.userId = u.userId
+    WHERE c.college = %(college)s
+    GROUP BY p.userId, u.firstName, u.lastName
+    ORDER BY avg_student_gpa DESC
+''', reads=('professors', 'professors_courses', 'courses', 'students_courses', 'students', 'users'),
+    timeout_ms=REPORT_MS)
+
+HIGH_PERFORMERS = catalog.define('metrics.high_performers', '''
+    SELECT s.userId,
+           u.firstName,
+           u.lastName,
+           s.gpa,
+           sr.ranking AS school_rank
+    FROM students s
+    JOIN users u ON s.userId = u.userId
+    JOIN school_rankings sr ON s.college = sr.schoolName
+    WHERE s.college = %(college)s AND s.gpa >= %(gpa_min)s
+    ORDER BY s.gpa DESC, sr.ranking ASC
+''', reads=('students', 'users', 'school_rankings'), timeout_ms=REPORT_MS)
+
+COLLEGE_ALUMNI_PLACEMENTS = catalog.define('metrics.college_alumni_placements', '''
+    SELECT s.college,
+           COUNT(*) AS total_alumni,
+           SUM(a.hasJob = 'true') AS employed_alumni,
+           ROUND(SUM(a.hasJob = 'true') * 1.0 / COUNT(*), 2) AS employment_rate
+    FROM alumni a
+    JOIN students s ON a.studentId = s.userId
+    WHERE s.college = %(college)s
+    GROUP BY s.college
+    ORDER BY employment_rate DESC
+''', reads=('alumni', 'students'), timeout_ms=REPORT_MS)
+
+# ---------------- students ----------------
+
+INCOME_BRACKET = '''
+           CASE
+               WHEN income < 25000 THEN '<$25k'
+               WHEN income BETWEEN 25000 AND 49999 THEN '$25k–$50k'
+               WHEN income BETWEEN 50000 AND 74999 THEN '$50k–$75k'
+               ELSE '$75k+'
+           END'''
+
+# the demographics cube (metrics/demographics.py)
+DEMOGRAPHICS_CUBE = catalog.define('metrics.demographics_cube', '''
+    SELECT college, origin, housingStatus, race,%s AS incomeBracket,
+           COUNT(*) AS num_students
+    FROM students
+    GROUP BY college, origin, housingStatus, race, incomeBracket
+''' % INCOME_BRACKET, reads=('students',), timeout_ms=REPORT_MS)
+
+# students per GPA in hundredths, per college (student/gpa_distribution.py)
+GPA_COUNTS = catalog.define('metrics.gpa_counts', '''
+    SELECT college, ROUND(gpa * 100) AS cents, COUNT(*) AS n
+    FROM students
+    {where}
+    GROUP BY college, cents
+''', reads=('students',), where=("gpa IS NOT NULL",), filters=_COLLEGE, timeout_ms=REPORT_MS)
+
+# ---------------- courses ----------------
+
+COURSE_ENROLLMENT_TREND = catalog.define('metrics.course_enrollment_trend', '''
+    SELECT s.year AS period, COUNT(*) AS enrollment
+    FROM students_courses sc
+    JOIN students s ON s.userId = sc.studentId
+    WHERE sc.courseId = %(course)s
+    GROUP BY s.year
+    ORDER BY s.year
+''', reads=('students_courses', 'students'), timeout_ms=LOOKUP_MS)
+
+COURSE_BUDGETS = catalog.define('metrics.course_budgets', '''
+    SELECT id AS course_id, name AS course_name, COALESCE(budget, 0) AS budget
+    FROM courses
+    {where}
+    ORDER BY name
+''', reads=('courses',), filters=_COLLEGE, timeout_ms=LOOKUP_MS)
+
+COURSE_ENROLLMENTS = catalog.define('metrics.course_enrollments', '''
+    SELECT id AS course_id, name AS course_name, COALESCE(enrollment, 0) AS enrolled_students
+    FROM courses
+    {where}
+    ORDER BY enrolled_students DESC, name
+''', reads=('courses',), filters=_COLLEGE, timeout_ms=LOOKUP_MS)
+
+COURSE_STUDENTS = catalog.define('metrics.course_students', '''
+    SELECT s.userId,
+           u.firstName,
+           u.lastName,
+           s.gpa,
+           sr.ranking AS school_rank
+    FROM students_courses sc
+    JOIN students s ON s.userId = sc.studentId
+    JOIN users   u  ON u.userId = s.userId
+    LEFT JOIN school_rankings sr ON s.college = sr.schoolName
+    WHERE sc.courseId = %(course)s AND s.gpa >= %(gpa_min)s
+    ORDER BY s.gpa DESC, u.lastName, u.firstName
+    LIMIT 100
+''', reads=('students_courses', 'students', 'users', 'school_rankings'), timeout_ms=LOOKUP_MS)
+
+# Per-course statistics (metrics/course_stats.py). COURSE_STATS covers
+# every course; COURSE_STATS_SCOPED applies its filters to courses and
+# pushes them into both derived tables, so a dean's page only
+# aggregates that college's rows. Both forms share one template.
+_COURSE_STATS = '''
+    SELECT c.id          AS course_id,
+           c.name        AS course_name,
+           c.college,
+           c.time,
+           c.professorId,
+           c.budget,
+           c.enrollment,
+           COALESCE(e.enrolled, 0)     AS enrolled,
+           COALESCE(p.instructors, 0)  AS instructors,
+           e.average_gpa,
+           ((c.professorId IS NULL) OR p.courseId IS NULL) AS is_vacant,
+           COALESCE(l.donations, 0)    AS donations,
+           COALESCE(l.expenses, 0)     AS expenses
+    FROM courses c
+    LEFT JOIN (SELECT sc.courseId, COUNT(*) AS enrolled, ROUND(AVG(s.gpa), 2) AS average_gpa
+               FROM students_courses sc
+               JOIN students s ON s.userId = sc.studentId
+               {scoped_sc}
+               GROUP BY sc.courseId) e ON e.courseId = c.id
+    LEFT JOIN (SELECT pc.courseId, COUNT(*) AS instructors
+               FROM professors_courses pc
+               {scoped_pc}
+               GROUP BY pc.courseId) p ON p.courseId = c.id
+    LEFT JOIN course_finance_ledger l ON l.courseId = c.id
+    {where}
+    ORDER BY c.name
+'''
+
+# every {where} is replaced, so the filters land in the subqueries too
+_COURSE_SCOPE = "WHERE {alias}.courseId IN (SELECT c.id FROM courses c {{where}})"
+
+_COURSE_STATS_READS = ('courses', 'students_courses', 'students', 'professors_courses', 'course_finance_ledger')
+
+COURSE_STATS = catalog.define('metrics.course_stats', _COURSE_STATS.format(
+    scoped_sc='', scoped_pc='', where='{where}'), reads=_COURSE_STATS_READS, timeout_ms=REPORT_MS)
+
+COURSE_STATS_SCOPED = catalog.define('metrics.course_stats_scoped', _COURSE_STATS.format(
+    scoped_sc=_COURSE_SCOPE.format(alias='sc'), scoped_pc=_COURSE_SCOPE.format(alias='pc'), where='{where}'),
+    reads=_COURSE_STATS_READS + ('colleges',), filters={
+        'college': "c.college = %(college)s",
+        'dean_id': "c.college = (SELECT collegeName FROM colleges WHERE dean = %(dean_id)s LIMIT 1)",
+        'course_ids': "c.id IN %(course_ids)s",
+    }, timeout_ms=REPORT_MS)
+
+# ---------------- deans ----------------
+
+DEAN_COLLEGE = catalog.define('metrics.dean_college', '''
+    SELECT c.collegeName FROM colleges c WHERE c.dean = %(dean)s LIMIT 1
+''', reads=('colleges',), timeout_ms=LOOKUP_MS)
+
+ENROLLMENT_TOTAL = catalog.define('metrics.enrollment_total', '''
+    SELECT COUNT(*) AS totalEnrollment
+    FROM students s
+    WHERE s.college = %(college)s
+''', reads=('students',), timeout_ms=LOOKUP_MS)
+
+# every course of the college in one GROUP BY instead of one call per course
+ENROLLMENT_TRENDS = catalog.define('metrics.enrollment_trends', '''
+    SELECT sc.courseId AS course_id, s.year AS period, COUNT(*) AS enrollment
+    FROM courses c
+    JOIN students_courses sc ON sc.courseId = c.id
+    JOIN students s ON s.userId = sc.studentId
+    WHERE c.college = %(college)s
+    GROUP BY sc.courseId, s.year
+    ORDER BY sc.courseId, s.year
+''', reads=('courses', 'students_courses', 'students'), timeout_ms=REPORT_MS)
+
+PLACEMENT_SUMMARY = catalog.define('metrics.placement_summary', '''
+    SELECT
+        COUNT(*) AS totalAlumni,
+        SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) AS placed,
+        ROUND(100 * SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0), 2) AS placementRate
+    FROM alumni a
+    JOIN students s ON s.userId = a.studentId
+    WHERE s.college = %(college)s
+''', reads=('alumni', 'students'), timeout_ms=REPORT_MS)
+
+PLACEMENT_BY_COURSE = catalog.define('metrics.placement_by_course', '''
+    SELECT
+        c.id AS courseId,
+        c.name AS courseName,
+        COUNT(*) AS alumniCount,
+        SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) AS placed,
+        ROUND(100 * SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0), 2) AS placementRate,
+        ROUND(AVG(s.gpa), 2) AS avgGpa
+    FROM alumni a
+    JOIN students s         ON s.userId = a.studentId
+    JOIN students_courses sc ON sc.studentId = a.studentId
+    JOIN courses c          ON c.id = sc.courseId
+    WHERE c.college = %(college)s
+    GROUP BY c.id, c.name
+    ORDER BY placementRate DESC, alumniCount DESC, c.name
+''', reads=('alumni', 'students', 'students_courses', 'courses'), timeout_ms=REPORT_MS)
+
+PLACEMENT_BY_YEAR = catalog.define('metrics.placement_by_year', '''
+    SELECT
+        s.year AS year,
+        COUNT(*) AS alumniCount,
+        SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) AS placed,
+        ROUND(100 * SUM(CASE WHEN a.hasJob THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0), 2) AS placementRate
+    FROM alumni a
+    JOIN students s ON s.userId = a.studentId
+    WHERE s.college = %(college)s
+    GROUP BY s.year
+    ORDER BY s.year
+''', reads=('alumni', 'students'), timeout_ms=REPORT_MS)
+
+# ---------------- budget ----------------
+
+# one row per college from the rollup; ?college narrows it to one
+COLLEGE_LEDGER = catalog.define('metrics.college_ledger', '''
+    SELECT collegeName, totalBudget, totalDonations, budgetUsed, remaining
+    FROM college_finance_ledger
+    {where}
+    ORDER BY collegeName
+''', reads=('college_finance_ledger',), filters={'college': "collegeName = %(college)s"},
+    timeout_ms=LOOKUP_MS)
+
+COURSE_FINANCES = catalog.define('metrics.course_finances', '''
+    SELECT
+        c.id AS courseId,
+        c.name AS courseName,
+        COALESCE(c.budget, 0) AS allocated,
+        COALESCE(l.donations, 0) AS donations,
+        COALESCE(l.expenses, 0) AS used,
+        (COALESCE(c.budget,0) + COALESCE(l.donations,0)) AS total,
+        CASE
+          WHEN (COALESCE(c.budget,0) + COALESCE(l.donations,0)) > 0
+          THEN ROUND(100 * COALESCE(l.expenses,0)
+                     / (COALESCE(c.budget,0) + COALESCE(l.donations,0)), 2)
+          ELSE NULL
+        END AS usedPct
+    FROM courses c
+    LEFT JOIN course_finance_ledger l ON l.courseId = c.id
+    WHERE c.college = %(college)s
+    ORDER BY c.name
+''', reads=('courses', 'course_finance_ledger'), timeout_ms=LOOKUP_MS)
+
+COURSE_REMAINING = catalog.define('metrics.course_remaining', '''
+    SELECT
+        c.college AS collegeName,
+        c.name,
+        COALESCE(c.budget, 0) AS budget,
+        COALESCE(l.expenses, 0) AS budgetUsed,
+        (COALESCE(c.budget, 0) - COALESCE(l.expenses, 0)) AS remaining
+    FROM courses c
+    LEFT JOIN course_finance_ledger l ON l.courseId = c.id
+    ORDER BY c.college, remaining ASC
+''', reads=('courses', 'course_finance_ledger'), timeout_ms=LOOKUP_MS)
+
+DONATIONS = catalog.define('metrics.donations', '''
+    SELECT
+        d.donorName AS donor,
+        d.amount AS amount,
+        d.donatedAt AS date,
+        c.name AS courseName
+    FROM course_donations d
+    JOIN courses c ON c.id = d.courseId
+    WHERE c.college = %(college)s
+    ORDER BY d.donatedAt DESC, d.donationId DESC
+    LIMIT %(limit)s
+''', reads=('course_donations', 'courses'), timeout_ms=LOOKUP_MS)
+
+DONATIONS_BY_COURSE = catalog.define('metrics.donations_by_course', '''
+    SELECT
+        c.name AS courseName,
+        COALESCE(l.donations, 0) AS donations
+    FROM courses c
+    LEFT JOIN course_finance_ledger l ON l.courseId = c.id
+    WHERE c.college = %(college)s
+    ORDER BY donations DESC, c.name
+''', reads=('courses', 'course_finance_ledger'), timeout_ms=LOOKUP_MS)
+
+# Spending per day / per month from the rollups, per college. Only
+# the buckets inside [start, end] are read; either bound may be absent.
+_SPENDING_FILTERS = {
+    'college': "college = %(college)s",
+    'start': "{bucket} >= %(start)s",
+    'end': "{bucket} <= %(end)s",
+}
+
+SPENDING_DAILY = catalog.define('metrics.spending_daily', '''
+    SELECT college AS collegeName, day AS period, SUM(amount) AS spending
+    FROM spending_daily
+    {where}
+    GROUP BY college, day
+    ORDER BY college, day
+''', reads=('spending_daily',), where=("expenseCount <> 0",),
+    filters=dict((k, v.format(bucket='day')) for k, v in _SPENDING_FILTERS.items()), timeout_ms=REPORT_MS)
+
+SPENDING_MONTHLY = catalog.define('metrics.spending_monthly', '''
+    SELECT college AS collegeName, DATE_FORMAT(month, '%%Y-%%m-01') AS period, SUM(amount) AS spending
+    FROM spending_monthly
+    {where}
+    GROUP BY college, month
+    ORDER BY college, month
+''', reads=('spending_monthly',), where=("expenseCount <> 0",),
+    filters=dict((k, v.format(bucket='month')) for k, v in _SPENDING_FILTERS.items()), timeout_ms=REPORT_MS)
@@ -0,0 +1,37 @@
+-- Secondary indexes for the hot query paths.
+--
+-- InnoDB already indexes every foreign key column, so students.advisor,
+-- students_courses.courseId and professors_courses.courseId have an index
+-- from 000_BachEndDatabase.sql. The plans below include them anyway so
+-- the recorded EXPLAINs show every hot path. The indexes here cover what
+-- the foreign keys do not: the column a filter is followed by (year, gpa,
+-- submitted, spentAt) and the columns that have no index at all.
+--
+-- explain: SELECT s.year, COUNT(*) FROM students s WHERE s.college = 'College of Jazz' GROUP BY s.year
+-- explain: SELECT college, ROUND(gpa * 100) AS cents, COUNT(*) FROM students WHERE gpa IS NOT NULL GROUP BY college, cents
+-- explain: SELECT u.emailAddress FROM advisors a JOIN users u ON u.userId = a.userId JOIN students s ON a.userId = s.advisor WHERE s.userId = 1
+-- explain: SELECT COUNT(*) FROM students_courses sc JOIN students s ON s.userId = sc.studentId WHERE sc.courseId = 1
+-- explain: SELECT pc.courseId, COUNT(*) FROM professors_courses pc WHERE pc.courseId IN (1, 2, 3) GROUP BY pc.courseId
+-- explain: SELECT mr.orderId, mr.submitted FROM maintenance_request mr WHERE mr.studentId = 1 ORDER BY mr.submitted DESC, mr.orderId DESC LIMIT 25
+-- explain: SELECT mr.orderId, mr.submitted FROM maintenance_request mr WHERE mr.maintenanceStaffId = 1 ORDER BY mr.submitted DESC LIMIT 25
+-- explain: SELECT e.courseId, SUM(e.amount) FROM course_expenses e WHERE e.courseId = 1 AND e.spentAt >= '2024-01-01' GROUP BY e.courseId
+-- explain: SELECT r.rentalID FROM rentals r WHERE r.returnDate < CURDATE()
+-- explain: SELECT lastMaintained, roomNumber FROM classrooms WHERE lastMaintained < DATE_SUB(NOW(), INTERVAL 2 MONTH) ORDER BY lastMaintained
+
+-- enrollment trends and demographics per college (replaces the FK index on college)
+CREATE INDEX idx_students_college_year ON students (college, year);
+-- GPA averages / distributions per college, read from the index alone
+CREATE INDEX idx_students_college_gpa ON students (college, gpa);
+
+-- a student's / a staff member's requests, newest first
+CREATE INDEX idx_maintenance_request_student_submitted ON maintenance_request (studentId, submitted);
+CREATE INDEX idx_maintenance_request_staff_submitted ON maintenance_request (maintenanceStaffId, submitted);
+
+-- per-course spending over a date range
+CREATE INDEX idx_course_expenses_course_spent ON course_expenses (courseId, spentAt);
+
+-- overdue rentals
+CREATE INDEX idx_rentals_return_date ON rentals (returnDate);
+
+-- classrooms due for maintenance
+CREATE INDEX idx_classrooms_last_maintained ON classrooms (lastMaintained);
@@ -0,0 +1,304 @@
+###
+# Versioned schema migrations on top of database-files/.
+#
+# database-files/ builds the schema when the MySQL container is first
+# created. Changes after that live here as NNNN_name.sql, applied in
+# version order and recorded in `schema_migrations`, so each database
+# gets every migration exactly once:
+#
+#   cd api && python -m backend.migrations.migrate status
+#   cd api && python -m backend.migrations.migrate up [--to N]
+#   cd api && python -m backend.migrations.migrate plans [N]
+#
+# Migrations must be safe to re-run: MySQL DDL commits as it goes, so
+# a migration that fails halfway is retried from the top. Errors that
+# only mean "already done" (duplicate index / table / column, nothing
+# to drop) are skipped for that reason. DELIMITER lines work as in the
+# mysql client, so trigger files can be migrations too.
+#
+# A migration can list queries in "-- explain: <query>" comment lines.
+# Their EXPLAIN output is stored in `schema_migration_plans` before and
+# after the migration runs, and `plans` prints what changed per table,
+# e.g. ALL -> ref.
+###
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import pymysql
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+_EXPLAIN = re.compile(r'^\s*--\s*explain:\s*(.+?)\s*;?\s*$', re.IGNORECASE | re.MULTILINE)
+_DELIMITER = re.compile(r'^\s*DELIMITER\s+(\S+)\s*$', re.IGNORECASE)
+
+# "already done": duplicate key name, table exists, duplicate column,
+# can't drop (doesn't exist), trigger exists, duplicate foreign key
+ALREADY_APPLIED = {1061, 1050, 1060, 1091, 1359, 1826}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version    INT PRIMARY KEY,
+        name       VARCHAR(255) NOT NULL,
+        checksum   CHAR(64)     NOT NULL,
+        appliedAt  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        durationMs INT          NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schema_migration_plans (
+        version   INT                      NOT NULL,
+        phase     ENUM('before', 'after')  NOT NULL,
+        queryNo   INT                      NOT NULL,
+        query     TEXT                     NOT NULL,
+        plan      JSON                     NOT NULL,
+        recordedAt DATETIME                NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (version, phase, queryNo)
+    )
+    """,
+)
+
+_LOCK = 'schema_migrations'
+
+
+class Migration(object):
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+
+    @property
+    def statements(self):
+        return split_statements(self.sql)
+
+    @property
+    def explain(self):
+        return _EXPLAIN.findall(self.sql)
+
+
+def discover(directory=HERE):
+    """Migrations in `directory`, ordered by version."""
+    found = []
+    for filename in os.listdir(directory):
+        match = _FILE.match(filename)
+        if match:
+            found.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    found.sort(key=lambda m: m.version)
+    for a, b in zip(found, found[1:]):
+        if a.version == b.version:
+            raise ValueError("two migrations numbered %04d: %s, %s" % (a.version, a.path, b.path))
+    return found
+
+
+def split_statements(sql):
+    """Statements of a SQL script, without comments. Understands quotes,
+    -- / # / /* */ comments and mysql-client DELIMITER lines."""
+    statements, current = [], []
+    delimiter = ';'
+    i, n = 0, len(sql)
+    at_line_start = True
+    while i < n:
+        if at_line_start:
+            end = sql.find('\n', i)
+            line = sql[i:n if end < 0 else end]
+            match = _DELIMITER.match(line)
+            if match:
+                delimiter = match.group(1)
+                i = n if end < 0 else end + 1
+                continue
+            at_line_start = False
+        ch = sql[i]
+        if ch in '\'"`':
+            j = i + 1
+            while j < n and sql[j] != ch:
+                j += 2 if sql[j] == '\\' else 1
+            current.append(sql[i:j + 1])
+            i = j + 1
+        elif sql.startswith('--', i) and (i + 2 >= n or sql[i + 2] in ' \t\r\n') or ch == '#':
+            end = sql.find('\n', i)
+            i = n if end < 0 else end
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+        elif sql.startswith(delimiter, i):
+            statements.append(''.join(current))
+            current = []
+            i += len(delimiter)
+        else:
+            if ch == '\n':
+                at_line_start = True
+            current.append(ch)
+            i += 1
+    statements.append(''.join(current))
+    return [s.strip() for s in statements if s.strip()]
+
+
+def ensure_schema(conn):
+    with conn.cursor() as cur:
+        for ddl in _SCHEMA:
+            cur.execute(ddl)
+    conn.commit()
+
+
+def applied(conn):
+    """{version: row} of the migrations recorded in schema_migrations."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT version, name, checksum, appliedAt, durationMs FROM schema_migrations")
+        return dict((row['version'], row) for row in cur.fetchall())
+
+
+def explain(conn, query):
+    """Traditional EXPLAIN rows for `query`, or {"error": ...} if it cannot be explained."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute("EXPLAIN " + query)
+            return list(cur.fetchall())
+    except pymysql.MySQLError as e:
+        return {'error': str(e)}
+
+
+def record_plans(conn, migration, phase):
+    # a retried migration keeps the plans from before its first attempt
+    verb = 'INSERT IGNORE' if phase == 'before' else 'REPLACE'
+    with conn.cursor() as cur:
+        for number, query in enumerate(migration.explain, 1):
+            plan = explain(conn, query)
+            cur.execute(
+                verb + " INTO schema_migration_plans (version, phase, queryNo, query, plan) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                (migration.version, phase, number, query, json.dumps(plan, default=str)))
+    conn.commit()
+
+
+def apply(conn, migration, log=print):
+    """Run one migration's statements and record it."""
+    record_plans(conn, migration, 'before')
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for statement in migration.statements:
+            try:
+                cur.execute(statement)
+            except pymysql.MySQLError as e:
+                if e.args and e.args[0] in ALREADY_APPLIED:
+                    log("  skipped (already applied): %s" % e.args[1])
+                    continue
+                conn.rollback()
+                raise
+        conn.commit()
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, durationMs) VALUES (%s, %s, %s, %s)",
+            (migration.version, migration.name, migration.checksum,
+             int((time.perf_counter() - started) * 1000)))
+    conn.commit()
+    record_plans(conn, migration, 'after')
+
+
+def up(conn, target=None, log=print):
+    """Apply every pending migration up to `target` (all if None), in order."""
+    ensure_schema(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT GET_LOCK(%s, 60) AS locked", (_LOCK,))
+        if not cur.fetchone()['locked']:
+            raise RuntimeError("another migration run holds the %r lock" % _LOCK)
+    try:
+        done = applied(conn)
+        count = 0
+        for migration in discover():
+            if target is not None and migration.version > target:
+                break
+            if migration.version in done:
+                continue
+            log("applying %04d_%s" % (migration.version, migration.name))
+            apply(conn, migration, log)
+            count += 1
+        return count
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK,))
+
+
+def _access(plan):
+    """table -> "type key rows=N [filesort] [temporary]" for each row of a stored EXPLAIN."""
+    if isinstance(plan, dict):
+        return {'(error)': plan.get('error')}
+    access = {}
+    for row in plan:
+        extra = row.get('Extra') or ''
+        notes = [w for w, flag in (('filesort', 'Using filesort'), ('temporary', 'Using temporary')) if flag in extra]
+        access[row.get('table')] = ' '.join(
+            ['%s %s rows=%s' % (row.get('type'), row.get('key') or '-', row.get('rows'))] + notes)
+    return access
+
+
+def plan_changes(conn, version):
+    """[(query, {table: (before, after)})] from schema_migration_plans."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT phase, queryNo, query, plan FROM schema_migration_plans "
+                    "WHERE version = %s ORDER BY queryNo", (version,))
+        rows = cur.fetchall()
+    queries = {}
+    for row in rows:
+        plan = row['plan'] if not isinstance(row['plan'], str) else json.loads(row['plan'])
+        entry = queries.setdefault(row['queryNo'], [row['query'], {}, {}])
+        entry[1 if row['phase'] == 'before' else 2] = _access(plan)
+    changes = []
+    for number in sorted(queries):
+        query, before, after = queries[number]
+        tables = list(before) + [t for t in after if t not in before]
+        changes.append((query, dict((t, (before.get(t), after.get(t))) for t in tables)))
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help='list migrations and whether they are applied')
+    up_parser = sub.add_parser('up', help='apply pending migrations')
+    up_parser.add_argument('--to', type=int, help='stop after this version')
+    plans_parser = sub.add_parser('plans', help='EXPLAIN before/after a migration')
+    plans_parser.add_argument('version', type=int, nargs='?', help='default: the latest applied')
+    args = parser.parse_args(argv)
+
+    from backend.db_connection import db
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        conn = db.get_db()
+        ensure_schema(conn)
+        if args.command == 'up':
+            count = up(conn, args.to)
+            print("%d migration(s) applied" % count)
+            return 0
+
+        done = applied(conn)
+        if args.command == 'status':
+            for migration in discover():
+                row = done.get(migration.version)
+                state = 'pending'
+                if row is not None:
+                    state = 'applied %s' % row['appliedAt']
+                    if row['checksum'] != migration.checksum:
+                        state += '  (file changed since it was applied)'
+                print("%04d_%-30s %s" % (migration.version, migration.name, state))
+            return 0
+
+        version = args.version if args.version is not None else max(done or [0])
+        for query, tables in plan_changes(conn, version):
+            print(query)
+            for table, (before, after) in tables.items():
+                print("    %-24s %-40s -> %s" % (table, before, after))
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#------------------------------------------------------------
+# Many GETs in one HTTP round trip.
+#
+#   POST /api/_batch
+#   {"requests": [{"path": "/students/7/clubs"},
+#                 {"path": "/clubs", "params": {"page": 2}}]}
+#
+# Each item is dispatched in-process through the normal Flask
+# pipeline (before/after-request hooks, routing, error handlers,
+# teardown), in its own app and request context, so it checks out its own
+# pooled connection and is counted under its own endpoint in
+# /api/_metrics. Items run concurrently on a small thread pool.
+#
+# Results come back in request order as {path, status, body}. A JSON
+# body is spliced into the batch response as the bytes the route
+# produced, so it is neither parsed nor encoded a second time.
+#------------------------------------------------------------
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from flask import current_app
+
+PREFIX = '/api'
+
+
+class BatchError(ValueError):
+    """The batch itself is malformed (answered with 400)."""
+
+
+def parse(payload, max_items):
+    """[(path, query string)] from a POST body, or BatchError."""
+    items = payload.get('requests') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise BatchError('expected {"requests": [{"path": ..., "params": {...}}, ...]}')
+    if len(items) > max_items:
+        raise BatchError('at most %d requests per batch' % max_items)
+    parsed = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict):
+            raise BatchError('each request must be an object or a path')
+        path, params = item.get('path'), item.get('params') or {}
+        if not isinstance(path, str) or not path.startswith('/') or not isinstance(params, dict):
+            raise BatchError('each request needs a "path" starting with / and optional "params" object')
+        if not path.startswith(PREFIX + '/'):
+            path = PREFIX + path
+        path, _, query = path.partition('?')
+        if path.rstrip('/') == PREFIX + '/_batch':
+            raise BatchError('batches cannot be nested')
+        # list values repeat the parameter (?college=A&college=B)
+        query = '&'.join(q for q in (query, urlencode(params, doseq=True)) if q)
+        parsed.append((path, query))
+    return parsed
+
+
+def _dispatch(app, path, query):
+    # a fresh app context too: a request context pushed on the batch
+    # request's own thread would otherwise share its `g` (timings, query
+    # stats, pooled connection) and tear it down
+    with app.app_context(), app.test_request_context(path, method='GET', query_string=query):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            # what the WSGI layer would have done with an unhandled error
+            response = app.make_response(app.handle_exception(e))
+        body = response.get_data()
+        if not body:
+            body = b'null'
+        elif not response.is_json:
+            body = app.json.dumps(response.get_data(as_text=True)).encode()
+        return response.status_code, body
+
+
+def _item(app, path, status, body):
+    head = app.json.dumps({'path': path, 'status': status}).encode()
+    return head[:-1] + b',"body":' + body + b'}'
+
+
+def run(items, workers):
+    """The batch response body (bytes) for [(path, query string)]."""
+    app = current_app._get_current_object()
+    workers = max(1, min(workers, len(items)))
+    if workers == 1:
+        results = [_dispatch(app, path, query) for path, query in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as pool:
+            results = list(pool.map(lambda item: _dispatch(app, *item), items))
+    parts = [_item(app, path + ('?' + query if query else ''), status, body)
+             for (path, query), (status, body) in zip(items, results)]
+    return b'{"responses":[' + b','.join(parts) + b']}'
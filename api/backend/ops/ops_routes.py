@@ -0,0 +1,120 @@
+import math
+
+from flask import Blueprint, Response, current_app, jsonify, make_response, request
+from backend.analytics.facets import facet_index
+from backend.analytics.snapshot import student_snapshot
+from backend.db_connection import catalog, db
+from backend.ops import batch
+from backend.ops.request_metrics import request_metrics
+from backend.responses.singleflight import single_flight
+from backend.responses.swr import swr_cache
+
+# Blueprint for operational endpoints (pool sizing, diagnostics)
+ops_api = Blueprint('ops_api', __name__)
+
+# Blueprint for orchestrator probes, mounted at the root (no /api prefix)
+health_api = Blueprint('health_api', __name__)
+
+# endpoints that must answer while the database is still coming up
+_ALWAYS_AVAILABLE = {'health_api.healthz', 'health_api.readyz', 'ops_api.worker_stats',
+                     'ops_api.prometheus_metrics', 'static'}
+
+
+def _not_ready():
+    response = make_response(jsonify({'status': 'starting', 'error': 'database not ready'}))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, math.ceil(db.retry_after)))
+    return response
+
+# ------------------------------------------------------------
+# Until this worker's pool is warm, every other route fails fast
+@health_api.before_app_request
+def require_db_ready():
+    if not db.ready and request.endpoint not in _ALWAYS_AVAILABLE:
+        return _not_ready()
+
+# ------------------------------------------------------------
+# GET /healthz
+# Purpose: Liveness probe; the process is up and serving
+@health_api.route('/healthz', methods=['GET'])
+def healthz():
+    response = make_response(jsonify({'status': 'ok'}))
+    response.status_code = 200
+    return response
+
+# ------------------------------------------------------------
+# GET /readyz
+# Purpose: Readiness probe; 200 once the DB pool is connected and warm
+@health_api.route('/readyz', methods=['GET'])
+def readyz():
+    if not db.ready:
+        return _not_ready()
+    response = make_response(jsonify({'status': 'ready'}))
+    response.status_code = 200
+    return response
+
+# ------------------------------------------------------------
+# GET /api/_stats
+# Purpose: Live pool, cache and coalescing stats for this worker process
+@ops_api.route('/_stats', methods=['GET'])
+def worker_stats():
+    response = make_response(jsonify({
+        'pool': db.stats(),
+        'query_cache': db.cache.stats(),
+        'query_budget': db.budget.stats(),
+        'single_flight': single_flight.stats(),
+        'stale_while_revalidate': swr_cache.stats(),
+        'students_snapshot': student_snapshot.stats(),
+        'students_facet_index': facet_index.stats(),
+        'named_queries': catalog.stats(),
+    }))
+    response.status_code = 200
+    return response
+
+# ------------------------------------------------------------
+# GET /api/_metrics
+# Purpose: Prometheus scrape target for this worker process
+@ops_api.route('/_metrics', methods=['GET'])
+def prometheus_metrics():
+    pool = db.stats()
+    extra = [
+        ('api_db_pool_connections', 'gauge', 'Pooled MySQL connections by state.',
+         [({'state': 'in_use'}, pool.get('in_use', 0)), ({'state': 'idle'}, pool.get('idle', 0))]),
+        ('api_db_pool_checkouts_total', 'counter', 'Connections handed out by the pool.',
+         [({}, pool.get('checkouts', 0))]),
+        ('api_db_pool_timeouts_total', 'counter', 'Checkouts that gave up waiting for a connection.',
+         [({}, pool.get('timeouts', 0))]),
+        ('api_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a pooled connection.',
+         [({}, pool.get('wait_time_total_ms', 0) / 1000.0)]),
+    ]
+    cache = db.cache.stats()
+    extra.append(('api_query_cache_lookups_total', 'counter', 'Query cache lookups by result.',
+                  [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]))
+    flight = single_flight.stats()
+    extra.append(('api_single_flight_coalesced_total', 'counter', 'Requests served from another in-flight execution.',
+                  [({}, flight['coalesced'])]))
+    swr = swr_cache.stats()
+    extra.append(('api_swr_responses_total', 'counter', 'Stale-while-revalidate lookups by result.',
+                  [({'result': k}, swr[k]) for k in ('fresh', 'stale', 'miss', 'too_stale')]))
+    named = sorted(catalog.stats().items())
+    extra.append(('api_named_query_calls_total', 'counter', 'Named query executions by result (cache hit or MySQL).',
+                  [({'query': n, 'result': r}, v) for n, q in named
+                   for r, v in (('hit', q['hits']), ('mysql', q['calls'] - q['hits']))]))
+    extra.append(('api_named_query_seconds_total', 'counter', 'Time spent in MySQL per named query.',
+                  [({'query': n}, q['seconds']) for n, q in named]))
+    extra.append(('api_named_query_rows_total', 'counter', 'Rows returned by MySQL per named query.',
+                  [({'query': n}, q['rows']) for n, q in named]))
+    return Response(request_metrics.render(extra), status=200, mimetype='text/plain; version=0.0.4')
+
+# ------------------------------------------------------------
+# POST /api/_batch
+# Purpose: Run several GETs in-process and return every result in one response
+@ops_api.route('/_batch', methods=['POST'])
+def run_batch():
+    try:
+        items = batch.parse(request.get_json(silent=True), int(current_app.config['BATCH_MAX_REQUESTS']))
+    except batch.BatchError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    current_app.logger.info("POST /_batch : %d request(s)", len(items))
+    body = batch.run(items, int(current_app.config['BATCH_WORKERS']))
+    return Response(body, status=200, mimetype='application/json')
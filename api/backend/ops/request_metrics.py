@@ -0,0 +1,191 @@
+#------------------------------------------------------------
+# Per-request timing, exposed in Prometheus text format.
+#
+# For every request we record, per blueprint and endpoint: the
+# latency histogram, time spent in MySQL, queries issued, rows
+# fetched and response bytes, plus a request count per status.
+#
+# Request threads only ever touch their own counters (a
+# threading.local registered once per thread), so the hot path
+# takes no lock. A scrape walks every thread's counters and adds
+# them up; counters of threads that have exited are folded into
+# a retired total so they are not lost. Counters are per worker
+# process.
+#------------------------------------------------------------
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+from backend.db_connection import request_query_stats
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# slots of a series list; histogram bucket counts follow (one per bucket + Inf)
+COUNT, SECONDS, DB_SECONDS, QUERIES, ROWS, BYTES = range(6)
+_FIRST_BUCKET = 6
+
+
+def _new_series():
+    return [0, 0.0, 0.0, 0, 0, 0] + [0] * (len(BUCKETS) + 1)
+
+
+class _ThreadCounters(object):
+    __slots__ = ('thread', 'series', 'statuses')
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.series = {}    # (blueprint, endpoint) -> series list
+        self.statuses = {}  # (blueprint, endpoint, method, status) -> count
+
+
+class RequestMetrics(object):
+    def __init__(self):
+        self._local = threading.local()
+        self._registry = []
+        self._registry_lock = threading.Lock()
+        self._retired = _ThreadCounters()
+        self._scrape_lock = threading.Lock()
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    # ------------------------------------------------------------
+    # hot path
+    def _counters(self):
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = _ThreadCounters()
+            with self._registry_lock:
+                self._registry.append(counters)
+        return counters
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        blueprint = request.blueprint or ''
+        counters = self._counters()
+
+        series = counters.series.get((blueprint, endpoint))
+        if series is None:
+            series = counters.series[(blueprint, endpoint)] = _new_series()
+        series[COUNT] += 1
+        series[SECONDS] += elapsed
+        series[_FIRST_BUCKET + bisect_left(BUCKETS, elapsed)] += 1
+        db_stats = request_query_stats()
+        if db_stats is not None:
+            series[DB_SECONDS] += db_stats.seconds
+            series[QUERIES] += db_stats.queries
+            series[ROWS] += db_stats.rows
+        # streamed bodies have no length up front and are not counted
+        if not response.is_streamed:
+            series[BYTES] += response.content_length or 0
+
+        key = (blueprint, endpoint, request.method, response.status_code)
+        counters.statuses[key] = counters.statuses.get(key, 0) + 1
+        return response
+
+    # ------------------------------------------------------------
+    # scrape
+    @staticmethod
+    def _copy(mapping):
+        # the owning thread may add a key while we copy; just try again
+        while True:
+            try:
+                return [(k, list(v) if isinstance(v, list) else v) for k, v in list(mapping.items())]
+            except RuntimeError:
+                continue
+
+    @staticmethod
+    def _merge(into, items, statuses):
+        for key, values in items:
+            if statuses:
+                into[key] = into.get(key, 0) + values
+            else:
+                total = into.get(key)
+                if total is None:
+                    into[key] = list(values)
+                else:
+                    for i, v in enumerate(values):
+                        total[i] += v
+
+    def collect(self):
+        """Aggregated (series, statuses) across every thread of this process."""
+        with self._scrape_lock:
+            with self._registry_lock:
+                registry = list(self._registry)
+            series, statuses = {}, {}
+            self._merge(series, self._copy(self._retired.series), False)
+            self._merge(statuses, self._copy(self._retired.statuses), True)
+            finished = []
+            for counters in registry:
+                items, status_items = self._copy(counters.series), self._copy(counters.statuses)
+                self._merge(series, items, False)
+                self._merge(statuses, status_items, True)
+                if not counters.thread.is_alive():
+                    self._merge(self._retired.series, items, False)
+                    self._merge(self._retired.statuses, status_items, True)
+                    finished.append(counters)
+            if finished:
+                with self._registry_lock:
+                    self._registry = [c for c in self._registry if c not in finished]
+            return series, statuses
+
+    def render(self, extra=None):
+        """Prometheus text exposition (format 0.0.4)."""
+        series, statuses = self.collect()
+        lines = []
+
+        def header(name, kind, text):
+            lines.append('# HELP %s %s' % (name, text))
+            lines.append('# TYPE %s %s' % (name, kind))
+
+        def labels(blueprint, endpoint, **extra_labels):
+            pairs = [('blueprint', blueprint), ('endpoint', endpoint)] + sorted(extra_labels.items())
+            return ','.join('%s="%s"' % (k, _escape(v)) for k, v in pairs)
+
+        ordered = sorted(series.items())
+        header('api_requests_total', 'counter', 'Requests handled, by endpoint, method and status.')
+        for (blueprint, endpoint, method, status), count in sorted(statuses.items()):
+            lines.append('api_requests_total{%s} %d' % (labels(blueprint, endpoint, method=method, status=status), count))
+
+        header('api_request_duration_seconds', 'histogram', 'Time from routing to response, excluding streamed bodies.')
+        for (blueprint, endpoint), values in ordered:
+            cumulative = 0
+            for i, bound in enumerate(BUCKETS + (float('inf'),)):
+                cumulative += values[_FIRST_BUCKET + i]
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('api_request_duration_seconds_bucket{%s} %d' % (labels(blueprint, endpoint, le=le), cumulative))
+            lines.append('api_request_duration_seconds_sum{%s} %.6f' % (labels(blueprint, endpoint), values[SECONDS]))
+            lines.append('api_request_duration_seconds_count{%s} %d' % (labels(blueprint, endpoint), values[COUNT]))
+
+        for name, slot, kind, text, fmt in (
+                ('api_db_seconds_total', DB_SECONDS, 'counter', 'Time spent executing MySQL queries.', '%.6f'),
+                ('api_db_queries_total', QUERIES, 'counter', 'MySQL queries issued.', '%d'),
+                ('api_db_rows_total', ROWS, 'counter', 'Rows returned by buffered MySQL queries.', '%d'),
+                ('api_response_bytes_total', BYTES, 'counter', 'Response body bytes, excluding streamed bodies.', '%d')):
+            header(name, kind, text)
+            for (blueprint, endpoint), values in ordered:
+                lines.append(('%s{%s} ' + fmt) % (name, labels(blueprint, endpoint), values[slot]))
+
+        for name, kind, text, samples in (extra or ()):
+            header(name, kind, text)
+            for label_map, value in samples:
+                label_text = ','.join('%s="%s"' % (k, _escape(v)) for k, v in sorted(label_map.items()))
+                lines.append('%s{%s} %s' % (name, label_text, value) if label_text else '%s %s' % (name, value))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_metrics = RequestMetrics()
@@ -1,21 +1,36 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for classroom availability and reservations
 reserves_api = Blueprint('reservations_api', __name__)
 
 # ------------------------------------------------------------
-# GET /api/classrooms[?status=true|false]
+# GET /api/classrooms[?status=true|false][&limit=&after=]
 # Purpose: List classrooms, optionally filter by availability status
 @reserves_api.route('/classrooms', methods=['GET'])
 def classrooms_list():
     status = request.args.get('status')
     params = []
+    conditions = []
     query = "SELECT roomNumber, status, lastMaintained FROM classrooms"
     if status is not None:
-        query += " WHERE status = %s"
+        conditions.append("status = %s")
         params.append(status)
+    page = page_request()
+    if page and page.after:
+        clause, after_params = keyset_predicate(["roomNumber"], page.after)
+        conditions.append(clause)
+        params.extend(after_params)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
     current_app.logger.info("GET /classrooms : status=%s", status)
+    if page:
+        query += order_by(["roomNumber"]) + " LIMIT %s"
+        params.append(page.limit + 1)
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params))
+        return page_response(cursor.fetchall(), page, ["roomNumber"])
     cursor = db.get_db().cursor()
     cursor.execute(query, tuple(params))
     theData = cursor.fetchall()
@@ -0,0 +1,44 @@
+#------------------------------------------------------------
+# Conditional GET for routes whose data rarely changes.
+#
+#   @metrics_api.route('/rankings/compare', methods=['GET'])
+#   @conditional('school_rankings')
+#   def rankings_compare(): ...
+#
+# The ETag is built from the change counters of the tables the
+# route reads (see db_connection/versions.py). A client sending
+# a matching If-None-Match gets 304 before the view runs, so no
+# connection is checked out and MySQL is never asked. A named
+# query (db_connection/catalog.py) stands for the tables it reads.
+#------------------------------------------------------------
+from functools import wraps
+
+from flask import make_response, request
+
+from backend.db_connection import db
+from backend.db_connection.catalog import tables_of
+
+
+def conditional(*tables):
+    """Answer If-None-Match from the versions of `tables` (names or named queries)."""
+    tables = tables_of(tables)
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            # read the versions before the query: a write that lands while
+            # the view runs leaves a stale tag, which only costs a refetch
+            etag = db.versions.etag(tables)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # let clients keep the body but make them ask before reusing it
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
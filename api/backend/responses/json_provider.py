@@ -0,0 +1,111 @@
+#------------------------------------------------------------
+# Fast JSON responses for DictCursor results.
+#
+# Installed on the app in create_app(). With orjson available
+# the rows are encoded straight to UTF-8 bytes in one pass and
+# handed to the Response as-is (Flask's default path builds a
+# str with the stdlib encoder, appends a newline and encodes it
+# again). Without orjson we fall back to Flask's own provider.
+#
+# By default the wire format matches Flask's: Decimal as a
+# string, date/datetime as an RFC 822 HTTP date. Setting
+# JSON_NATIVE_TYPES=True switches to orjson's native ISO 8601
+# dates and plain JSON numbers for Decimal, which is faster
+# still but changes what clients receive.
+#------------------------------------------------------------
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, timezone
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _http_date(d):
+    # same output as werkzeug.http.http_date, without the email.utils detour
+    if isinstance(d, datetime):
+        if d.tzinfo is not None:
+            d = d.astimezone(timezone.utc)
+        hour, minute, second = d.hour, d.minute, d.second
+    else:
+        hour = minute = second = 0
+    return '%s, %02d %s %04d %02d:%02d:%02d GMT' % (
+        _DAYS[d.weekday()], d.day, _MONTHS[d.month - 1], d.year, hour, minute, second)
+
+
+def _flask_compatible(o):
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, date):
+        return _http_date(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _native(o):
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    return _flask_compatible(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson-backed drop-in for Flask's DefaultJSONProvider."""
+
+    native_types = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.native_types = bool(app.config.get('JSON_NATIVE_TYPES', False))
+
+    @property
+    def available(self):
+        return orjson is not None
+
+    def _options(self, indent=False):
+        opts = orjson.OPT_NON_STR_KEYS
+        if not self.native_types:
+            opts |= orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        if indent:
+            opts |= orjson.OPT_INDENT_2
+        return opts
+
+    def dumps_bytes(self, obj, indent=False):
+        """Encode to UTF-8 JSON bytes without an intermediate str."""
+        if orjson is None:
+            return self.dumps(obj).encode('utf-8')
+        default = _native if self.native_types else _flask_compatible
+        return orjson.dumps(obj, default=default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', _native if self.native_types else _flask_compatible)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
@@ -0,0 +1,96 @@
+#------------------------------------------------------------
+# Keyset (cursor) pagination for list endpoints.
+#
+#   GET /api/tools?limit=50             -> first 50 rows
+#   GET /api/tools?limit=50&after=<c>   -> the 50 rows after cursor <c>
+#
+# The body stays a plain JSON array so existing callers keep
+# working; the cursor for the following page comes back in the
+# X-Next-Cursor header (and a Link rel="next" header). Pages
+# seek on the ORDER BY key instead of using OFFSET, so every
+# page costs the same no matter how deep it is. Without a
+# `limit` the routes return every row, as before.
+#------------------------------------------------------------
+import base64
+import json
+from urllib.parse import urlencode
+
+from flask import abort, jsonify, make_response, request
+
+MAX_LIMIT = 500
+
+# what a cursor element may be: the JSON scalars that bind as SQL params
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class PageRequest(object):
+    def __init__(self, limit, after):
+        self.limit = limit
+        self.after = after  # decoded key values of the last row seen, or None
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, width):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        values = None
+    if (not isinstance(values, list) or len(values) != width
+            or not all(isinstance(v, _SCALARS) for v in values)):
+        abort(make_response(jsonify({'error': 'invalid pagination cursor'}), 400))
+    return values
+
+
+def page_request(width=1):
+    """Parse ?limit=&after= for a key of `width` columns; None when not paging."""
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    if limit is None and after is None:
+        return None
+    try:
+        limit = int(limit) if limit is not None else 50
+    except ValueError:
+        abort(make_response(jsonify({'error': 'limit must be an integer'}), 400))
+    limit = max(1, min(limit, MAX_LIMIT))
+    return PageRequest(limit, decode_cursor(after, width) if after else None)
+
+
+def keyset_predicate(columns, values, descending=False):
+    """SQL + params selecting rows strictly after `values` in (columns) order.
+
+    Spelled out as OR-ed prefixes, e.g. (a > %s) OR (a = %s AND b > %s),
+    which MySQL turns into a range scan on the leading column."""
+    op = '<' if descending else '>'
+    clauses, params = [], []
+    for i, column in enumerate(columns):
+        parts = ["%s = %%s" % c for c in columns[:i]] + ["%s %s %%s" % (column, op)]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i])
+        params.append(values[i])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def order_by(columns, descending=False):
+    direction = " DESC" if descending else ""
+    return " ORDER BY " + ", ".join(c + direction for c in columns)
+
+
+def page_response(rows, page, key_fields):
+    """Trim the limit+1 probe row and attach the next-page cursor."""
+    rows = list(rows)
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    response = make_response(jsonify(rows))
+    response.status_code = 200
+    if has_more and rows:
+        token = encode_cursor([rows[-1][f] for f in key_fields])
+        response.headers['X-Next-Cursor'] = token
+        args = request.args.to_dict()
+        args.update(limit=str(page.limit), after=token)
+        response.headers['Link'] = '<%s?%s>; rel="next"' % (request.path, urlencode(args))
+    return response
@@ -0,0 +1,116 @@
+#------------------------------------------------------------
+# Single-flight request coalescing.
+#
+# When several identical requests (same endpoint, URL arguments,
+# query string and conditional headers) arrive while one of them
+# is already running, the late ones wait for that execution and
+# get a copy of its response instead of running the same
+# aggregate again. Nothing is kept once the leader finishes, so
+# this never serves anything older than an in-flight request.
+#
+#   coalesce_blueprint(metrics_api)   # every view of the blueprint
+#------------------------------------------------------------
+import threading
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from backend.responses.streaming import stream_format
+
+
+class _Call(object):
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # (body, status, headers), or None when it can't be shared
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    def __init__(self, wait_timeout=30.0):
+        # followers give up waiting after this long and run the view themselves
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = dict(executions=0, coalesced=0, shared_errors=0, unshareable=0, wait_timeouts=0)
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    @staticmethod
+    def request_key():
+        return (request.method, request.endpoint,
+                tuple(sorted((request.view_args or {}).items())),
+                request.query_string,
+                request.headers.get('If-None-Match'),
+                request.headers.get('Accept'))
+
+    def run(self, key, view, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters['executions'] += 1
+            else:
+                call.followers += 1
+
+        if not leader:
+            return self._follow(call, view, *args, **kwargs)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+            if not response.is_streamed:
+                call.result = (response.get_data(), response.status_code, list(response.headers.items()))
+            return response
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.followers:
+                    self._counters['coalesced'] += call.followers
+            call.done.set()
+
+    def _follow(self, call, view, *args, **kwargs):
+        if not call.done.wait(self.wait_timeout):
+            self._count('wait_timeouts')
+            return view(*args, **kwargs)
+        if call.error is not None:
+            self._count('shared_errors')
+            raise call.error
+        if call.result is None:
+            # a streamed body can only be read once; run our own copy
+            self._count('unshareable')
+            return view(*args, **kwargs)
+        body, status, headers = call.result
+        return Response(body, status=status, headers=headers)
+
+    def wrap(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or stream_format():
+                return view(*args, **kwargs)
+            return self.run(self.request_key(), view, *args, **kwargs)
+        return wrapper
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._calls))
+
+
+single_flight = SingleFlight()
+
+
+def coalesce_blueprint(blueprint, flight=single_flight):
+    """Route every view of `blueprint` through `flight` once it is registered."""
+    @blueprint.record_once
+    def _wrap_views(state):
+        prefix = blueprint.name + '.'
+        for endpoint, view in list(state.app.view_functions.items()):
+            if endpoint.startswith(prefix):
+                state.app.view_functions[endpoint] = flight.wrap(view)
@@ -0,0 +1,89 @@
+#------------------------------------------------------------
+# Streaming responses for large result sets.
+#
+# Instead of fetchall() + jsonify(), these helpers run the query
+# on an unbuffered server-side cursor (SSDictCursor) and encode
+# the rows a chunk at a time, so a worker's memory stays flat no
+# matter how many rows come back. Two wire formats:
+#   ?stream=json   -> one JSON array, same shape as the buffered route
+#   ?stream=ndjson -> one JSON object per line (or Accept: application/x-ndjson)
+#------------------------------------------------------------
+from flask import Response, current_app, request, stream_with_context
+from pymysql import cursors
+
+from backend.db_connection import db
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def stream_format():
+    """The streaming format the client asked for, or None for a buffered response."""
+    fmt = (request.args.get('stream') or '').strip().lower()
+    if fmt in ('1', 'true', 'yes', 'json'):
+        return 'json'
+    if fmt == 'ndjson':
+        return 'ndjson'
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    return None
+
+
+def _encode(rows):
+    provider = current_app.json
+    if hasattr(provider, 'dumps_bytes'):
+        return provider.dumps_bytes(rows)
+    return provider.dumps(rows).encode('utf-8')
+
+
+def iter_rows(query, params=(), chunk_rows=1000):
+    """Execute `query` on an unbuffered cursor and return a generator of
+    row lists (up to `chunk_rows` each). The query runs before this returns,
+    so SQL errors surface in the view rather than mid-stream."""
+    conn = db.get_db()
+    cursor = conn.cursor(cursors.SSDictCursor)
+    cursor.execute(query, params)
+
+    def chunks():
+        finished = False
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # the client went away with rows still on the wire;
+                # dropping the connection is cheaper than draining them
+                conn.invalidate()
+
+    return chunks()
+
+
+def stream_query(query, params=(), fmt='json', chunk_rows=1000, log_name=None):
+    """Run `query` and stream its rows back as a JSON array or NDJSON."""
+    chunks = iter_rows(query, params, chunk_rows)
+
+    def generate():
+        count = 0
+        if fmt == 'ndjson':
+            for rows in chunks:
+                count += len(rows)
+                yield b''.join(_encode(row) + b'\n' for row in rows)
+        else:
+            yield b'['
+            first = True
+            for rows in chunks:
+                count += len(rows)
+                body = _encode(rows)[1:-1]  # strip the chunk's own brackets
+                yield body if first else b',' + body
+                first = False
+            yield b']'
+        if log_name:
+            current_app.logger.info("%s : streamed rows=%d", log_name, count)
+
+    mimetype = NDJSON_MIMETYPE if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), status=200, mimetype=mimetype)
@@ -0,0 +1,139 @@
+#------------------------------------------------------------
+# Stale-while-revalidate for dashboard routes.
+#
+#   @metrics_api.route('/metrics/president/budget/summary', methods=['GET'])
+#   @stale_while_revalidate(max_age=60, max_stale=600)
+#   def president_budget_summary(): ...
+#
+# A response younger than `max_age` seconds is served as is. An
+# older one is still served right away while a background thread
+# recomputes it for the next caller. Past `max_stale` seconds the
+# entry is no longer used and the request computes a fresh copy
+# itself. The Age header reports how old the served data is.
+#
+# Entries live in memory in each worker process, keyed by the
+# endpoint, its URL arguments and the query string.
+#------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+
+MAX_ENTRIES = 1024
+
+
+class _Entry(object):
+    __slots__ = ('body', 'status', 'headers', 'computed_at', 'refreshing')
+
+    def __init__(self, body, status, headers, computed_at):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.computed_at = computed_at
+        self.refreshing = False
+
+
+class SWRCache(object):
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._counters = dict(fresh=0, stale=0, miss=0, too_stale=0, refreshes=0, refresh_errors=0)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, response):
+        entry = _Entry(response.get_data(), response.status_code,
+                       [h for h in response.headers.items() if h[0] not in ('Content-Length', 'Age')],
+                       time.monotonic())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claim_refresh(self, entry):
+        """True for exactly one caller per stale entry."""
+        with self._lock:
+            if entry.refreshing:
+                return False
+            entry.refreshing = True
+            return True
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries))
+
+
+swr_cache = SWRCache()
+
+
+def _serve(entry, state):
+    response = Response(entry.body, status=entry.status, headers=entry.headers)
+    response.headers['Age'] = str(int(time.monotonic() - entry.computed_at))
+    response.headers['X-Cache'] = state
+    return response
+
+
+def _refresh(app, key, path, query_string, view, args, kwargs, cache):
+    try:
+        with app.test_request_context(path, query_string=query_string):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.store(key, response)
+        cache._count('refreshes')
+    except Exception:
+        cache._count('refresh_errors')
+        app.logger.exception("swr: background refresh of %s failed", path)
+    finally:
+        entry = cache.lookup(key)
+        if entry is not None:
+            entry.refreshing = False
+
+
+def stale_while_revalidate(max_age=60, max_stale=600, cache=swr_cache):
+    """Serve responses up to `max_stale` seconds old, refreshing after `max_age`."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (request.endpoint, tuple(sorted((request.view_args or {}).items())), request.query_string)
+            entry = cache.lookup(key)
+            if entry is not None:
+                age = time.monotonic() - entry.computed_at
+                if age < max_age:
+                    cache._count('fresh')
+                    return _serve(entry, 'fresh')
+                if age < max_stale:
+                    cache._count('stale')
+                    if cache.claim_refresh(entry):
+                        threading.Thread(
+                            target=_refresh, name='swr-refresh', daemon=True,
+                            args=(current_app._get_current_object(), key, request.path,
+                                  request.query_string, view, args, kwargs, cache),
+                        ).start()
+                    return _serve(entry, 'stale')
+                cache._count('too_stale')
+            else:
+                cache._count('miss')
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.store(key, response)
+                response.headers['Age'] = '0'
+                response.headers['X-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
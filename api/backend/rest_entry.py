@@ -1,10 +1,9 @@
 import os
-import time
-import pymysql
 from dotenv import load_dotenv
 from flask import Flask
 
 from backend.db_connection import db
+from backend.responses.json_provider import FastJSONProvider
 from backend.advisors.advisors_routes import advisors_api
 from backend.alumni.alumni_routes import alumni_api
 from backend.classrooms.classrooms_routes import classrooms_api
@@ -19,31 +18,10 @@ from backend.maintenance_request.maintenance_request_routes import maintenance_a
 from backend.tools.tools_routes import tools_api
 from backend.school_rankings.school_rankings_routes import rankings_api
 from backend.club_members.club_members_routes import club_members_api
-
-def wait_for_db():
-    host = os.getenv('DB_HOST', 'db').strip()
-    port = int(os.getenv('DB_PORT', 3306))
-    user = os.getenv('DB_USER', 'root').strip()
-    password = os.getenv('MYSQL_ROOT_PASSWORD', '').strip()
-    dbname = os.getenv('DB_NAME', '').strip()
-
-    for attempt in range(20):  # Try for ~40 seconds
-        try:
-            conn = pymysql.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=dbname,
-                connect_timeout=3
-            )
-            conn.close()
-            print(f"✅ Connected to MySQL at {host}:{port}")
-            return
-        except Exception as e:
-            print(f"⏳ DB not ready (attempt {attempt+1}/20): {e}")
-            time.sleep(2)
-    raise RuntimeError("❌ Database not available after waiting")
+from backend.ops.ops_routes import ops_api, health_api
+from backend.ops.request_metrics import request_metrics
+from backend.analytics.facets import facet_index
+from backend.analytics.snapshot import student_snapshot
 
 def create_app():
     app = Flask(__name__)
@@ -51,9 +29,6 @@ def create_app():
     # Load environment variables
     load_dotenv()
 
-    # ✅ Wait until MySQL is ready (AFTER env vars loaded)
-    wait_for_db()
-
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
     app.config['MYSQL_DATABASE_USER'] = os.getenv('DB_USER').strip()
     app.config['MYSQL_DATABASE_PASSWORD'] = os.getenv('MYSQL_ROOT_PASSWORD').strip()
@@ -61,7 +36,45 @@ def create_app():
     app.config['MYSQL_DATABASE_PORT'] = int(os.getenv('DB_PORT').strip())
     app.config['MYSQL_DATABASE_DB'] = os.getenv('DB_NAME').strip()
 
+    # Connection pool sizing (per worker process)
+    app.config['MYSQL_POOL_MIN_SIZE'] = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+    app.config['MYSQL_POOL_MAX_SIZE'] = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    app.config['MYSQL_POOL_IDLE_TIMEOUT'] = float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300))
+    app.config['MYSQL_POOL_CHECKOUT_TIMEOUT'] = float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 10))
+    app.config['MYSQL_POOL_PING_AFTER'] = float(os.getenv('DB_POOL_PING_AFTER', 0))
+
+    # Query-result cache for db.cached_cursor() readers (per worker process)
+    app.config['MYSQL_QUERY_CACHE_SIZE'] = int(os.getenv('DB_QUERY_CACHE_SIZE', 512))
+    app.config['MYSQL_QUERY_CACHE_MAX_ROWS'] = int(os.getenv('DB_QUERY_CACHE_MAX_ROWS', 100000))
+    app.config['MYSQL_QUERY_CACHE_TTL'] = float(os.getenv('DB_QUERY_CACHE_TTL', 300))
+
+    # N+1 detector: off, warn (log once per endpoint) or raise (fail the request)
+    app.config['MYSQL_QUERY_BUDGET_MODE'] = os.getenv('DB_QUERY_BUDGET_MODE', 'off').strip().lower()
+    app.config['MYSQL_QUERY_BUDGET'] = int(os.getenv('DB_QUERY_BUDGET', 50))
+    app.config['MYSQL_QUERY_REPEAT_LIMIT'] = int(os.getenv('DB_QUERY_REPEAT_LIMIT', 5))
+
+    # orjson-backed encoder for every jsonify() in the blueprints
+    app.config['JSON_NATIVE_TYPES'] = os.getenv('JSON_NATIVE_TYPES', 'false').strip().lower() in ('1', 'true', 'yes')
+    app.json = FastJSONProvider(app)
+
+    # Optional NumPy snapshot of `students` for the student aggregates (per worker process)
+    app.config['ANALYTICS_SNAPSHOT'] = os.getenv('ANALYTICS_SNAPSHOT', 'false').strip().lower() in ('1', 'true', 'yes')
+
+    # Pooled connections one dean dashboard request may read from in parallel
+    app.config['DEAN_DASHBOARD_CONNECTIONS'] = int(os.getenv('DEAN_DASHBOARD_CONNECTIONS', 4))
+
+    # POST /api/_batch: GETs per batch, and how many run at once
+    app.config['BATCH_MAX_REQUESTS'] = int(os.getenv('API_BATCH_MAX_REQUESTS', 50))
+    app.config['BATCH_WORKERS'] = int(os.getenv('API_BATCH_WORKERS', 4))
+
     db.init_app(app)
+    # Per-endpoint latency / DB time / bytes, scraped at /api/_metrics
+    request_metrics.init_app(app)
+    student_snapshot.init_app(app)
+    # Bitmap index behind /metrics/students/facets, built on first use
+    facet_index.init_app(app)
+    # Connect in the background; routes answer 503 until the pool is warm
+    db.start_warmup()
 
     # Register routes
     app.register_blueprint(advisors_api,       url_prefix='/api')
@@ -78,6 +91,8 @@ def create_app():
     app.register_blueprint(tools_api,          url_prefix='/api')
     app.register_blueprint(rankings_api,       url_prefix='/api')
     app.register_blueprint(club_members_api,   url_prefix='/api') 
+    app.register_blueprint(ops_api,            url_prefix='/api')
+    app.register_blueprint(health_api)
 
 
     return app
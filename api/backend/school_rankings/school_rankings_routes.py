@@ -1,16 +1,30 @@
 from flask import Blueprint, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.conditional import conditional
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for school rankings lookups
 rankings_api = Blueprint('rankings_api', __name__)
 
 # ------------------------------------------------------------
-# GET /api/rankings
+# GET /api/rankings[?limit=&after=]
 # Purpose: List school rankings
 @rankings_api.route('/rankings', methods=['GET'])
+@conditional('school_rankings')
 def list_rankings():
     query = "SELECT schoolName, ranking FROM school_rankings ORDER BY ranking DESC"
     current_app.logger.info("GET /rankings : listing")
+    page = page_request()
+    if page:
+        # ranking is UNIQUE, so it is a complete keyset on its own
+        query, params = "SELECT schoolName, ranking FROM school_rankings", []
+        if page.after:
+            clause, params = keyset_predicate(["ranking"], page.after, descending=True)
+            query += " WHERE " + clause
+        query += order_by(["ranking"], descending=True) + " LIMIT %s"
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params) + (page.limit + 1,))
+        return page_response(cursor.fetchall(), page, ["ranking"])
     cursor = db.get_db().cursor()
     cursor.execute(query)
     theData = cursor.fetchall()
@@ -0,0 +1,77 @@
+#------------------------------------------------------------
+# Production serving mode: pre-fork gunicorn workers.
+#
+# The app object is built once in the master (preload), then
+# forked into API_WORKERS processes that each run API_THREADS
+# request threads. Every worker gets its own DB pool, warmed
+# right after the fork. `kill -HUP <master pid>` replaces the
+# workers gracefully: in-flight requests finish before the old
+# workers exit.
+#------------------------------------------------------------
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from backend.db_connection import db
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def post_fork(server, worker):
+    # connections are never shared across processes; each worker opens
+    # and warms its own in the background and reports ready once done
+    db.start_warmup()
+    server.log.info("worker %s: DB warm-up started", worker.pid)
+
+
+def on_reload(server):
+    server.log.info("graceful reload requested; replacing workers")
+
+
+def gunicorn_options():
+    """Serving options, overridable through the environment."""
+    return {
+        'bind': os.getenv('API_BIND', '0.0.0.0:4000'),
+        'workers': _env_int('API_WORKERS', multiprocessing.cpu_count()),
+        'threads': _env_int('API_THREADS', 4),
+        'worker_class': 'gthread',
+        # the app is built before gunicorn starts, so workers only fork it
+        'preload_app': True,
+        'timeout': _env_int('API_WORKER_TIMEOUT', 60),
+        'graceful_timeout': _env_int('API_GRACEFUL_TIMEOUT', 30),
+        'keepalive': _env_int('API_KEEPALIVE', 5),
+        'max_requests': _env_int('API_MAX_REQUESTS', 0),
+        'max_requests_jitter': _env_int('API_MAX_REQUESTS_JITTER', 0),
+        'accesslog': os.getenv('API_ACCESS_LOG', '-'),
+        'post_fork': post_fork,
+        'on_reload': on_reload,
+    }
+
+
+class ProductionServer(BaseApplication):
+    """Runs an already-built Flask app under gunicorn."""
+
+    def __init__(self, app, options=None):
+        self.application = app
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        return self.application
+
+
+def serve(app, **overrides):
+    # the master never serves requests; don't let it hold connections
+    db.stop_warmup()
+    options = gunicorn_options()
+    options.update(overrides)
+    ProductionServer(app, options).run()
@@ -0,0 +1,110 @@
+#------------------------------------------------------------
+# GPA distribution summaries without shipping every GPA.
+#
+# GPAs are DECIMAL(3,2), so a college has at most 1000 distinct
+# values. Both paths reduce the table to a frequency table per
+# college (hundredths of a point -> students): one GROUP BY in
+# MySQL, or a bincount over the students snapshot when it is on.
+# Quantiles, moments, whiskers and histogram bins are then exact
+# and computed from at most 1000 counts per college, so neither the
+# work here nor the response grows with the number of students.
+#------------------------------------------------------------
+import numpy as np
+
+from backend.analytics.snapshot import student_snapshot
+from backend.db_connection import db
+from backend.metrics import queries
+
+# DECIMAL(3,2) tops out at 9.99; the histogram covers [0, 4]
+MAX_CENTS = 999
+HISTOGRAM_CENTS = 400
+
+
+def gpa_counts(college=None):
+    """{college: int array of length MAX_CENTS + 1}, students per GPA in hundredths."""
+    frame = student_snapshot.current()
+    if frame is not None:
+        return frame.gpa_counts(college)
+    cur = db.cached_cursor()
+    cur.execute(queries.GPA_COUNTS, {'college': college})
+    tables = {}
+    for row in cur.fetchall():
+        counts = tables.get(row['college'])
+        if counts is None:
+            counts = tables[row['college']] = np.zeros(MAX_CENTS + 1, dtype=np.int64)
+        counts[int(row['cents'])] += row['n']
+    return tables
+
+
+def _gpa(cents):
+    # plain float: the JSON encoder does not take numpy scalars
+    return int(cents) / 100.0
+
+
+def _percentile(cumulative, n, p):
+    # numpy's default ("linear") percentile of the expanded sample,
+    # reading order statistics off the cumulative counts
+    h = (n - 1) * p
+    lo = int(np.floor(h))
+    hi = min(lo + 1, n - 1)
+    a = int(np.searchsorted(cumulative, lo, side='right'))
+    b = int(np.searchsorted(cumulative, hi, side='right'))
+    return (a + (h - lo) * (b - a)) / 100.0
+
+
+def summarize(counts):
+    """Box-plot statistics for one college's frequency table, or None if empty.
+    Whiskers reach the furthest GPA within 1.5 IQR of the box, as matplotlib draws them."""
+    n = int(counts.sum())
+    if not n:
+        return None
+    values = np.nonzero(counts)[0]
+    cumulative = np.cumsum(counts)
+    cents = np.arange(len(counts))
+    mean = float((counts * cents).sum()) / n / 100.0
+    var = float((counts * (cents / 100.0 - mean) ** 2).sum())
+    q1, median, q3 = (_percentile(cumulative, n, p) for p in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    inside = values[(values / 100.0 >= q1 - 1.5 * iqr) & (values / 100.0 <= q3 + 1.5 * iqr)]
+    outside = values[(values / 100.0 < q1 - 1.5 * iqr) | (values / 100.0 > q3 + 1.5 * iqr)]
+    return {
+        'count': n,
+        'mean': round(mean, 4),
+        'std': round((var / (n - 1)) ** 0.5, 4) if n > 1 else None,
+        'min': _gpa(values[0]),
+        'q1': round(q1, 4),
+        'median': round(median, 4),
+        'q3': round(q3, 4),
+        'max': _gpa(values[-1]),
+        'whiskerLow': _gpa(inside[0]) if len(inside) else q1,
+        'whiskerHigh': _gpa(inside[-1]) if len(inside) else q3,
+        # distinct values; outlierCount counts students
+        'outliers': [_gpa(v) for v in outside],
+        'outlierCount': int(counts[outside].sum()),
+    }
+
+
+def summary(college=None):
+    """[{college, count, mean, std, min, q1, median, q3, max, whiskerLow, whiskerHigh,
+    outliers, outlierCount}] ordered by college."""
+    rows = []
+    for name, counts in sorted(gpa_counts(college).items()):
+        stats = summarize(counts)
+        if stats is not None:
+            rows.append(dict(stats, college=name))
+    return rows
+
+
+def histogram(bins, college=None):
+    """[{college, lo, hi, count}] over `bins` equal-width bins of [0, 4]; like
+    numpy.histogram the last bin includes 4.0."""
+    edges = np.linspace(0.0, 4.0, bins + 1)
+    # bin of each hundredth, computed on the integer grid so 0.25 lands in [0.25, 0.5)
+    index = np.minimum((np.arange(HISTOGRAM_CENTS + 1) * bins) // HISTOGRAM_CENTS, bins - 1)
+    rows = []
+    for name, counts in sorted(gpa_counts(college).items()):
+        per_bin = np.bincount(index, weights=counts[:HISTOGRAM_CENTS + 1], minlength=bins)
+        for i in range(bins):
+            rows.append({'college': name, 'lo': round(float(edges[i]), 4), 'hi': round(float(edges[i + 1]), 4),
+                         'count': int(per_bin[i])})
+    return rows
@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
+from backend.analytics.feed import student_feed
 from backend.db_connection import db
+from backend.student import gpa_distribution
+from backend.responses.conditional import conditional
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
+from backend.responses.streaming import stream_format, stream_query
 
 # Blueprint for student-centric endpoints
 students_api = Blueprint('students_api', __name__)
@@ -19,12 +24,15 @@ def student_gpa(studentId):
     response.status_code = 200
     return response
 
-# GET /api/students/gpas
+# GET /api/students/gpas[?stream=json|ndjson]
 # Purpose: Fetch all students' GPAs for histogram for Lim
 @students_api.route('/students/gpas', methods=['GET'])
 def all_students_gpas():
     query = "SELECT gpa, college FROM students WHERE gpa IS NOT NULL ORDER BY college"
     current_app.logger.info("GET /students/gpas")
+    fmt = stream_format()
+    if fmt:
+        return stream_query(query, fmt=fmt, log_name="GET /students/gpas")
     cursor = db.get_db().cursor()
     cursor.execute(query)
     theData = cursor.fetchall()
@@ -33,6 +41,38 @@ def all_students_gpas():
     response.status_code = 200
     return response
 
+# ------------------------------------------------------------
+# GET /api/students/gpas/summary[?college=Name]
+# Purpose: Per-college GPA box-plot statistics (quantiles, whiskers, outliers, mean, std) for Lim
+@students_api.route('/students/gpas/summary', methods=['GET'])
+@conditional('students')
+def students_gpa_summary():
+    college = request.args.get('college')
+    current_app.logger.info("GET /students/gpas/summary : college=%s", college)
+    theData = gpa_distribution.summary(college)
+    response = make_response(jsonify(theData))
+    response.status_code = 200
+    return response
+
+# ------------------------------------------------------------
+# GET /api/students/gpas/histogram[?bins=16&college=Name]
+# Purpose: Per-college GPA counts in fixed-width bins over [0, 4]
+@students_api.route('/students/gpas/histogram', methods=['GET'])
+@conditional('students')
+def students_gpa_histogram():
+    try:
+        bins = int(request.args.get('bins', 16))
+    except ValueError:
+        return make_response(jsonify({'error': 'bins must be an integer'}), 400)
+    if not 1 <= bins <= 400:
+        return make_response(jsonify({'error': 'bins must be between 1 and 400'}), 400)
+    college = request.args.get('college')
+    current_app.logger.info("GET /students/gpas/histogram : bins=%d college=%s", bins, college)
+    theData = gpa_distribution.histogram(bins, college)
+    response = make_response(jsonify(theData))
+    response.status_code = 200
+    return response
+
 # ------------------------------------------------------------
 # GET /api/students/<studentId>/schedule
 # Purpose: Class schedule for a student (courses, time, room)
@@ -80,7 +120,7 @@ def student_advisor(studentId):
     return response
 
 # ------------------------------------------------------------
-# GET /api/students
+# GET /api/students[?stream=json|ndjson][?limit=&after=]
 # Purpose: List all students (with options to filter by college or year)
 @students_api.route('/students', methods=['GET'])
 def list_students():
@@ -98,11 +138,26 @@ def list_students():
     if year:
         conditions.append("students.year = %s") 
         params.append(year)
+    # Keyset pagination on the primary key
+    page = page_request()
+    if page and page.after:
+        clause, after_params = keyset_predicate(["students.userId"], page.after)
+        conditions.append(clause)
+        params.extend(after_params)
     # Add WHERE clause if we have any conditions
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
     
     current_app.logger.info("GET /students : listing students")
+    if page:
+        query += order_by(["students.userId"]) + " LIMIT %s"
+        params.append(page.limit + 1)
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params))
+        return page_response(cursor.fetchall(), page, ["userId"])
+    fmt = stream_format()
+    if fmt:
+        return stream_query(query, tuple(params), fmt=fmt, log_name="GET /students")
     cursor = db.get_db().cursor()
     cursor.execute(query, tuple(params))
     theData = cursor.fetchall()
@@ -132,6 +187,7 @@ def update_student(userId):
     cursor = db.get_db().cursor()
     cursor.execute(query, tuple(params))
     db.get_db().commit()
+    student_feed.changed([userId])
     response = make_response(jsonify({'updated': 1}))
     response.status_code = 200
     return response
@@ -146,6 +202,7 @@ def delete_student(userId):
     cursor = db.get_db().cursor()
     cursor.execute(query, (userId,))
     db.get_db().commit()
+    student_feed.changed([userId])
     response = make_response(jsonify({}))
     response.status_code = 204
     return response
\ No newline at end of file
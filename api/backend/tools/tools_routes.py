@@ -1,16 +1,29 @@
 from flask import Blueprint, request, jsonify, make_response, current_app
 from backend.db_connection import db
+from backend.responses.conditional import conditional
+from backend.responses.pagination import keyset_predicate, order_by, page_request, page_response
 
 # Blueprint for maintenance requests, staff hours, and tools linkage
 tools_api = Blueprint('tools_api', __name__)
 
 # ------------------------------------------------------------
-# GET /api/tools
+# GET /api/tools[?limit=&after=]
 # Purpose: List all tools and their amount
 @tools_api.route('/tools', methods=['GET'])
+@conditional('tools')
 def list_tools():
     query = "SELECT * FROM tools"
     current_app.logger.info("GET /tools : listing tools")
+    page = page_request()
+    if page:
+        params = []
+        if page.after:
+            clause, params = keyset_predicate(["productName"], page.after)
+            query += " WHERE " + clause
+        query += order_by(["productName"]) + " LIMIT %s"
+        cursor = db.get_db().cursor()
+        cursor.execute(query, tuple(params) + (page.limit + 1,))
+        return page_response(cursor.fetchall(), page, ["productName"])
     cursor = db.get_db().cursor()
     cursor.execute(query)
     theData = cursor.fetchall()
@@ -1,6 +1,7 @@
 ###
 # Main application interface
 ###
+import os
 
 # import the create app function 
 # that lives in src/__init__.py
@@ -10,8 +11,14 @@ from backend.rest_entry import create_app
 app = create_app()
 
 if __name__ == '__main__':
-    # we want to run in debug mode (for hot reloading) 
-    # this app will be bound to port 4000. 
-    # Take a look at the docker-compose.yml to see 
-    # what port this might be mapped to... 
-    app.run(debug = True, host = '0.0.0.0', port = 4000)
+    if os.getenv('API_SERVER', 'dev').strip().lower() == 'prod':
+        # pre-fork multi-worker mode; see backend/serving.py for the
+        # API_WORKERS / API_THREADS / ... knobs
+        from backend.serving import serve
+        serve(app)
+    else:
+        # we want to run in debug mode (for hot reloading) 
+        # this app will be bound to port 4000. 
+        # Take a look at the docker-compose.yml to see 
+        # what port this might be mapped to... 
+        app.run(debug = True, host = '0.0.0.0', port = 4000)
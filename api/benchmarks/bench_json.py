@@ -0,0 +1,92 @@
+###
+# Micro-benchmark: Flask's default JSON encoder vs FastJSONProvider
+#
+# Builds DictCursor-shaped rows in memory (no database needed) for
+# a few real endpoints and times how long each provider takes to
+# turn them into a response body.
+#
+#   cd api && python -m benchmarks.bench_json --rows 100000
+###
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.responses.json_provider import FastJSONProvider
+
+COLLEGES = ['College of Composition', 'College of Jazz', 'College of Production',
+            'College of Vocal Arts', 'College of Piano', 'College of Strings']
+
+
+def students_gpas_rows(n, rnd):
+    # GET /students/gpas
+    return [{'gpa': Decimal(rnd.randint(100, 400)) / 100, 'college': rnd.choice(COLLEGES)}
+            for _ in range(n)]
+
+
+def course_students_rows(n, rnd):
+    # GET /metrics/courses/<id>/students (without the LIMIT)
+    return [{'userId': i, 'firstName': 'First%d' % i, 'lastName': 'Last%d' % i,
+             'gpa': Decimal(rnd.randint(350, 400)) / 100, 'school_rank': rnd.randint(1, 40)}
+            for i in range(n)]
+
+
+def maintenance_rows(n, rnd):
+    # GET /maintenance-requests/staff/<id> (datetime-heavy)
+    start = datetime(2024, 1, 1)
+    return [{'orderId': i, 'address': '%d Main St' % i, 'problemType': 'Plumbing', 'state': 1,
+             'submitted': start + timedelta(minutes=rnd.randint(0, 500000)),
+             'description': 'Leaky faucet', 'staffId': 4, 'firstName': 'Ann', 'lastName': 'Lee',
+             'tools': 'Wrench, Tape'}
+            for i in range(n)]
+
+
+def time_provider(app, provider, rows, repeat):
+    samples, size = [], 0
+    with app.test_request_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = provider.response(rows).get_data()
+            samples.append(time.perf_counter() - started)
+            size = len(body)
+    return statistics.median(samples), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    native = FastJSONProvider(app)
+    native.native_types = True
+    if not fast.available:
+        print("orjson is not installed; FastJSONProvider falls back to the default encoder")
+
+    rnd = random.Random(args.seed)
+    cases = [
+        ('/students/gpas', students_gpas_rows(args.rows, rnd)),
+        ('/metrics/courses/<id>/students', course_students_rows(args.rows, rnd)),
+        ('/maintenance-requests/staff/<id>', maintenance_rows(args.rows, rnd)),
+    ]
+    print("%-34s %11s %11s %8s %11s %8s" % ('endpoint (%d rows)' % args.rows, 'default ms',
+                                            'fast ms', 'speedup', 'native ms', 'speedup'))
+    for name, rows in cases:
+        slow_s, _ = time_provider(app, default, rows, args.repeat)
+        fast_s, _ = time_provider(app, fast, rows, args.repeat)
+        native_s, _ = time_provider(app, native, rows, args.repeat)
+        print("%-34s %11.1f %11.1f %7.1fx %11.1f %7.1fx" % (name, slow_s * 1000, fast_s * 1000, slow_s / fast_s,
+                                                           native_s * 1000, slow_s / native_s))
+
+
+if __name__ == '__main__':
+    main()
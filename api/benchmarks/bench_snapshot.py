@@ -0,0 +1,117 @@
+###
+# Benchmark: students snapshot (NumPy) vs the SQL the routes run
+#
+# Without --mysql, builds a snapshot of --rows synthetic students in
+# memory and times each aggregate, a full build and a one-row patch.
+#
+# With --mysql, uses the database from api/.env instead: the snapshot
+# is loaded from `students` and every aggregate is also timed as the
+# SQL query the route would otherwise send (no query cache). Load a
+# large table first to compare at scale, e.g. 1M students.
+#
+#   cd api && python -m benchmarks.bench_snapshot --rows 1000000
+#   cd api && python -m benchmarks.bench_snapshot --mysql
+###
+import argparse
+import os
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from backend.analytics.snapshot import Frame, StudentSnapshot
+from backend.metrics import queries
+
+COLLEGES = ['College of Composition', 'College of Jazz', 'College of Production',
+            'College of Vocal Arts', 'College of Piano', 'College of Strings']
+RACES = ['Asian', 'Black', 'Hispanic', 'White', 'Multiracial', 'Other']
+ORIGINS = ['In-State', 'Out-of-State', 'International']
+HOUSING = ['On-Campus', 'Off-Campus', 'Commuter']
+
+SQL = {
+    'avg_gpa_by_college': ("SELECT college, ROUND(AVG(gpa), 2) AS average_gpa FROM students "
+                           "GROUP BY college ORDER BY average_gpa DESC", ()),
+    'enrollment_trend': ("SELECT s.year AS period, COUNT(*) AS enrollment FROM students s "
+                         "WHERE s.college = %s GROUP BY s.year ORDER BY s.year", (COLLEGES[0],)),
+    'demographics_cube': queries.DEMOGRAPHICS_CUBE.bind(),
+    'gpa_counts': queries.GPA_COUNTS.bind(),
+}
+
+
+def synthetic_rows(n, rnd):
+    return [(i, Decimal(rnd.randint(100, 400)) / 100 if rnd.random() > 0.01 else None,
+             rnd.randint(1, 4), rnd.choice(HOUSING), rnd.choice(RACES), rnd.randint(5000, 200000),
+             rnd.choice(ORIGINS), rnd.choice(COLLEGES))
+            for i in range(1, n + 1)]
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def snapshot_cases(frame):
+    return {
+        'avg_gpa_by_college': frame.avg_gpa_by_college,
+        'enrollment_trend': lambda: frame.enrollment_trend(COLLEGES[0]),
+        'demographics_cube': frame.demographics_cube,
+        'gpa_counts': frame.gpa_counts,
+    }
+
+
+def mysql_connection():
+    import pymysql
+    from dotenv import load_dotenv
+    load_dotenv()
+    return pymysql.connect(host=os.getenv('DB_HOST').strip(), port=int(os.getenv('DB_PORT').strip()),
+                           user=os.getenv('DB_USER').strip(), password=os.getenv('MYSQL_ROOT_PASSWORD').strip(),
+                           database=os.getenv('DB_NAME').strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--mysql', action='store_true', help='load from and compare against MySQL')
+    args = parser.parse_args()
+
+    conn = None
+    if args.mysql:
+        conn = mysql_connection()
+        started = time.perf_counter()
+        frame = StudentSnapshot().load(conn)
+        build_ms = (time.perf_counter() - started) * 1000
+        print("loaded %d students from MySQL in %.0f ms" % (len(frame), build_ms))
+    else:
+        rows = synthetic_rows(args.rows, random.Random(args.seed))
+        started = time.perf_counter()
+        frame = Frame.build(0, rows)
+        build_ms = (time.perf_counter() - started) * 1000
+        print("built snapshot of %d synthetic students in %.0f ms" % (len(frame), build_ms))
+
+    patch_row = (len(frame) // 2 or 1, Decimal('3.50'), 2, HOUSING[0], RACES[0], 40000, ORIGINS[0], COLLEGES[1])
+    print("one-row patch: %.2f ms" % median_ms(lambda: frame.patch(frame.version + 1, [patch_row], []), args.repeat))
+
+    print("%-22s %12s %12s %9s" % ('aggregate', 'snapshot ms', 'sql ms', 'speedup'))
+    for name, fn in sorted(snapshot_cases(frame).items()):
+        snap_ms = median_ms(fn, args.repeat)
+        if conn is None:
+            print("%-22s %12.2f %12s %9s" % (name, snap_ms, '-', '-'))
+            continue
+        query, params = SQL[name]
+
+        def run_sql():
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                cur.fetchall()
+        sql_ms = median_ms(run_sql, args.repeat)
+        print("%-22s %12.2f %12.2f %8.0fx" % (name, snap_ms, sql_ms, sql_ms / snap_ms if snap_ms else 0))
+
+
+if __name__ == '__main__':
+    main()
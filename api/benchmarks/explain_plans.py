@@ -0,0 +1,272 @@
+###
+# EXPLAIN-plan regression check for the SQL in backend/
+#
+# Finds every SQL statement written as a string literal under backend/
+# (SELECT / WITH / INSERT / UPDATE / DELETE / REPLACE, f-strings and
+# .format() templates included) and every named query in the catalog
+# (db_connection/catalog.py; once bare, once with all its filters),
+# runs EXPLAIN FORMAT=JSON for it on the
+# database from api/.env and reduces each plan to, per table, the access
+# type, chosen key and estimated rows, plus whether it sorts (filesort)
+# or builds a temporary table.
+#
+# A plan is flagged when it reads a table with more than --threshold
+# rows by a full scan (ALL), or sorts / groups through filesort or a
+# temporary table while doing so. Flags already in the snapshot
+# (benchmarks/plans.json) are accepted; new ones fail the run, as do
+# statements that no longer EXPLAIN at all.
+#
+#   cd api && python -m benchmarks.explain_plans                 # exit 1 on regressions
+#   cd api && python -m benchmarks.explain_plans --update        # accept current plans
+#   cd api && python -m benchmarks.explain_plans --list          # statements only, no DB
+#
+# Load realistic volumes first (e.g. the synthetic data generator);
+# on a near-empty database MySQL prefers full scans everywhere.
+#
+# Statement parameters are filled in with a sample literal ('1', 1
+# after LIMIT/OFFSET, ('1') after IN) and template placeholders with
+# nothing, which is enough for EXPLAIN; a statement whose rendered
+# form is not valid SQL is reported as skipped rather than failing
+# the run.
+###
+import argparse
+import ast
+import importlib
+import json
+import os
+import re
+import sys
+
+from benchmarks.bench_snapshot import mysql_connection
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(API_DIR, 'backend')
+SNAPSHOT = os.path.join(API_DIR, 'benchmarks', 'plans.json')
+
+# bookkeeping SQL of the migration runner, not an application query path
+EXCLUDE = ('backend/migrations/',)
+
+_SQL = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\s+[^/\s]')
+_NUMERIC_PARAM = re.compile(r'\b(LIMIT|OFFSET)\s+%(?:\(\w+\))?s', re.IGNORECASE)
+_NAMED_PARAM = re.compile(r'%\(\w+\)s')
+_LIST_PARAM = re.compile(r'\bIN\s+(%\(\w+\)s)', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'\{\w*\}')
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_NOT_ALIAS = {'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'STRAIGHT_JOIN', 'ON', 'USING',
+              'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'SET', 'VALUES', 'UNION', 'WINDOW', 'FOR', 'NATURAL'}
+
+
+class Statement(object):
+    def __init__(self, key, path, line, sql, dynamic):
+        self.key = key          # path::qualname#n, stable while the function keeps its name
+        self.path = path
+        self.line = line
+        self.sql = sql
+        self.dynamic = dynamic  # had f-string / format placeholders
+
+    def render(self):
+        """The statement as something EXPLAIN accepts."""
+        sql = _NUMERIC_PARAM.sub(r'\1 1', self.sql)
+        # a sequence parameter (IN %(ids)s) is sent as a parenthesized list
+        sql = _LIST_PARAM.sub(r'IN (\1)', sql)
+        sql = _NAMED_PARAM.sub("'1'", sql.replace('%s', "'1'")).replace('%%', '%')
+        return _PLACEHOLDER.sub('', sql).strip().rstrip(';')
+
+    def aliases(self):
+        """{alias: table}; EXPLAIN names tables by their alias."""
+        found = {}
+        for table, alias in _TABLE_REF.findall(self.sql):
+            found[table] = table
+            if alias and alias.upper() not in _NOT_ALIAS:
+                found[alias] = table
+        return found
+
+
+class _Finder(ast.NodeVisitor):
+    def __init__(self, path):
+        self.path = path
+        self.scope = []
+        self.counts = {}
+        self.found = []
+
+    def _scoped(self, node):
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _scoped
+
+    def _add(self, node, sql, dynamic):
+        scope = '.'.join(self.scope) or '<module>'
+        n = self.counts[scope] = self.counts.get(scope, 0) + 1
+        self.found.append(Statement('%s::%s#%d' % (self.path, scope, n), self.path, node.lineno, sql, dynamic))
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str) and _SQL.match(node.value):
+            self._add(node, node.value, bool(_PLACEHOLDER.search(node.value)))
+
+    def visit_JoinedStr(self, node):
+        # f-string: keep the literal parts, drop the interpolations
+        parts = [v.value if isinstance(v, ast.Constant) else '' for v in node.values]
+        sql = ''.join(parts)
+        if _SQL.match(sql):
+            self._add(node, sql, True)
+
+
+def named_statements(modules):
+    """The catalog's queries, after importing the modules that define them."""
+    for module in modules:
+        importlib.import_module(module)
+    from backend.db_connection import catalog
+
+    for query in catalog:
+        path = os.path.relpath(query.path, API_DIR).replace(os.sep, '/')
+        variants = [('', {})]
+        if query.filters:
+            variants.append(('[%s]' % ','.join(sorted(query.filters)), dict((p, 1) for p in query.params)))
+        for suffix, params in variants:
+            yield Statement('catalog::%s%s' % (query.name, suffix), path, query.line, query.bind(params)[0],
+                            bool(query.filters))
+
+
+def discover(root=BACKEND):
+    """Every SQL statement under `root`: literals in file order, then the named queries."""
+    statements, modules = [], []
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith('.py'):
+                continue
+            full = os.path.join(directory, filename)
+            path = os.path.relpath(full, API_DIR).replace(os.sep, '/')
+            if path.startswith(EXCLUDE):
+                continue
+            with open(full, encoding='utf-8') as f:
+                source = f.read()
+            finder = _Finder(path)
+            finder.visit(ast.parse(source, filename=full))
+            statements.extend(finder.found)
+            if 'catalog.define(' in source:
+                modules.append(path[:-3].replace('/', '.'))
+    named = list(named_statements(modules))
+    from backend.db_connection import catalog
+
+    # the literal passed to catalog.define() is covered by its named entry
+    defined = set(q.sql for q in catalog)
+    return [s for s in statements if s.sql not in defined] + named
+
+
+def _walk(node, tables, flags):
+    if isinstance(node, dict):
+        if node.get('using_filesort'):
+            flags.add('filesort')
+        if node.get('using_temporary_table'):
+            flags.add('temporary')
+        table = node.get('table')
+        if isinstance(table, dict) and 'access_type' in table:
+            tables.append({'table': table.get('table_name'), 'type': table['access_type'],
+                           'key': table.get('key'), 'rows': table.get('rows_examined_per_scan')})
+        for value in node.values():
+            _walk(value, tables, flags)
+    elif isinstance(node, list):
+        for value in node:
+            _walk(value, tables, flags)
+
+
+def summarize(plan):
+    """{tables: [{table, type, key, rows}], filesort, temporary} from EXPLAIN FORMAT=JSON."""
+    tables, flags = [], set()
+    _walk(plan, tables, flags)
+    return {'tables': tables, 'filesort': 'filesort' in flags, 'temporary': 'temporary' in flags}
+
+
+def problems(summary, sizes, threshold, aliases=None):
+    """Why this plan is flagged, e.g. ["ALL students", "filesort"], on tables above `threshold` rows."""
+    aliases = aliases or {}
+    big = [t for t in summary['tables'] if sizes.get(aliases.get(t['table'], t['table']), 0) > threshold]
+    found = ['ALL %s' % aliases.get(t['table'], t['table']) for t in big if t['type'] == 'ALL']
+    if big:
+        found += [f for f in ('filesort', 'temporary') if summary[f]]
+    return found
+
+
+def table_sizes(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+        return dict((name, rows or 0) for name, rows in cur.fetchall())
+
+
+def explain(conn, statement):
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN FORMAT=JSON " + statement.render())
+        return json.loads(cur.fetchone()[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threshold', type=int, default=1000,
+                        help='only flag plans touching tables with more rows than this')
+    parser.add_argument('--snapshot', default=SNAPSHOT)
+    parser.add_argument('--update', action='store_true', help='write the current plans as the snapshot')
+    parser.add_argument('--list', action='store_true', help='print the discovered statements and exit')
+    args = parser.parse_args(argv)
+
+    statements = discover()
+    if args.list:
+        for s in statements:
+            print("%-70s %s%s" % (s.key, ' '.join(s.render().split())[:90], '  [dynamic]' if s.dynamic else ''))
+        print("%d statement(s)" % len(statements))
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.snapshot):
+        with open(args.snapshot, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    conn = mysql_connection()
+    with conn.cursor() as cur:
+        try:
+            # MySQL 8.3+ can emit a different JSON layout; ask for the classic one
+            cur.execute("SET SESSION explain_json_format_version = 1")
+        except Exception:
+            pass
+    sizes = table_sizes(conn)
+
+    current, regressions, skipped = {}, [], []
+    for s in statements:
+        try:
+            summary = summarize(explain(conn, s))
+        except Exception as e:
+            if s.key in baseline and 'error' not in baseline[s.key]:
+                regressions.append((s, ['no longer explains: %s' % e]))
+            else:
+                skipped.append((s, e))
+            current[s.key] = {'line': s.line, 'error': str(e)}
+            continue
+        flagged = problems(summary, sizes, args.threshold, s.aliases())
+        current[s.key] = dict(summary, line=s.line, flagged=flagged)
+        accepted = set(baseline.get(s.key, {}).get('flagged', ()))
+        new = [p for p in flagged if p not in accepted]
+        if new:
+            regressions.append((s, new))
+
+    for s, e in skipped:
+        print("skipped  %s (line %d): %s" % (s.key, s.line, str(e).splitlines()[0][:100]))
+    for s, found in regressions:
+        print("REGRESS  %s (line %d): %s" % (s.key, s.line, ', '.join(found)))
+        for t in current[s.key].get('tables', ()):
+            print("           %-28s %-8s key=%-36s rows=%s" % (t['table'], t['type'], t['key'], t['rows']))
+    print("%d statement(s): %d explained, %d skipped, %d regression(s)"
+          % (len(statements), len(statements) - len(skipped), len(skipped), len(regressions)))
+
+    if args.update:
+        with open(args.snapshot, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print("snapshot written to %s" % os.path.relpath(args.snapshot))
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
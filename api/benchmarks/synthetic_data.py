@@ -0,0 +1,734 @@
+###
+# Synthetic data generator for the BachEnd schema
+#
+# Produces a complete, foreign-key consistent data set for every table
+# in database-files/000_BachEndDatabase.sql at a chosen scale factor
+# (1 ~ the size of the seed files: 200 students, 50 courses), for
+# loading realistic volumes before running the benchmarks and the
+# EXPLAIN check. Output is a pure function of --scale, --seed and
+# --as-of: every table draws from its own random stream, so the same
+# arguments give byte-identical files.
+#
+# The data is skewed the way the real thing is: a few colleges are much
+# larger than the rest, course popularity is Zipf-like within a college
+# (students take ~80% of their courses in their own), some courses have
+# no professor, expenses peak at semester starts and at fiscal year end
+# (June) and grow over time, donations spike in December, and a third
+# of the maintenance requests arrive in bursts (one building, one
+# problem, within a day or two) on top of a weekday background.
+# courses.enrollment is the exact count of students_courses rows.
+#
+#   cd api && python -m benchmarks.synthetic_data --scale 100                    # planned sizes only
+#   cd api && python -m benchmarks.synthetic_data --scale 100 --out /tmp/bach   # TSV + load.sql
+#   cd api && python -m benchmarks.synthetic_data --scale 1 --out /tmp/seed --format sql
+#   cd api && python -m benchmarks.synthetic_data --scale 100 --mysql           # into api/.env's DB
+#
+# --format tsv writes one <table>.tsv per table and a load.sql that
+# truncates the tables and LOAD DATA LOCAL INFILEs them in dependency
+# order (cd into the directory, then mysql --local-infile=1 < load.sql).
+# --format sql writes NNN_<table>.sql files of multi-row INSERTs; put
+# them in database-files/ instead of the seed files (001-024, 050 and
+# maintenance_staffs_maintenance_request.sql) and 051 / 052 build the
+# finance ledger and rollups from them when the container initializes.
+#
+# --mysql REPLACES the contents of every table in the database from
+# api/.env: they are truncated, then filled with batched multi-row
+# INSERTs (--batch rows per statement and commit). Here and in load.sql
+# the finance triggers keep spending_daily / spending_monthly current
+# and the course ledger is rebuilt at the end.
+#
+# Users 1-4 are the app's personas (student, president, dean of the
+# first college, maintenance staff), as in the seed files.
+###
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.bench_snapshot import mysql_connection
+
+AS_OF = date(2025, 9, 1)
+
+COLLEGES = ['College of Composition', 'College of Jazz', 'College of Production', 'College of Vocal Arts',
+            'College of Piano', 'College of Strings', 'College of Wind Instruments', 'College of Percussion',
+            'College of Music Theory', 'College of Electronic Music']
+CAMPUSES = ['North', 'South', 'East', 'West', 'Harbor', 'Midtown', 'Lakeside', 'Uptown', 'Riverside', 'Hillcrest']
+SCHOOLS = ['Join University', 'Berklee College of Music', 'Juilliard School of Music', 'Curtis Institute of Music',
+           'Royal Conservatory of Melody', 'Manhattan School of Music', 'New Orleans Jazz Conservatory',
+           'Vienna Academy of Piano Arts', 'Guildhall School of Music Theory', 'Tokyo Electronic Music Institute',
+           'Dublin School of Folk Arts', 'Chicago School of Improvisation', 'Nashville Guitar Institute',
+           'Cambridge Choral Academy', 'Paris Violin Conservatoire', 'Los Angeles Drum Academy']
+ROLES = [(1, 'president'), (2, 'dean'), (3, 'student'), (4, 'advisor'), (5, 'professor'), (6, 'maintenance_staff')]
+
+FIRST_NAMES = ['Ada', 'Amir', 'Ana', 'Ben', 'Carla', 'Chen', 'Dana', 'Diego', 'Elena', 'Eli', 'Fatima', 'Felix',
+               'Grace', 'Hana', 'Hugo', 'Ines', 'Ivan', 'Jada', 'Jonah', 'Kai', 'Keiko', 'Lena', 'Liam', 'Maya',
+               'Mateo', 'Nadia', 'Noah', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Sofia', 'Tariq', 'Uma',
+               'Victor', 'Wen', 'Xavier', 'Yara', 'Zoe']
+LAST_NAMES = ['Abbott', 'Bach', 'Bianchi', 'Chopin', 'Costa', 'Dvorak', 'Ellis', 'Fischer', 'Garcia', 'Grieg',
+              'Haydn', 'Ito', 'Jensen', 'Kim', 'Liszt', 'Lopez', 'Mahler', 'Moreau', 'Nguyen', 'Novak', 'Okafor',
+              'Patel', 'Quintana', 'Ravel', 'Rossi', 'Satie', 'Schubert', 'Silva', 'Tanaka', 'Verdi', 'Wagner',
+              'Weber', 'Yamada', 'Zhang']
+
+TOPICS = ['Counterpoint', 'Orchestration', 'Ear Training', 'Music History', 'Improvisation', 'Ensemble',
+          'Sight Reading', 'Harmony', 'Conducting', 'Audio Engineering', 'Sound Design', 'Songwriting',
+          'Arranging', 'Chamber Music', 'Diction', 'Music Business', 'Film Scoring', 'Pedagogy']
+LEVELS = ['I', 'II', 'III', 'Seminar', 'Studio', 'Lab', 'Masterclass']
+
+INSTRUMENTS = [('Piano', 'keyboard'), ('Organ', 'keyboard'), ('Synthesizer', 'keyboard'), ('Guitar', 'string'),
+               ('Violin', 'string'), ('Viola', 'string'), ('Cello', 'string'), ('Double Bass', 'string'),
+               ('Harp', 'string'), ('Flute', 'wind'), ('Clarinet', 'wind'), ('Oboe', 'wind'),
+               ('Saxophone', 'wind'), ('Trumpet', 'wind'), ('Trombone', 'wind'), ('French Horn', 'wind'),
+               ('Drum Kit', 'percussion'), ('Timpani', 'percussion'), ('Marimba', 'percussion'),
+               ('Cajon', 'percussion')]
+CLUBS = [('chamber ensemble', 'performance'), ('jazz club', 'performance'), ('a cappella', 'performance'),
+         ('composers guild', 'academic'), ('music theory circle', 'academic'), ('recording society', 'technology'),
+         ('electronic music lab', 'technology'), ('world percussion', 'performance'),
+         ('musical theatre', 'performance'), ('music business club', 'professional'),
+         ('outreach orchestra', 'service'), ('film score club', 'academic')]
+TOOLS = [('Screwdriver', 15), ('Hammer', 10), ('Tuning Hammer', 8), ('Soldering Iron', 6), ('Multimeter', 5),
+         ('Cable Tester', 4), ('Ladder', 3), ('Drill', 4), ('Wrench Set', 6), ('Pliers', 10), ('Gaffer Tape', 40),
+         ('Replacement Strings', 60), ('Drum Key', 12), ('Valve Oil', 25), ('Pad Kit', 10), ('Light Bulbs', 80),
+         ('Fuse Set', 20), ('Plunger', 5), ('Shop Vacuum', 2), ('Allen Keys', 9)]
+
+BUILDINGS = ['music hall', 'jazz wing', 'recital hall', 'practice tower', 'studio block', 'percussion annex',
+             'library', 'east dorm', 'west dorm', 'production center']
+PROBLEMS = ['broken piano', 'piano tuning', 'lighting', 'projector', 'speaker', 'microphone', 'soundboard',
+            'chairs', 'music stand', 'drum kit', 'air conditioning', 'heating', 'door lock', 'plumbing', 'wifi']
+BURST_PROBLEMS = ['heating', 'air conditioning', 'plumbing', 'power outage', 'flooding', 'wifi']
+
+RACES = (['White', 'Asian', 'Hispanic', 'Black', 'Other'], [45, 20, 17, 12, 6])
+ORIGINS = (['in-state', 'out-of-state', 'international'], [55, 32, 13])
+
+DONORS = ['Family Foundation', 'Arts Trust', 'Music Society', 'Endowment', 'Charitable Fund']
+# category: (median amount, share of rows)
+EXPENSES = {'Salaries': (40000, 20), 'Equipment': (9000, 18), 'Supplies': (1200, 22), 'Production': (6000, 9),
+            'Travel': (3000, 8), 'Recording': (4500, 6), 'Instruments': (12000, 6), 'Printing': (800, 6),
+            'Repair': (2500, 5)}
+# relative activity by month: semester starts (Jan, Aug/Sep), fiscal year end (Jun), quiet summer / December
+EXPENSE_MONTHS = [0, 1.5, 1.0, 0.9, 0.9, 1.1, 1.7, 0.4, 1.4, 1.8, 1.0, 0.9, 0.6]
+DONATION_MONTHS = [0, 0.8, 0.8, 0.9, 1.0, 1.1, 1.4, 0.6, 0.7, 0.9, 1.0, 1.4, 3.2]
+
+# load order; parents before children
+TABLES = [
+    ('users', ('userId', 'firstName', 'lastName', 'emailAddress', 'dateOfBirth')),
+    ('roles', ('roleId', 'title')),
+    ('user_roles', ('roleId', 'userId')),
+    ('president', ('userId',)),
+    ('school_rankings', ('schoolName', 'ranking')),
+    ('deans', ('userId',)),
+    ('colleges', ('collegeName', 'dean', 'budget', 'status')),
+    ('professors', ('userId',)),
+    ('classrooms', ('roomNumber', 'status', 'lastMaintained')),
+    ('courses', ('id', 'name', 'time', 'enrollment', 'college', 'roomNumber', 'professorId', 'budget')),
+    ('professors_courses', ('professorId', 'courseId')),
+    ('advisors', ('userId',)),
+    ('instruments', ('instrumentId', 'name', 'isAvailable', 'type')),
+    ('students', ('userId', 'gpa', 'year', 'housingStatus', 'race', 'income', 'origin', 'college', 'advisor')),
+    ('alumni', ('studentId', 'hasJob')),
+    ('clubs', ('name', 'category', 'location', 'description')),
+    ('club_members', ('studentId', 'clubName', 'role')),
+    ('students_courses', ('studentId', 'courseId')),
+    ('rentals', ('studentID', 'instrumentID', 'startDate', 'returnDate')),
+    ('reserves', ('studentID', 'roomNumber', 'startTime', 'endTime')),
+    ('maintenance_staffs', ('staffId',)),
+    ('tools', ('productName', 'amount')),
+    ('maintenance_request', ('orderId', 'address', 'problemType', 'state', 'submitted', 'updated', 'description',
+                             'maintenanceStaffId', 'studentId')),
+    ('maintenance_staffs_maintenance_request', ('staffId', 'orderId', 'workHours')),
+    ('maintenance_request_tools', ('orderId', 'tool')),
+    ('course_donations', ('donorName', 'amount', 'donatedAt', 'courseId', 'note')),
+    ('course_expenses', ('amount', 'spentAt', 'courseId', 'category', 'memo')),
+]
+# maintained by triggers from course_expenses / course_donations
+DERIVED = ('course_finance_ledger', 'spending_daily', 'spending_monthly')
+
+
+def zipf(n, s):
+    """Cumulative weights of ranks 1..n under a Zipf(s) law."""
+    cum, total = [], 0.0
+    for k in range(1, n + 1):
+        total += 1.0 / k ** s
+        cum.append(total)
+    return cum
+
+
+def pick(rnd, cum):
+    """Index drawn from cumulative weights."""
+    return bisect_right(cum, rnd.random() * cum[-1])
+
+
+def cumulate(weights):
+    cum, total = [], 0.0
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+
+def seasonal_day(rnd, start, days, months, growth=0.0):
+    """A day in [start, start + days) weighted by month and a linear trend."""
+    top = max(months) * (1 + growth)
+    while True:
+        offset = rnd.randrange(days)
+        day = start + timedelta(days=offset)
+        if rnd.random() * top < months[day.month] * (1 + growth * offset / days):
+            return day
+
+
+def money(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+class Ids(object):
+    """User ids of one role: the persona id (if any), then a contiguous block."""
+
+    def __init__(self, persona, start, count):
+        self.persona = persona
+        self.start = start
+        self.count = count
+        self.block = count - (1 if persona else 0)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if self.persona:
+            return self.persona if i == 0 else self.start + i - 1
+        return self.start + i
+
+    def __iter__(self):
+        if self.persona:
+            yield self.persona
+        for uid in range(self.start, self.start + self.block):
+            yield uid
+
+
+class Universe(object):
+    """Sizes and the shared structure (who belongs where) of one data set; rows are generated per table."""
+
+    def __init__(self, scale=1.0, seed=7, as_of=AS_OF):
+        self.scale = scale
+        self.seed = seed
+        self.as_of = as_of
+        self.now = datetime.combine(as_of, datetime.min.time()) + timedelta(hours=12)
+
+        n_colleges = max(len(COLLEGES), int(round(len(COLLEGES) * scale ** 0.25)))
+        n_students = max(20, int(round(200 * scale)))
+        n_courses = max(n_colleges, int(round(50 * scale ** 0.75)))
+        self.sizes = {
+            'colleges': n_colleges,
+            'students': n_students,
+            'courses': n_courses,
+            'professors': max(n_colleges, int(round(n_courses * 0.8))),
+            'advisors': max(n_colleges, int(round(n_students / 40.0))),
+            'maintenance_staffs': max(4, int(round(n_students / 60.0))),
+            'classrooms': max(50, int(round(50 * scale ** 0.6))),
+            'instruments': max(len(INSTRUMENTS), int(round(40 * scale ** 0.6))),
+            'clubs': max(len(CLUBS), int(round(40 * scale ** 0.5))),
+            'maintenance_requests': max(10, int(round(n_students * 0.4))),
+            'donations': max(5, int(round(25 * scale))),
+            'expenses': max(10, int(round(60 * scale))),
+            'rentals': max(5, int(round(n_students * 0.4))),
+            'reserves': max(5, int(round(n_students * 0.2))),
+        }
+        self._layout()
+        self._plan()
+
+    def rng(self, stream):
+        return random.Random('%d:%s' % (self.seed, stream))
+
+    def _layout(self):
+        # personas keep the ids the app logs in with: 1 student, 2 president, 3 dean, 4 maintenance staff
+        sizes = self.sizes
+        self.president_id = 2
+        next_id = 5
+        blocks = {}
+        for role, persona in (('deans', 3), ('professors', None), ('advisors', None),
+                              ('maintenance_staffs', 4), ('students', 1)):
+            count = sizes['colleges'] if role == 'deans' else sizes[role]
+            blocks[role] = Ids(persona, next_id, count)
+            next_id += blocks[role].block
+        self.dean_ids = blocks['deans']
+        self.professor_ids = blocks['professors']
+        self.advisor_ids = blocks['advisors']
+        self.staff = blocks['maintenance_staffs']
+        self.student_ids = blocks['students']
+        self.rooms = [101 + i for i in range(sizes['classrooms'])]
+        self.college_names = list(COLLEGES)
+        for i in range(len(COLLEGES), sizes['colleges']):
+            base, campus = COLLEGES[i % len(COLLEGES)], CAMPUSES[(i // len(COLLEGES) - 1) % len(CAMPUSES)]
+            suffix = '' if i < len(COLLEGES) * (len(CAMPUSES) + 1) else ' %d' % i
+            self.college_names.append('%s, %s%s' % (base, campus, suffix))
+        self.club_names = []
+        for i in range(sizes['clubs']):
+            name, category = CLUBS[i % len(CLUBS)]
+            self.club_names.append((name if i < len(CLUBS) else '%s %d' % (name, i // len(CLUBS) + 1), category))
+
+    def _plan(self):
+        """College sizes, course -> college / professor / budget, student -> college / year."""
+        rnd = self.rng('plan')
+        sizes = self.sizes
+        n_colleges, n_courses = sizes['colleges'], sizes['courses']
+
+        # a few big colleges, a long tail of small ones
+        order = list(range(n_colleges))
+        rnd.shuffle(order)
+        weights = [0.0] * n_colleges
+        previous = 0.0
+        for rank, c in zip(zipf(n_colleges, 0.9), order):
+            weights[c], previous = rank - previous, rank
+        self.college_cum = cumulate(weights)
+
+        # every college gets a course, the rest follow college size
+        self.course_college = array('H', range(n_colleges))
+        self.course_college.extend(pick(rnd, self.college_cum) for _ in range(n_courses - n_colleges))
+        rnd.shuffle(self.course_college)
+        self.college_courses = [[] for _ in range(n_colleges)]
+        for i, c in enumerate(self.course_college):
+            self.college_courses[c].append(i + 1)
+        # popularity: Zipf over each college's courses, in random order
+        self.college_course_cum = []
+        for courses in self.college_courses:
+            rnd.shuffle(courses)
+            self.college_course_cum.append(zipf(len(courses), 1.1))
+        popularity = [0.0] * (n_courses + 1)
+        for c, courses in enumerate(self.college_courses):
+            cum, previous = self.college_course_cum[c], 0.0
+            for course, rank in zip(courses, cum):
+                popularity[course] = weights[c] * (rank - previous) / cum[-1]
+                previous = rank
+        self.course_cum = cumulate(popularity[1:])
+
+        college_scale = [0.6 + 0.8 * rnd.random() for _ in range(n_colleges)]
+        self.course_budget = array('i', (int(rnd.lognormvariate(math.log(250000), 0.5)
+                                             * college_scale[c]) for c in self.course_college))
+        self.budget_cum = cumulate(self.course_budget)
+        # ~6% of courses are waiting for a professor
+        professors = self.professor_ids
+        self.course_professor = array('i', (0 if rnd.random() < 0.06 else professors[rnd.randrange(len(professors))]
+                                            for _ in range(n_courses)))
+
+        self.student_college = array('H', (pick(rnd, self.college_cum) for _ in range(sizes['students'])))
+        self.student_year = array('B', (rnd.choices((1, 2, 3, 4), (30, 26, 23, 21))[0]
+                                        for _ in range(sizes['students'])))
+        # the persona student is in the persona dean's college
+        self.student_college[0] = 0
+
+    # ------------------------------------------------------------------
+    # people
+    # ------------------------------------------------------------------
+    def _people(self):
+        yield self.president_id, 'president'
+        for role, ids in (('dean', self.dean_ids), ('professor', self.professor_ids), ('advisor', self.advisor_ids),
+                          ('maintenance_staff', self.staff), ('student', self.student_ids)):
+            for i, uid in enumerate(ids):
+                yield uid, role if role != 'student' else i
+
+    def users(self):
+        rnd = self.rng('users')
+        for uid, role in self._people():
+            first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+            if role == 'president':
+                age = rnd.uniform(50, 68)
+            elif role in ('dean', 'professor', 'advisor', 'maintenance_staff'):
+                age = rnd.uniform(26, 66)
+            else:
+                age = 17.5 + self.student_year[role] + rnd.random() * (1.5 if rnd.random() < 0.9 else 8)
+            born = self.as_of - timedelta(days=int(age * 365.25))
+            yield uid, first, last, '%s.%s.%d@example.com' % (first.lower(), last.lower(), uid), born
+
+    def roles(self):
+        return iter(ROLES)
+
+    def user_roles(self):
+        yield 1, self.president_id
+        for role_id, ids in ((2, self.dean_ids), (3, self.student_ids), (4, self.advisor_ids), (5, self.professor_ids),
+                             (6, self.staff)):
+            for uid in ids:
+                yield role_id, uid
+
+    def president(self):
+        yield self.president_id,
+
+    def school_rankings(self):
+        rnd = self.rng('school_rankings')
+        names = SCHOOLS[1:] + self.college_names
+        rnd.shuffle(names)
+        for ranking, name in enumerate([SCHOOLS[0]] + names, 1):
+            yield name, ranking
+
+    def deans(self):
+        return ((uid,) for uid in self.dean_ids)
+
+    def professors(self):
+        return ((uid,) for uid in self.professor_ids)
+
+    def advisors(self):
+        return ((uid,) for uid in self.advisor_ids)
+
+    def maintenance_staffs(self):
+        return ((uid,) for uid in self.staff)
+
+    def students(self):
+        rnd = self.rng('students')
+        shift = [rnd.gauss(0, 0.15) for _ in self.college_names]
+        advisors = self.advisor_ids
+        for i, uid in enumerate(self.student_ids):
+            college, year = self.student_college[i], self.student_year[i]
+            gpa = None
+            if rnd.random() > 0.01:
+                gpa = money(min(4.0, max(0.0, rnd.gauss(3.05 + shift[college] + 0.05 * year, 0.45))))
+            housing = 'on-campus' if rnd.random() < (0.85, 0.55, 0.35, 0.25)[year - 1] else 'off-campus'
+            race = rnd.choices(*RACES)[0]
+            origin = rnd.choices(*ORIGINS)[0]
+            income = int(rnd.lognormvariate(math.log(70000), 0.6)) // 500 * 500
+            yield (uid, gpa, year, housing, race, income, origin, self.college_names[college],
+                   advisors[rnd.randrange(len(advisors))])
+
+    def alumni(self):
+        rnd = self.rng('alumni')
+        for i, uid in enumerate(self.student_ids):
+            if self.student_year[i] == 4 and rnd.random() < 0.5:
+                yield uid, rnd.random() < 0.72
+
+    # ------------------------------------------------------------------
+    # colleges and courses
+    # ------------------------------------------------------------------
+    def colleges(self):
+        budgets = [0] * len(self.college_names)
+        for c, budget in zip(self.course_college, self.course_budget):
+            budgets[c] += budget
+        for c, name in enumerate(self.college_names):
+            yield name, self.dean_ids[c], int(budgets[c] * 1.15) // 1000 * 1000, True
+
+    def classrooms(self):
+        rnd = self.rng('classrooms')
+        for room in self.rooms:
+            last = self.now - timedelta(days=rnd.uniform(0, 400))
+            yield (room, 'maintenance' if rnd.random() < 0.15 else 'available',
+                   last.replace(minute=0, second=0, microsecond=0))
+
+    def enrollment_counts(self):
+        counts = array('I', bytes(4 * (self.sizes['courses'] + 1)))
+        for _, course in self.students_courses():
+            counts[course] += 1
+        return counts
+
+    def courses(self):
+        rnd = self.rng('courses')
+        counts = self.enrollment_counts()
+        # this term started on the last Sep 1 / Jan 15 before as_of
+        fall = date(self.as_of.year if self.as_of.month >= 9 else self.as_of.year - 1, 9, 1)
+        spring = date(fall.year + 1, 1, 15)
+        term = spring if spring <= self.as_of else fall
+        for i, college in enumerate(self.course_college):
+            course = i + 1
+            name = '%s %s' % (rnd.choice(TOPICS), rnd.choice(LEVELS))
+            when = datetime.combine(term + timedelta(days=rnd.randrange(5)), datetime.min.time()) + \
+                timedelta(hours=rnd.randrange(8, 19))
+            yield (course, name, when, counts[course], self.college_names[college],
+                   self.rooms[rnd.randrange(len(self.rooms))], self.course_professor[i] or None,
+                   self.course_budget[i])
+
+    def professors_courses(self):
+        for i, professor in enumerate(self.course_professor):
+            if professor:
+                yield professor, i + 1
+
+    def students_courses(self):
+        rnd = self.rng('students_courses')
+        n_courses = self.sizes['courses']
+        for i, uid in enumerate(self.student_ids):
+            college = self.student_college[i]
+            own, own_cum = self.college_courses[college], self.college_course_cum[college]
+            wanted = min(n_courses, rnd.choices((2, 3, 4, 5, 6), (10, 25, 35, 20, 10))[0])
+            taken = set()
+            for _ in range(wanted * 4):
+                if len(taken) == wanted:
+                    break
+                if rnd.random() < 0.8:
+                    taken.add(own[pick(rnd, own_cum)])
+                else:
+                    taken.add(pick(rnd, self.course_cum) + 1)
+            for course in sorted(taken):
+                yield uid, course
+
+    # ------------------------------------------------------------------
+    # clubs, instruments, rooms
+    # ------------------------------------------------------------------
+    def clubs(self):
+        rnd = self.rng('clubs')
+        for name, category in self.club_names:
+            yield (name, category, self.rooms[rnd.randrange(len(self.rooms))],
+                   'Student %s club: %s. All levels welcome.' % (category, name))
+
+    def club_members(self):
+        rnd = self.rng('club_members')
+        cum = zipf(len(self.club_names), 0.8)
+        for uid in self.student_ids:
+            if rnd.random() >= 0.35:
+                continue
+            joined = set([pick(rnd, cum)])
+            if rnd.random() < 0.3:
+                joined.add(pick(rnd, cum))
+            for club in sorted(joined):
+                yield uid, self.club_names[club][0], 'officer' if rnd.random() < 0.08 else 'member'
+
+    def instruments(self):
+        rnd = self.rng('instruments')
+        for i in range(self.sizes['instruments']):
+            name, kind = INSTRUMENTS[i % len(INSTRUMENTS)]
+            yield i + 1, name, rnd.random() < 0.85, kind
+
+    def rentals(self):
+        rnd = self.rng('rentals')
+        cum = zipf(self.sizes['instruments'], 1.0)
+        students = self.student_ids
+        for _ in range(self.sizes['rentals']):
+            start = self.as_of - timedelta(days=rnd.randrange(365))
+            end = start + timedelta(days=rnd.randint(3, 60))
+            yield (students[rnd.randrange(len(students))], pick(rnd, cum) + 1, start,
+                   end if end <= self.as_of else None)
+
+    def reserves(self):
+        rnd = self.rng('reserves')
+        cum = zipf(len(self.rooms), 0.9)
+        students = self.student_ids
+        start = self.now.replace(hour=0) - timedelta(days=30)
+        taken = set()
+        for _ in range(self.sizes['reserves']):
+            while True:
+                room = self.rooms[pick(rnd, cum)]
+                slot = start + timedelta(days=rnd.randrange(60), hours=rnd.randrange(8, 22))
+                if (room, slot) not in taken:
+                    break
+            taken.add((room, slot))
+            yield (students[rnd.randrange(len(students))], room, slot,
+                   slot + timedelta(hours=rnd.choice((1, 1, 2))))
+
+    # ------------------------------------------------------------------
+    # maintenance
+    # ------------------------------------------------------------------
+    def tools(self):
+        scale = max(1.0, self.scale ** 0.5)
+        return ((name, int(amount * scale)) for name, amount in TOOLS)
+
+    def _requests(self):
+        """(orderId, submitted, burst or None) in submission order."""
+        rnd = self.rng('maintenance_request.timeline')
+        n = self.sizes['maintenance_requests']
+        bursts = [(self.now - timedelta(days=rnd.uniform(1, 365)), rnd.choice(BURST_PROBLEMS),
+                   rnd.choice(BUILDINGS)) for _ in range(max(1, n // 150))]
+        cum = zipf(len(bursts), 1.0)
+        times = []
+        for _ in range(n):
+            if rnd.random() < 0.33:
+                b = pick(rnd, cum)
+                times.append((min(self.now, bursts[b][0] + timedelta(hours=rnd.expovariate(1 / 18.0))), b))
+                continue
+            while True:
+                day = self.now - timedelta(days=rnd.randrange(365))
+                if day.weekday() < 5 or rnd.random() < 0.4:
+                    break
+            times.append((day.replace(hour=rnd.randrange(8, 20), minute=rnd.randrange(60)), None))
+        times.sort(key=lambda t: t[0])
+        for order, (submitted, b) in enumerate(times, 1):
+            yield order, submitted.replace(microsecond=0), bursts[b] if b is not None else None
+
+    def maintenance_request(self):
+        rnd = self.rng('maintenance_request')
+        staff_cum = zipf(len(self.staff), 0.7)
+        students = self.student_ids
+        for order, submitted, burst in self._requests():
+            if burst:
+                problem, building = burst[1], burst[2]
+            else:
+                problem, building = rnd.choice(PROBLEMS), rnd.choice(BUILDINGS)
+            age = (self.now - submitted).total_seconds() / 86400
+            still_open = rnd.random() < (0.8 if age < 3 else 0.4 if age < 14 else 0.03)
+            if still_open:
+                updated = submitted + timedelta(hours=rnd.uniform(0, min(age * 24, 12)))
+            else:
+                updated = min(self.now, submitted + timedelta(days=rnd.expovariate(1 / 3.0)))
+            staff = self.staff[pick(rnd, staff_cum)] if not (still_open and rnd.random() < 0.3) else None
+            student = students[rnd.randrange(len(students))] if rnd.random() < 0.85 else None
+            yield (order, '%d %s' % (rnd.randrange(100, 400), building), problem, still_open, submitted,
+                   updated.replace(microsecond=0), '%s reported in the %s' % (problem, building), staff, student)
+
+    def maintenance_staffs_maintenance_request(self):
+        rnd = self.rng('maintenance_staffs_maintenance_request')
+        staff_cum = zipf(len(self.staff), 0.7)
+        for order, _, _, still_open, _, _, _, staff, _ in self.maintenance_request():
+            if staff is None:
+                continue
+            crew = set([staff])
+            if rnd.random() < 0.2:
+                crew.add(self.staff[pick(rnd, staff_cum)])
+            for member in sorted(crew):
+                hours = rnd.randint(0, 2) if still_open else max(1, int(rnd.lognormvariate(math.log(3), 0.7)))
+                yield member, order, hours
+
+    def maintenance_request_tools(self):
+        rnd = self.rng('maintenance_request_tools')
+        cum = zipf(len(TOOLS), 0.8)
+        for order in range(1, self.sizes['maintenance_requests'] + 1):
+            used = set(pick(rnd, cum) for _ in range(rnd.choices((0, 1, 2, 3), (25, 40, 25, 10))[0]))
+            for tool in sorted(used):
+                yield order, TOOLS[tool][0]
+
+    # ------------------------------------------------------------------
+    # finance
+    # ------------------------------------------------------------------
+    def course_donations(self):
+        rnd = self.rng('course_donations')
+        start = self.as_of - timedelta(days=729)
+        for _ in range(self.sizes['donations']):
+            day = seasonal_day(rnd, start, 730, DONATION_MONTHS)
+            amount = money(min(500000, 1000 * rnd.paretovariate(1.2)))
+            course = pick(rnd, self.budget_cum) + 1
+            donor = '%s %s' % (rnd.choice(LAST_NAMES), rnd.choice(DONORS))
+            yield donor, amount, day, course, 'Gift toward course %d' % course
+
+    def course_expenses(self):
+        rnd = self.rng('course_expenses')
+        start = self.as_of - timedelta(days=729)
+        categories = list(EXPENSES)
+        shares = [EXPENSES[c][1] for c in categories]
+        for _ in range(self.sizes['expenses']):
+            day = seasonal_day(rnd, start, 730, EXPENSE_MONTHS, growth=0.3)
+            category = rnd.choices(categories, shares)[0]
+            amount = money(rnd.lognormvariate(math.log(EXPENSES[category][0]), 0.6))
+            yield amount, day, pick(rnd, self.budget_cum) + 1, category, '%s for %s' % (category, day.isoformat())
+
+    def rows(self, table):
+        return getattr(self, table)()
+
+
+# ----------------------------------------------------------------------
+# output
+# ----------------------------------------------------------------------
+def _tsv(value):
+    if value is None:
+        return '\\N'
+    if value is True or value is False:
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return str(value)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _report(table, count, started):
+    print("%-40s %12d rows  %6.1fs" % (table, count, time.perf_counter() - started))
+
+
+def write_tsv(universe, out):
+    for table, columns in TABLES:
+        started, count = time.perf_counter(), 0
+        with open(os.path.join(out, table + '.tsv'), 'w', encoding='utf-8', newline='\n') as f:
+            for row in universe.rows(table):
+                f.write('\t'.join(_tsv(v) for v in row) + '\n')
+                count += 1
+        _report(table, count, started)
+
+    from backend.finance.ledger import _REBUILD
+
+    with open(os.path.join(out, 'load.sql'), 'w', encoding='utf-8', newline='\n') as f:
+        f.write("-- generated by benchmarks/synthetic_data.py (scale %s, seed %d, as of %s)\n"
+                "-- cd into this directory, then: mysql --local-infile=1 -u root -p < load.sql\n"
+                "USE bachEndDatabase;\nSET FOREIGN_KEY_CHECKS = 0;\nSET UNIQUE_CHECKS = 0;\n"
+                % (universe.scale, universe.seed, universe.as_of))
+        for table in DERIVED + tuple(t for t, _ in reversed(TABLES)):
+            f.write("TRUNCATE TABLE %s;\n" % table)
+        for table, columns in TABLES:
+            f.write("LOAD DATA LOCAL INFILE '%s.tsv' INTO TABLE %s CHARACTER SET utf8mb4 (%s);\n"
+                    % (table, table, ', '.join(columns)))
+        f.write("SET UNIQUE_CHECKS = 1;\nSET FOREIGN_KEY_CHECKS = 1;\n%s;\n" % _REBUILD.strip())
+
+
+def write_sql(universe, out, batch):
+    from pymysql.converters import escape_item
+
+    for n, (table, columns) in enumerate(TABLES, 1):
+        started, count = time.perf_counter(), 0
+        with open(os.path.join(out, '%03d_%s.sql' % (n, table)), 'w', encoding='utf-8', newline='\n') as f:
+            f.write("USE bachEndDatabase;\n")
+            for rows in _batches(universe.rows(table), batch):
+                f.write("\nINSERT INTO %s (%s) VALUES\n" % (table, ', '.join(columns)))
+                f.write(',\n'.join('(%s)' % ', '.join(escape_item(v, 'utf8mb4') for v in row) for row in rows))
+                f.write(';\n')
+                count += len(rows)
+        _report(table, count, started)
+
+
+def load_mysql(universe, conn, batch):
+    from backend.finance import ledger
+
+    with conn.cursor() as cur:
+        cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+        cur.execute("SET UNIQUE_CHECKS = 0")
+        for table in DERIVED + tuple(t for t, _ in reversed(TABLES)):
+            cur.execute("TRUNCATE TABLE %s" % table)
+        for table, columns in TABLES:
+            started, count = time.perf_counter(), 0
+            sql = "INSERT INTO %s (%s) VALUES (%s)" % (table, ', '.join(columns), ', '.join(['%s'] * len(columns)))
+            for rows in _batches(universe.rows(table), batch):
+                cur.executemany(sql, rows)
+                conn.commit()
+                count += len(rows)
+            _report(table, count, started)
+        cur.execute("SET UNIQUE_CHECKS = 1")
+        cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    ledger.rebuild(conn)
+    print("course_finance_ledger rebuilt")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='1 ~ the seed files (200 students)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--as-of', default=AS_OF.isoformat(),
+                        help="date the data ends at (YYYY-MM-DD or 'today'); fixed by default for reproducibility")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--out', help='directory to write bulk-load files to')
+    target.add_argument('--mysql', action='store_true', help='replace the data in the database from api/.env')
+    parser.add_argument('--format', choices=('tsv', 'sql'), default='tsv', help='file format for --out')
+    parser.add_argument('--batch', type=int, default=5000, help='rows per INSERT statement / commit')
+    args = parser.parse_args(argv)
+
+    as_of = date.today() if args.as_of == 'today' else datetime.strptime(args.as_of, '%Y-%m-%d').date()
+    universe = Universe(args.scale, args.seed, as_of)
+    print("scale %s, seed %d, as of %s: %s" % (args.scale, args.seed, as_of,
+                                               ', '.join('%s=%d' % kv for kv in sorted(universe.sizes.items()))))
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        if args.format == 'sql':
+            write_sql(universe, args.out, args.batch)
+        else:
+            write_tsv(universe, args.out)
+        print("written to %s" % args.out)
+    elif args.mysql:
+        load_mysql(universe, mysql_connection(), args.batch)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
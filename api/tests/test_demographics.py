@@ -0,0 +1,19 @@
+from backend.metrics import demographics
+
+CUBE = [
+    {'college': 'College of Jazz', 'origin': 'in-state', 'housingStatus': 'on-campus', 'race': 'Asian',
+     'incomeBracket': '$75k+', 'num_students': 3},
+    {'college': 'College of Jazz', 'origin': 'international', 'housingStatus': 'off-campus', 'race': 'White',
+     'incomeBracket': '<$25k', 'num_students': 1},
+    {'college': 'College of Piano', 'origin': 'in-state', 'housingStatus': 'on-campus', 'race': 'Black',
+     'incomeBracket': '$75k+', 'num_students': 2},
+]
+
+
+def test_for_college_matches_like_the_collation(monkeypatch):
+    monkeypatch.setattr(demographics, 'cube', lambda: CUBE)
+    expected = demographics.for_college('College of Jazz')
+    assert sum(r['num_students'] for r in expected if r['type'] == 'origin') == 4
+    assert demographics.for_college('college of jazz') == expected
+    assert demographics.for_college('Cöllege of Jázz') == expected
+    assert demographics.for_college('College of Strings') == []
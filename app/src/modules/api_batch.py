@@ -0,0 +1,48 @@
+# Several API GETs in one round trip.
+#
+# POST /api/_batch runs the GETs inside the API process and returns
+# every result at once, so a page that needs four endpoints pays for
+# one HTTP request instead of four. batch_get() hands back objects
+# with the bits of requests.Response the pages use (status_code,
+# json(), text), keyed by the path that was asked for.
+
+import json
+
+import requests
+import streamlit as st
+
+BATCH_URL = "http://web-api:4000/api/_batch"
+
+
+class BatchResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    @property
+    def text(self):
+        return self._body if isinstance(self._body, str) else json.dumps(self._body)
+
+
+def batch_get(paths, timeout=10):
+    """{path: BatchResponse} for API paths like "/students/7/schedule"."""
+    response = requests.post(BATCH_URL, json={"requests": list(paths)}, timeout=timeout)
+    response.raise_for_status()
+    return {path: BatchResponse(item["status"], item["body"])
+            for path, item in zip(paths, response.json()["responses"])}
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def student_overview(student_id):
+    """Everything the student pages show about one student, in one batch:
+    clubs, memberships, schedule and advisor. Reused across those pages
+    for a few seconds."""
+    return batch_get([
+        "/clubs",
+        f"/club_members/{student_id}",
+        f"/students/{student_id}/schedule",
+        f"/advisors/{student_id}",
+    ])
@@ -0,0 +1,38 @@
+# Conditional GETs for endpoints that send an ETag.
+#
+# Streamlit reruns the whole page script on every widget change. For
+# endpoints like /rankings or /metrics/demographics we remember the
+# last response and its ETag, and send If-None-Match next time; when
+# the API answers 304 we reuse the response we already have.
+
+import threading
+
+import requests
+
+_MAX_ENTRIES = 256
+_responses = {}
+_lock = threading.Lock()
+
+
+def _key(url, params):
+    return url, tuple(sorted((params or {}).items()))
+
+
+def cached_get(url, params=None, timeout=10):
+    """requests.get() that revalidates a previously fetched response."""
+    key = _key(url, params)
+    with _lock:
+        cached = _responses.get(key)
+    headers = {}
+    if cached is not None:
+        headers['If-None-Match'] = cached.headers['ETag']
+
+    response = requests.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached
+    if response.status_code == 200 and response.headers.get('ETag'):
+        with _lock:
+            if key not in _responses and len(_responses) >= _MAX_ENTRIES:
+                _responses.pop(next(iter(_responses)))
+            _responses[key] = response
+    return response
@@ -0,0 +1,58 @@
+# Helpers for pages that list rows from a paginated API endpoint.
+#
+# The list endpoints accept ?limit=&after= and return the cursor for
+# the following page in the X-Next-Cursor header. We keep the trail of
+# cursors in session state so "Previous" can walk back without the API
+# having to support it.
+
+import streamlit as st
+
+from modules.http_cache import cached_get
+
+PAGE_SIZE = 50
+
+
+def fetch_page(url, key, params=None, limit=PAGE_SIZE, timeout=10):
+    """GET the current page of `url` for the pager stored under `key`."""
+    params = dict(params or {})
+    state = st.session_state.setdefault(key, {'params': None, 'trail': [None], 'next': None})
+    if state['params'] != params:
+        # the filters changed, so start over from the first page
+        state.update(params=params, trail=[None], next=None)
+
+    query = dict(params, limit=limit)
+    if state['trail'][-1]:
+        query['after'] = state['trail'][-1]
+    response = cached_get(url, params=query, timeout=timeout)
+    state['next'] = response.headers.get('X-Next-Cursor') if response.status_code == 200 else None
+    return response
+
+
+def _next_page(key):
+    state = st.session_state[key]
+    if state['next']:
+        state['trail'].append(state['next'])
+
+
+def _previous_page(key):
+    state = st.session_state[key]
+    if len(state['trail']) > 1:
+        state['trail'].pop()
+
+
+def page_number(key):
+    return len(st.session_state[key]['trail'])
+
+
+def page_controls(key):
+    """Previous / Next buttons for the pager stored under `key`."""
+    state = st.session_state[key]
+    prev_col, label_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("← Previous", key=f"{key}_prev", disabled=len(state['trail']) == 1,
+                  on_click=_previous_page, args=(key,))
+    with label_col:
+        st.caption(f"Page {page_number(key)}")
+    with next_col:
+        st.button("Next →", key=f"{key}_next", disabled=not state['next'],
+                  on_click=_next_page, args=(key,))
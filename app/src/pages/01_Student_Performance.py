@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 from modules.nav import SideBarLinks
+from modules.http_cache import cached_get
 import requests
 
 # Call the SideBarLinks from the nav module in the modules directory
@@ -28,7 +29,7 @@ st.write("This histogram shows the distribution of average GPAs across different
     "Each bar represents the number of colleges that fall within a specific average GPA range. " \
     "The dashed line indicates the overall mean GPA across all colleges.")
 try:
-        response = requests.get('http://web-api:4000/api/colleges/averages/gpa')
+        response = cached_get('http://web-api:4000/api/colleges/averages/gpa')
         if response.status_code == 200:
             data = response.json()
 
@@ -83,26 +84,34 @@ try:
         st.write("This box plot illustrates the distribution of individual student GPAs within each college. " \
         "Each box represents the IQR of GPAs for students in that college, along with the median GPA. " \
         "The whiskers extend to 1.5 times the IQR, and any points outside this range are considered outliers.")
-        response = requests.get('http://web-api:4000/api/students/gpas')
+        # the API computes the box-plot statistics, so the payload is one row per college
+        response = cached_get('http://web-api:4000/api/students/gpas/summary')
         if response.status_code == 200:
             data = response.json()
 
             # convert to dataframe
             df = pd.DataFrame(data)
-            df['gpa'] = pd.to_numeric(df['gpa'])
+            colleges = df['college'].tolist()
 
             # box plot!
             fig, ax = plt.subplots(figsize=(12, 8))
-            
-            # get unique colleges
-            colleges = df['college'].unique()
-            gpa_by_college = []
-            for college in colleges:
-                college_gpas = df[df['college'] == college]['gpa'].tolist()
-                gpa_by_college.append(college_gpas)
-            
+
+            # one stats dict per college, in the shape matplotlib's bxp expects
+            box_stats = []
+            for row in data:
+                box_stats.append({
+                    'label': row['college'],
+                    'med': row['median'],
+                    'q1': row['q1'],
+                    'q3': row['q3'],
+                    'whislo': row['whiskerLow'],
+                    'whishi': row['whiskerHigh'],
+                    'fliers': row['outliers'],
+                    'mean': row['mean'],
+                })
+
             # create box plot
-            boxplot = ax.boxplot(gpa_by_college, labels=colleges, patch_artist=True)
+            boxplot = ax.bxp(box_stats, patch_artist=True)
             
             # labels, title, grid
             ax.set_xlabel('College')
@@ -127,9 +136,9 @@ try:
             
             # stats
             st.subheader("Summary Statistics by College")
-            summary_stats = df.groupby('college')['gpa'].agg([
+            summary_stats = df.set_index('college')[[
                 'count', 'mean', 'median', 'std', 'min', 'max'
-            ]).round(3).rename(columns={
+            ]].round(3).rename(columns={
             'count': 'Students',
             'mean': 'Average GPA',
             'median': 'Median GPA',
@@ -139,16 +148,22 @@ try:
 })
             st.dataframe(summary_stats)
             
-            # show data
-            st.subheader("Individual Student GPAs by College")
+        else:
+            st.error(f"Failed to fetch data: HTTP {response.status_code}")
 
-            df_display = df.sort_values(['college', 'gpa']).rename(columns={
-                'college': 'College',
-                'gpa': 'Anonymous Student GPA'
-            })
+        # show data
+        st.subheader("Student GPAs by College")
+        st.write("Number of students in each GPA range, per college.")
+        n_bins = st.slider("GPA ranges", min_value=4, max_value=40, value=16, step=4)
 
-            st.dataframe(df_display, hide_index=True)
-            
+        response = cached_get('http://web-api:4000/api/students/gpas/histogram', params={'bins': n_bins})
+        if response.status_code == 200:
+            df = pd.DataFrame(response.json())
+            if not df.empty:
+                df['GPA Range'] = df['lo'].map('{:.2f}'.format) + '–' + df['hi'].map('{:.2f}'.format)
+                df_display = df.pivot(index='GPA Range', columns='college', values='count')
+                st.bar_chart(df_display)
+                st.dataframe(df_display, use_container_width=True)
         else:
             st.error(f"Failed to fetch data: HTTP {response.status_code}")
             
@@ -163,7 +178,7 @@ st.subheader("College Rankings")
 st.write("This table shows the national rankings of colleges.")
 
 try:
-    response = requests.get(f"http://web-api:4000/api/rankings/compare")
+    response = cached_get("http://web-api:4000/api/rankings/compare")
     if response.status_code == 200:
         data = response.json()
         if data: 
@@ -6,6 +6,7 @@ import streamlit as st
 from streamlit_extras.app_logo import add_logo
 import plotly.express as px
 from modules.nav import SideBarLinks
+from modules.http_cache import cached_get
 import requests
 
 # Sidebar navigation
@@ -15,12 +16,20 @@ SideBarLinks()
 st.header("Student Demographics Data")
 st.write(f"### Hi, {st.session_state['first_name']}.")
 
-# Fetch the single demographics dataset
+# Fetch the whole-school and per-college demographics (one call each)
 try:
-    response = requests.get("http://web-api:4000/api/metrics/demographics")
+    response = cached_get("http://web-api:4000/api/metrics/demographics")
+    by_college = cached_get("http://web-api:4000/api/metrics/demographics/colleges")
     if response.status_code == 200:
         df = pd.DataFrame(response.json())
 
+        # Optional: narrow every chart to one college
+        df_colleges = pd.DataFrame(by_college.json()) if by_college.status_code == 200 else pd.DataFrame()
+        colleges = sorted(df_colleges["college"].dropna().unique()) if "college" in df_colleges.columns else []
+        scope = st.selectbox("Show", ["All students"] + list(colleges))
+        if scope != "All students":
+            df = df_colleges[df_colleges["college"] == scope].drop(columns=["college"])
+
         # Expecting columns: type, category, num_students, percentage
         if not {'type', 'category', 'num_students', 'percentage'}.issubset(df.columns):
             st.error("API did not return expected columns.")
@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.paging import fetch_page, page_controls
 import requests
 
 # Call the SideBarLinks from the nav module in the modules directory
@@ -21,7 +22,7 @@ try:
    # Display maintenance requests
     user_id = st.session_state.get('user_id') 
     API_URL = f"http://web-api:4000/api/maintenance-requests/staff/{user_id}"
-    response = requests.get(API_URL)
+    response = fetch_page(API_URL, "staff_requests_page")
     
     if response.status_code == 200:
         data = response.json()
@@ -44,7 +45,8 @@ try:
             }, inplace=True)
             
             st.dataframe(df, use_container_width=True, hide_index=True)
-            st.info(f"Total Requests: {len(df)}")
+            st.info(f"Showing {len(df)} requests")
+            page_controls("staff_requests_page")
         else:
             st.warning("No maintenance requests found")
     else:
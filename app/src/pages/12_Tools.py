@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.paging import fetch_page, page_controls
 import requests
 
 # Call the SideBarLinks from the nav module in the modules directory
@@ -19,7 +20,7 @@ st.write(f"### Hi, {st.session_state['first_name']}, here's your tools inventory
 try:
     # Display tools
     API_URL = "http://web-api:4000/api/tools"
-    response = requests.get(API_URL)
+    response = fetch_page(API_URL, "tools_page")
     
     if response.status_code == 200:
         data = response.json()
@@ -34,7 +35,8 @@ try:
                 }, inplace=True)
             
             st.dataframe(df, use_container_width=True, hide_index=True)
-            st.info(f"Total Tools: {len(df)}")
+            st.info(f"Showing {len(df)} tools")
+            page_controls("tools_page")
         else:
             st.warning("No tools found")
     else:
@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.paging import fetch_page, page_controls
 import requests
 
 # Call the SideBarLinks from the nav module in the modules directory
@@ -32,7 +33,7 @@ try:
     if year_filter:
         params['year'] = year_filter
     
-    response = requests.get(API_URL, params=params)
+    response = fetch_page(API_URL, "admin_students_page", params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -56,7 +57,8 @@ try:
             }, inplace=True)
 
             st.dataframe(df, use_container_width=True, hide_index=True)
-            st.info(f"Total Students: {len(df)}")
+            st.info(f"Showing {len(df)} students")
+            page_controls("admin_students_page")
         else:
             st.warning("No students found")
     else:
@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.api_batch import batch_get, student_overview
 import requests
 
 # Call the SideBarLinks from the nav module in the modules directory
@@ -17,10 +18,17 @@ st.write(f"### Hi, {st.session_state['first_name']}.")
 
 main_col, right_col = st.columns([3, 1]) 
 
+# clubs and this student's memberships arrive in one batched request
+student_id = st.session_state.get('student_id') 
+try:
+    overview = student_overview(student_id) if student_id else batch_get(["/clubs"])
+except requests.exceptions.RequestException as e:
+    st.error(f"Error connecting to API: {str(e)}")
+    st.stop()
+
 with main_col:
     try:
-        API_URL = "http://web-api:4000/api/clubs"
-        response = requests.get(API_URL)
+        response = overview["/clubs"]
         if response.status_code == 200:
             data = response.json()
             if data: 
@@ -59,11 +67,10 @@ with main_col:
         st.error(f"Error displaying clubs: {str(e)}")
 
 with right_col:
-    student_id = st.session_state.get('student_id') 
-    if student_id:
-        API_URL = f"http://web-api:4000/api/club_members/{student_id}"
-
-    response = requests.get(API_URL)
+    response = overview.get(f"/club_members/{student_id}")
+    if response is None:
+        st.info("Log in as a student to see your club memberships.")
+        st.stop()
 
     if response.status_code == 200:
         data = response.json()
@@ -3,6 +3,7 @@ import requests
 import pandas as pd
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.paging import fetch_page, page_controls
 from datetime import datetime, date, timedelta
 
 # Initialize sidebar
@@ -11,7 +12,7 @@ SideBarLinks()
 st.title("Instrument Rentals")
 try:
     API_URL_viewing = "http://api:4000/api/instruments"
-    response = requests.get(API_URL_viewing, timeout=10)
+    response = fetch_page(API_URL_viewing, "instruments_page")
 
     if response.status_code == 200:
         data = response.json()
@@ -22,7 +23,8 @@ try:
                 df = df.drop(columns=["isAvailable"])
             st.subheader("Available Instruments for Rental")
             st.dataframe(df, use_container_width=True, hide_index=True)
-            st.info(f"Total Available Instruments: {len(df)}")
+            st.info(f"Showing {len(df)} instruments")
+            page_controls("instruments_page")
         else:
             st.warning("No instruments found — API returned an empty list.")
     else:
@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.api_batch import student_overview
 import requests
 
 # Show appropriate sidebar links for the role of the currently logged in user
@@ -21,8 +22,8 @@ try:
     st.write(f"### Student ID: {student_id}")
 
     if student_id:
-        API_URL = f"http://web-api:4000/api/students/{student_id}/schedule"
-        response = requests.get(API_URL)
+        # fetched together with the student's clubs and advisor
+        response = student_overview(student_id)[f"/students/{student_id}/schedule"]
 
         if response.status_code == 200:
             data = response.json()
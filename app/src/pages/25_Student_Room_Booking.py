@@ -8,6 +8,7 @@ from datetime import datetime, date
 
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.paging import fetch_page, page_controls
 
 # Sidebar links
 SideBarLinks()
@@ -21,7 +22,7 @@ st.write(f"### Hi, {st.session_state['first_name']}.")
 # -------------------------------
 try:
     API_URL_viewing = "http://api:4000/api/classrooms"
-    response = requests.get(API_URL_viewing, timeout=10)
+    response = fetch_page(API_URL_viewing, "rooms_page")
 
     if response.status_code == 200:
         data = response.json()
@@ -32,7 +33,8 @@ try:
                 df = df.drop(columns=["lastMaintained"])
             st.subheader("Available Classrooms for Booking")
             st.dataframe(df, use_container_width=True, hide_index=True)
-            st.info(f"Total Available Classrooms: {len(df)}")
+            st.info(f"Showing {len(df)} classrooms")
+            page_controls("rooms_page")
         else:
             st.warning("No classrooms found — API returned an empty list.")
     else:
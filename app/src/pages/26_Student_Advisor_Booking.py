@@ -5,6 +5,7 @@ import streamlit as st
 import requests
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules.api_batch import student_overview
 from datetime import datetime
 
 
@@ -21,8 +22,8 @@ st.write(f"### Hi, {st.session_state['first_name']}.")
 try:
     student_id = st.session_state.get('student_id') 
     if student_id:
-        API_URL = f"http://web-api:4000/api/advisors/{student_id}"
-        response = requests.get(API_URL)
+        # fetched together with the student's clubs and schedule
+        response = student_overview(student_id)[f"/advisors/{student_id}"]
 
     if response.status_code == 200:
         data = response.json()
@@ -35,20 +35,26 @@ if dean_id is None:
     st.error("No dean_id in session. Set st.session_state['dean_id'] at login.")
     st.stop()
 
-# --- Resolve the dean's college once ---
-@st.cache_data(ttl=300, show_spinner=False)
-def get_dean_college(_dean_id: int) -> str | None:
+# --- Everything on this page in one request ---
+@st.cache_data(ttl=60, show_spinner=False)
+def get_dashboard(dean_id: int) -> dict:
     """
-    Calls GET /metrics/deans/<id>/college -> {"collegeName": "..."} or {}
+    Calls GET /metrics/deans/<id>/dashboard ->
+    {"college", "enrollmentTotal", "courses", "enrollmentTrends", "alumniPlacement", "budget"}
+    The API resolves the college once and reads every panel from the same data.
     """
     try:
-        data = get_json(f"/metrics/deans/{_dean_id}/college")
-        return (data or {}).get("collegeName")
+        return get_json(f"/metrics/deans/{dean_id}/dashboard") or {}
     except Exception:
-        return None
+        return {}
+
+dashboard = get_dashboard(dean_id)
+
+# one row per course: enrollment, enrolled, instructors, average_gpa, budget, is_vacant
+df_dash_courses = pd.DataFrame(dashboard.get("courses") or [])
 
-# Prefer session value if set, otherwise fetch from API
-dean_college = st.session_state.get("college") or get_dean_college(dean_id)
+# Prefer session value if set, otherwise take it from the dashboard
+dean_college = st.session_state.get("college") or dashboard.get("college")
 
 if not dean_college:
     st.warning("Could not determine your college yet. Some panels may be empty.")
@@ -59,11 +65,21 @@ else:
 # --- Key KPI row (place BEFORE the top panels) ---
 with st.container():
     try:
-        data = get_json(f"/metrics/deans/{dean_id}/students/enrollment-total")
-        total_enroll = int((data or {}).get("totalEnrollment") or 0)
-        kpi_col, _ = st.columns([1, 3], gap="large")
+        data = dashboard.get("enrollmentTotal")
+        if data is None:
+            raise ValueError("missing from dashboard")
+        total_enroll = int(data.get("totalEnrollment") or 0)
+        placement = dashboard.get("alumniPlacement") or {}
+        budget = dashboard.get("budget") or {}
+        kpi_col, placement_col, budget_col, _ = st.columns([1, 1, 1, 1], gap="large")
         with kpi_col:
             st.metric("Total Students Enrolled (College-wide)", f"{total_enroll:,}")
+        with placement_col:
+            rate = placement.get("placementRate")
+            st.metric("Alumni Placement Rate", f"{float(rate):.1f}%" if rate is not None else "—")
+        with budget_col:
+            remaining = budget.get("remaining")
+            st.metric("Budget Remaining", f"${float(remaining):,.0f}" if remaining is not None else "—")
     except Exception as e:
         st.caption(f"Unable to load total students — {e}")
 
@@ -74,21 +90,10 @@ left_bottom, right_bottom = st.columns(2, gap="large")
 with right_top:
     st.caption("Enrollment Trends (by Course)")
 
-    API_BASE = os.getenv("API_BASE", "http://api:4000/api").rstrip("/")
-    TIMEOUT = int(os.getenv("API_TIMEOUT", "8"))
-
-    def _get(path, params=None):
-        url = f"{API_BASE}{path if path.startswith('/') else '/'+path}"
-        r = requests.get(url, params=params or {}, timeout=TIMEOUT)
-        r.raise_for_status()
-        return r.json()
-
     # 1) Build the selectable list from THIS dean's courses
-    dean_id = st.session_state.get("dean_id")
     course_options = []
     try:
-        data = _get(f"/metrics/deans/{dean_id}/courses")
-        df_courses = pd.DataFrame(data)
+        df_courses = df_dash_courses
         if not df_courses.empty and {"course_id","course_name"}.issubset(df_courses.columns):
             course_options = (
                 df_courses[["course_id","course_name"]]
@@ -97,7 +102,7 @@ with right_top:
                 .to_dict("records")
             )
         else:
-            raise ValueError("Missing fields in /metrics/deans/<id>/courses response")
+            raise ValueError("Missing courses in /metrics/deans/<id>/dashboard response")
     except Exception as e:
         st.warning(f"Could not load courses — {e}")
         course_options = []
@@ -114,16 +119,16 @@ with right_top:
         key="enroll_trend_course_select",
     )
 
-    # 3) Pull per-course enrollment trends
+    # 3) Per-course enrollment trends (all of the college's courses came with the dashboard)
+    df_all_trends = pd.DataFrame(dashboard.get("enrollmentTrends") or [])
     frames = []
     for cname in selected_courses:
         cid = label_to_id.get(cname)
-        if cid is None:
+        if cid is None or df_all_trends.empty:
             continue
         try:
-            rows = _get(f"/metrics/courses/{cid}/enrollment-trend")
-            df = pd.DataFrame(rows)
-            if {"period", "enrollment"}.issubset(df.columns):
+            df = df_all_trends[df_all_trends["course_id"] == cid].copy()
+            if {"period", "enrollment"}.issubset(df.columns) and not df.empty:
                 df["period"] = pd.to_numeric(df["period"], errors="coerce")
                 df["enrollment"] = pd.to_numeric(df["enrollment"], errors="coerce").fillna(0)
                 df = df.dropna(subset=["period"]).sort_values("period")
@@ -153,31 +158,14 @@ with left_top:
     sub_lt, sub_rt = st.columns(2, gap="medium")
     sub_lb, sub_rb = st.columns(2, gap="medium")
 
-    #reuse the same GPA endpoint to get the list of colleges dynamically.
-    try:
-        r = requests.get(f"{API_BASE}/colleges/averages/gpa", timeout=TIMEOUT)
-        r.raise_for_status()
-        data_gpa = r.json()
-        df_gpa_all = pd.DataFrame(data_gpa)
-        if "college" not in df_gpa_all.columns:
-            raise ValueError("Expected field 'college' in avg GPA response")
-        college_names = sorted(df_gpa_all["college"].dropna().astype(str).unique().tolist())
-    except Exception as e:
-        # Fallback list if API not ready
-        st.caption(f"Using sample colleges — {e}")
-        college_names = ["Music", "Dance", "Theatre", "Media", "Design"]
-
     # ---- Enrollment per College ----
     with sub_lt:
         st.caption("Enrollment per Course")
         try:
-            dean_id = st.session_state.get("dean_id")
-            if dean_id is None:
-                raise ValueError("No dean_id in session")
-
-            # pull the dean's courses (already scoped to the dean's college)
-            data = get_json(f"/metrics/deans/{dean_id}/courses")
-            df_courses = pd.DataFrame(data)
+            # the dean's courses (already scoped to the dean's college)
+            df_courses = df_dash_courses.copy()
+            if "enrollment" in df_courses.columns:
+                df_courses["enrollment"] = pd.to_numeric(df_courses["enrollment"], errors="coerce").fillna(0).astype(int)
 
             need = {"course_name", "enrollment"}
             if not need.issubset(df_courses.columns):
@@ -208,18 +196,17 @@ with left_top:
     with sub_rt:
         st.caption("Student / Teacher Ratio (by Course)")
         try:
-            info = get_json(f"/metrics/deans/{st.session_state['dean_id']}/college")
-            dean_college = (info or {}).get("collegeName")
-            params = {"college": dean_college} if dean_college else {}
-
-            # New per-course endpoint
-            data = get_json("/metrics/courses/student-teacher-ratio", params=params)
-            df_ratio = pd.DataFrame(data)
-
-            need = {"course_name", "students_per_teacher"}
+            df_ratio = df_dash_courses.copy()
+            need = {"course_name", "enrollment", "enrolled", "instructors"}
             if not need.issubset(df_ratio.columns):
                 raise ValueError(f"Missing fields: {need - set(df_ratio.columns)}")
 
+            # enrollment: prefer courses.enrollment, fall back to the students_courses count
+            enrolled = pd.to_numeric(df_ratio["enrollment"], errors="coerce").fillna(0)
+            enrolled = enrolled.where(enrolled > 0, pd.to_numeric(df_ratio["enrolled"], errors="coerce").fillna(0))
+            instructors = pd.to_numeric(df_ratio["instructors"], errors="coerce")
+            df_ratio["students_per_teacher"] = enrolled / instructors.where(instructors > 0)
+
             df_ratio = df_ratio.rename(columns={
                 "course_name": "CourseName",
                 "students_per_teacher": "StudentsPerTeacher"
@@ -249,12 +236,10 @@ with left_top:
     with sub_lb:
         st.caption("Average GPA by Course")
         try:
-            info = get_json(f"/metrics/deans/{st.session_state['dean_id']}/college")
-            dean_college = (info or {}).get("collegeName")  # e.g., "College of Composition"
-            params = {"college": dean_college} if dean_college else {}
-
-            data = get_json("/metrics/courses/averages/gpa", params=params)
-            df_gpa_all = pd.DataFrame(data)
+            # courses with at least one enrolled student
+            df_gpa_all = df_dash_courses
+            if "enrolled" in df_gpa_all.columns:
+                df_gpa_all = df_gpa_all[pd.to_numeric(df_gpa_all["enrolled"], errors="coerce").fillna(0) > 0]
             if df_gpa_all.empty:
                 # create empty frame with expected columns so the chart doesn’t error
                 df_gpa_all = pd.DataFrame(columns=["course_name", "average_gpa"])
@@ -300,12 +285,7 @@ with left_top:
         with sub_rb:
             st.caption("Budget by Course ($)")
             try:
-                info = get_json(f"/metrics/deans/{st.session_state['dean_id']}/college")
-                dean_college = (info or {}).get("collegeName")
-                params = {"college": dean_college} if dean_college else {}
-
-                data = get_json("/metrics/courses/budget", params=params)
-                df_budget = pd.DataFrame(data)
+                df_budget = df_dash_courses
 
                 need = {"course_name", "budget"}
                 if not need.issubset(df_budget.columns):
@@ -314,7 +294,7 @@ with left_top:
                     else:
                         raise ValueError(f"Missing fields: {need - set(df_budget.columns)}")
 
-                df_budget = df_budget.rename(columns={"course_name": "CourseName", "budget": "Budget"})
+                df_budget = df_budget[["course_name", "budget"]].rename(columns={"course_name": "CourseName", "budget": "Budget"})
                 df_budget["Budget"] = pd.to_numeric(df_budget["Budget"], errors="coerce").fillna(0)
 
             except Exception as e:
@@ -337,36 +317,9 @@ with left_top:
     with left_bottom:
         st.subheader("Course Performance Overview")
 
-        API_BASE = os.getenv("API_BASE", "http://api:4000/api").rstrip("/")
-        TIMEOUT = int(os.getenv("API_TIMEOUT", "8"))
-
-        def _get(path, params=None):
-            url = f"{API_BASE}{path if path.startswith('/') else '/'+path}"
-            r = requests.get(url, params=params or {}, timeout=TIMEOUT)
-            r.raise_for_status()
-            return r.json()
-
-        # Resolve dean + college
-        dean_id = st.session_state.get("dean_id")
-        if dean_id is None:
-            st.error("No dean_id in session. Set st.session_state['dean_id'] at login.")
-            st.stop()
-
-        # dean's college (from session or API)
-        dean_college = st.session_state.get("college")
-        if not dean_college:
-            try:
-                info = _get(f"/metrics/deans/{dean_id}/college")
-                dean_college = (info or {}).get("collegeName")
-                if dean_college:
-                    st.session_state["college"] = dean_college
-            except Exception:
-                dean_college = None
-
         # 1) Dean's courses (authoritative list; used for picker + join keys)
         try:
-            data_courses = _get(f"/metrics/deans/{dean_id}/courses")
-            df_courses = pd.DataFrame(data_courses)
+            df_courses = df_dash_courses
             need_courses = {"course_id", "course_name"}
             if not need_courses.issubset(df_courses.columns):
                 raise ValueError(f"Dean courses missing: {need_courses - set(df_courses.columns)}")
@@ -399,36 +352,11 @@ with left_top:
             selected_ids = df_courses["course_id"].head(5).tolist()
             selected_names = df_courses.set_index("course_id").loc[selected_ids]["course_name"].tolist()
 
-        # 3) Load GPA list once, then INNER JOIN by course_id
+        # 3) GPA per course (from the dashboard's course rows), then JOIN by course_id
         def load_gpa_df():
-            # try scoped by college first
-            params = {"college": dean_college} if dean_college else None
-            try:
-                data_gpa = _get("/metrics/courses/averages/gpa", params=params)
-                df = pd.DataFrame(data_gpa)
-            except Exception:
-                df = pd.DataFrame()
-
-            # if that came back empty (or missing cols), retry without filter
-            need = {"course_id", "course_name", "average_gpa"}
-            if df.empty or not need.issubset(df.columns):
-                try:
-                    data_gpa = _get("/metrics/courses/averages/gpa")
-                    df = pd.DataFrame(data_gpa)
-                except Exception:
-                    df = pd.DataFrame(columns=list(need))
-
-            # normalize columns
-            rename_map = {}
-            if "avg_gpa" in df.columns and "average_gpa" not in df.columns:
-                rename_map["avg_gpa"] = "average_gpa"
-            if "course" in df.columns and "course_name" not in df.columns:
-                rename_map["course"] = "course_name"
-            if rename_map:
-                df = df.rename(columns=rename_map)
-
+            df = df_dash_courses
             keep = [c for c in ["course_id", "course_name", "average_gpa"] if c in df.columns]
-            df = df[keep] if keep else pd.DataFrame(columns=["course_id", "course_name", "average_gpa"])
+            df = df[keep].copy() if keep else pd.DataFrame(columns=["course_id", "course_name", "average_gpa"])
             if "course_id" in df.columns:
                 df["course_id"] = pd.to_numeric(df["course_id"], errors="coerce").astype("Int64")
             if "average_gpa" in df.columns:
@@ -488,26 +416,9 @@ with left_top:
             r.raise_for_status()
             return r.json()
 
-        # Resolve dean + college
-        dean_id = st.session_state.get("dean_id")
-        if dean_id is None:
-            st.error("No dean_id in session. Set st.session_state['dean_id'] at login.")
-            st.stop()
-
-        dean_college = st.session_state.get("college")
-        if not dean_college:
-            try:
-                info = _get(f"/metrics/deans/{dean_id}/college")
-                dean_college = (info or {}).get("collegeName")
-                if dean_college:
-                    st.session_state["college"] = dean_college
-            except Exception:
-                dean_college = None
-
         # Dean's courses for filter UI
         try:
-            data_courses = _get(f"/metrics/deans/{dean_id}/courses")
-            df_courses = pd.DataFrame(data_courses)
+            df_courses = df_dash_courses
             need = {"course_id", "course_name"}
             if not need.issubset(df_courses.columns):
                 raise ValueError(f"Dean courses missing: {need - set(df_courses.columns)}")
@@ -534,15 +445,13 @@ with left_top:
         selected_ids = {name_to_id[n] for n in selected_courses if n in name_to_id}
 
         # Build enroll_df once (scoped to dean's college), then filter by selected_ids
-        def load_enrollments_df(college: str | None):
+        def load_enrollments_df():
             try:
-                params = {"college": college} if college else {}
-                df = pd.DataFrame(_get("/metrics/courses/enrollments", params=params))
-                if "enrolled_students" not in df.columns and "enrollment" in df.columns:
-                    df = df.rename(columns={"enrollment": "enrolled_students"})
+                df = df_dash_courses.rename(columns={"enrollment": "enrolled_students"})
                 need = {"course_id", "course_name", "enrolled_students"}
                 if not need.issubset(df.columns):
                     return pd.DataFrame(columns=list(need))
+                df = df[list(need)].copy()
                 df["enrolled_students"] = (
                     pd.to_numeric(df["enrolled_students"], errors="coerce").fillna(0).astype(int)
                 )
@@ -550,7 +459,7 @@ with left_top:
             except Exception:
                 return pd.DataFrame(columns=["course_id", "course_name", "enrolled_students"])
 
-        enroll_df = load_enrollments_df(dean_college)
+        enroll_df = load_enrollments_df()
         if selected_ids:
             enroll_df = enroll_df[enroll_df["course_id"].isin(list(selected_ids))]
 
@@ -561,8 +470,7 @@ with left_top:
             st.caption("Vacancies (no professor assigned)")
 
             try:
-                params = {"college": dean_college} if dean_college else {}
-                vac = pd.DataFrame(_get("/metrics/courses/vacancies", params=params))
+                vac = df_dash_courses.copy()
 
                 # keep only rows explicitly marked vacant; tolerate missing column
                 if "is_vacant" in vac.columns:
@@ -0,0 +1,113 @@
+USE bachEndDatabase;
+
+-- Running donation / expense totals per course, kept current by the
+-- triggers below so the budget endpoints never aggregate the raw
+-- tables. Rebuild or check it against the raw tables with
+--   cd api && python -m backend.finance.ledger verify|rebuild
+
+DROP TABLE IF EXISTS course_finance_ledger;
+CREATE TABLE course_finance_ledger
+(
+   courseId      INT PRIMARY KEY,
+   donations     DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+   donationCount INT           NOT NULL DEFAULT 0,
+   expenses      DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+   expenseCount  INT           NOT NULL DEFAULT 0,
+   updatedAt     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+   FOREIGN KEY (courseId) REFERENCES courses (id)
+);
+
+-- one row per course, seeded from whatever 050_... loaded
+INSERT INTO course_finance_ledger (courseId, donations, donationCount, expenses, expenseCount)
+SELECT c.id,
+       COALESCE(d.total, 0), COALESCE(d.n, 0),
+       COALESCE(x.total, 0), COALESCE(x.n, 0)
+FROM courses c
+LEFT JOIN (SELECT courseId, SUM(amount) AS total, COUNT(*) AS n
+           FROM course_donations GROUP BY courseId) d ON d.courseId = c.id
+LEFT JOIN (SELECT courseId, SUM(amount) AS total, COUNT(*) AS n
+           FROM course_expenses GROUP BY courseId) x ON x.courseId = c.id;
+
+-- College rollup: sums at most one ledger row per course.
+DROP VIEW IF EXISTS college_finance_ledger;
+CREATE VIEW college_finance_ledger AS
+SELECT c.college                                   AS collegeName,
+       COALESCE(SUM(c.budget), 0)                  AS totalBudget,
+       COALESCE(SUM(l.donations), 0)               AS totalDonations,
+       COALESCE(SUM(l.expenses), 0)                AS budgetUsed,
+       (COALESCE(SUM(c.budget), 0) + COALESCE(SUM(l.donations), 0)
+        - COALESCE(SUM(l.expenses), 0))            AS remaining,
+       COALESCE(SUM(l.donationCount), 0)           AS donationCount,
+       COALESCE(SUM(l.expenseCount), 0)            AS expenseCount
+FROM courses c
+LEFT JOIN course_finance_ledger l ON l.courseId = c.id
+GROUP BY c.college;
+
+DROP TRIGGER IF EXISTS course_donations_ledger_ai;
+DROP TRIGGER IF EXISTS course_donations_ledger_au;
+DROP TRIGGER IF EXISTS course_donations_ledger_ad;
+DROP TRIGGER IF EXISTS course_expenses_ledger_ai;
+DROP TRIGGER IF EXISTS course_expenses_ledger_au;
+DROP TRIGGER IF EXISTS course_expenses_ledger_ad;
+
+DELIMITER $$
+
+CREATE TRIGGER course_donations_ledger_ai AFTER INSERT ON course_donations
+FOR EACH ROW
+BEGIN
+   INSERT INTO course_finance_ledger (courseId, donations, donationCount)
+   VALUES (NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE donations = donations + NEW.amount,
+                           donationCount = donationCount + 1;
+END$$
+
+CREATE TRIGGER course_donations_ledger_au AFTER UPDATE ON course_donations
+FOR EACH ROW
+BEGIN
+   UPDATE course_finance_ledger
+   SET donations = donations - OLD.amount, donationCount = donationCount - 1
+   WHERE courseId = OLD.courseId;
+   INSERT INTO course_finance_ledger (courseId, donations, donationCount)
+   VALUES (NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE donations = donations + NEW.amount,
+                           donationCount = donationCount + 1;
+END$$
+
+CREATE TRIGGER course_donations_ledger_ad AFTER DELETE ON course_donations
+FOR EACH ROW
+BEGIN
+   UPDATE course_finance_ledger
+   SET donations = donations - OLD.amount, donationCount = donationCount - 1
+   WHERE courseId = OLD.courseId;
+END$$
+
+CREATE TRIGGER course_expenses_ledger_ai AFTER INSERT ON course_expenses
+FOR EACH ROW
+BEGIN
+   INSERT INTO course_finance_ledger (courseId, expenses, expenseCount)
+   VALUES (NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE expenses = expenses + NEW.amount,
+                           expenseCount = expenseCount + 1;
+END$$
+
+CREATE TRIGGER course_expenses_ledger_au AFTER UPDATE ON course_expenses
+FOR EACH ROW
+BEGIN
+   UPDATE course_finance_ledger
+   SET expenses = expenses - OLD.amount, expenseCount = expenseCount - 1
+   WHERE courseId = OLD.courseId;
+   INSERT INTO course_finance_ledger (courseId, expenses, expenseCount)
+   VALUES (NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE expenses = expenses + NEW.amount,
+                           expenseCount = expenseCount + 1;
+END$$
+
+CREATE TRIGGER course_expenses_ledger_ad AFTER DELETE ON course_expenses
+FOR EACH ROW
+BEGIN
+   UPDATE course_finance_ledger
+   SET expenses = expenses - OLD.amount, expenseCount = expenseCount - 1
+   WHERE courseId = OLD.courseId;
+END$$
+
+DELIMITER ;
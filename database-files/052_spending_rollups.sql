@@ -0,0 +1,111 @@
+USE bachEndDatabase;
+
+-- Spending per college, day / month and course, kept current by the
+-- triggers below so the spending-trend endpoints read a handful of
+-- buckets instead of every course_expenses row. Backfill or check
+-- them against course_expenses with
+--   cd api && python -m backend.finance.rollups verify|backfill [--from D] [--to D]
+
+DROP TABLE IF EXISTS spending_daily;
+CREATE TABLE spending_daily
+(
+   college      VARCHAR(50)   NOT NULL,
+   day          DATE          NOT NULL,
+   courseId     INT           NOT NULL,
+   amount       DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+   expenseCount INT           NOT NULL DEFAULT 0,
+   PRIMARY KEY (college, day, courseId),
+   KEY (day),
+   FOREIGN KEY (courseId) REFERENCES courses (id)
+);
+
+-- month is the first day of the month
+DROP TABLE IF EXISTS spending_monthly;
+CREATE TABLE spending_monthly
+(
+   college      VARCHAR(50)   NOT NULL,
+   month        DATE          NOT NULL,
+   courseId     INT           NOT NULL,
+   amount       DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+   expenseCount INT           NOT NULL DEFAULT 0,
+   PRIMARY KEY (college, month, courseId),
+   KEY (month),
+   FOREIGN KEY (courseId) REFERENCES courses (id)
+);
+
+INSERT INTO spending_daily (college, day, courseId, amount, expenseCount)
+SELECT c.college, e.spentAt, e.courseId, SUM(e.amount), COUNT(*)
+FROM course_expenses e
+JOIN courses c ON c.id = e.courseId
+GROUP BY c.college, e.spentAt, e.courseId;
+
+INSERT INTO spending_monthly (college, month, courseId, amount, expenseCount)
+SELECT college, DATE_FORMAT(day, '%Y-%m-01'), courseId, SUM(amount), SUM(expenseCount)
+FROM spending_daily
+GROUP BY college, DATE_FORMAT(day, '%Y-%m-01'), courseId;
+
+DROP TRIGGER IF EXISTS course_expenses_rollup_ai;
+DROP TRIGGER IF EXISTS course_expenses_rollup_au;
+DROP TRIGGER IF EXISTS course_expenses_rollup_ad;
+DROP TRIGGER IF EXISTS courses_rollup_au;
+
+DELIMITER $$
+
+CREATE TRIGGER course_expenses_rollup_ai AFTER INSERT ON course_expenses
+FOR EACH ROW
+BEGIN
+   DECLARE college_ VARCHAR(50);
+   SELECT college INTO college_ FROM courses WHERE id = NEW.courseId;
+   INSERT INTO spending_daily (college, day, courseId, amount, expenseCount)
+   VALUES (college_, NEW.spentAt, NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE amount = amount + NEW.amount, expenseCount = expenseCount + 1;
+   INSERT INTO spending_monthly (college, month, courseId, amount, expenseCount)
+   VALUES (college_, DATE_FORMAT(NEW.spentAt, '%Y-%m-01'), NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE amount = amount + NEW.amount, expenseCount = expenseCount + 1;
+END$$
+
+CREATE TRIGGER course_expenses_rollup_au AFTER UPDATE ON course_expenses
+FOR EACH ROW
+BEGIN
+   DECLARE old_college VARCHAR(50);
+   DECLARE new_college VARCHAR(50);
+   SELECT college INTO old_college FROM courses WHERE id = OLD.courseId;
+   SELECT college INTO new_college FROM courses WHERE id = NEW.courseId;
+   UPDATE spending_daily
+   SET amount = amount - OLD.amount, expenseCount = expenseCount - 1
+   WHERE college = old_college AND day = OLD.spentAt AND courseId = OLD.courseId;
+   UPDATE spending_monthly
+   SET amount = amount - OLD.amount, expenseCount = expenseCount - 1
+   WHERE college = old_college AND month = DATE_FORMAT(OLD.spentAt, '%Y-%m-01') AND courseId = OLD.courseId;
+   INSERT INTO spending_daily (college, day, courseId, amount, expenseCount)
+   VALUES (new_college, NEW.spentAt, NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE amount = amount + NEW.amount, expenseCount = expenseCount + 1;
+   INSERT INTO spending_monthly (college, month, courseId, amount, expenseCount)
+   VALUES (new_college, DATE_FORMAT(NEW.spentAt, '%Y-%m-01'), NEW.courseId, NEW.amount, 1)
+   ON DUPLICATE KEY UPDATE amount = amount + NEW.amount, expenseCount = expenseCount + 1;
+END$$
+
+CREATE TRIGGER course_expenses_rollup_ad AFTER DELETE ON course_expenses
+FOR EACH ROW
+BEGIN
+   DECLARE college_ VARCHAR(50);
+   SELECT college INTO college_ FROM courses WHERE id = OLD.courseId;
+   UPDATE spending_daily
+   SET amount = amount - OLD.amount, expenseCount = expenseCount - 1
+   WHERE college = college_ AND day = OLD.spentAt AND courseId = OLD.courseId;
+   UPDATE spending_monthly
+   SET amount = amount - OLD.amount, expenseCount = expenseCount - 1
+   WHERE college = college_ AND month = DATE_FORMAT(OLD.spentAt, '%Y-%m-01') AND courseId = OLD.courseId;
+END$$
+
+-- a course moving to another college takes its buckets along
+CREATE TRIGGER courses_rollup_au AFTER UPDATE ON courses
+FOR EACH ROW
+BEGIN
+   IF NOT (OLD.college <=> NEW.college) THEN
+      UPDATE spending_daily SET college = NEW.college WHERE courseId = NEW.id;
+      UPDATE spending_monthly SET college = NEW.college WHERE courseId = NEW.id;
+   END IF;
+END$$
+
+DELIMITER ;